@@ -0,0 +1,130 @@
+"""Vazão do automod (``Automod.verificar``) com mensagens sintéticas.
+
+Monta servidores com listas de palavras proibidas e domínios bloqueados e
+passa por ``verificar`` um fluxo de mensagens parecido com o real: a maioria
+normal (com e sem acento), algumas com links, convites, palavras proibidas,
+menções em massa e spam repetido. Mostra mensagens/s no total e por tipo, e
+compara a regex em trie com a alternação simples das mesmas palavras.
+
+Uso: python -m benchmarks.bench_automod [mensagens] [palavras]
+"""
+
+import random
+import re
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from core.automod import Automod, RegrasGuild, compilar_palavras
+from core.texto import dobrar
+
+SEMENTE = 42
+N_GUILDS = 50
+N_CANAIS = 5
+N_USUARIOS = 5000
+
+FRASES = [
+    "bom dia pessoal, tudo bem com vocês?",
+    "Alguém sabe como configurar o cargo de moderador? Não achei a opção.",
+    "kkkkkkk muito bom",
+    "vou jogar mais tarde, quem topa?",
+    "Olá! Acabei de entrar no servidor, é aqui que fala sobre programação?",
+    "o versículo de hoje foi muito bom, João 3:16",
+    "alguém viu o anúncio novo? parece que muda tudo na próxima atualização",
+    "ok",
+    "valeu, obrigado pela ajuda 🙏",
+]
+
+
+def gerar_palavras(n, rng):
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+    return sorted({''.join(rng.choice(letras) for _ in range(rng.randint(4, 10))) for _ in range(n)})
+
+
+def gerar_mensagens(n, palavras, rng):
+    autor = [SimpleNamespace(id=i, bot=False) for i in range(N_USUARIOS)]
+    guilds = [SimpleNamespace(id=1000 + g, owner_id=0) for g in range(N_GUILDS)]
+    mensagens = []
+    for i in range(n):
+        sorte = rng.random()
+        mencoes = []
+        if sorte < 0.80:
+            # Conversa real quase nunca repete a mesma frase inteira no canal
+            tipo, conteudo = 'normal', f"{rng.choice(FRASES)} {rng.randrange(10**6)}"
+        elif sorte < 0.88:
+            tipo, conteudo = 'link', f"olha isso https://site{rng.randint(0, 999)}.example.com/pagina"
+        elif sorte < 0.91:
+            tipo, conteudo = 'convite', "entrem no meu servidor discord.gg/abc123"
+        elif sorte < 0.95:
+            tipo, conteudo = 'palavra', f"{rng.choice(FRASES)} {rng.choice(palavras)}"
+        elif sorte < 0.97:
+            tipo, conteudo = 'mencoes', "acordem"
+            mencoes = autor[:8]
+        else:
+            tipo, conteudo = 'spam', "COMPRE AGORA!!! promoção imperdível"
+        g = guilds[i % N_GUILDS]
+        mensagens.append((tipo, SimpleNamespace(
+            guild=g, author=rng.choice(autor), channel=SimpleNamespace(id=g.id * 10 + rng.randrange(N_CANAIS)),
+            content=conteudo, mentions=mencoes, role_mentions=[], mention_everyone=False,
+        )))
+    return mensagens
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_palavras = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(SEMENTE)
+
+    palavras = gerar_palavras(n_palavras, rng)
+    automod = Automod(db=None, relogio=lambda: relogio[0])
+    for g in range(N_GUILDS):
+        regras = automod.regras[1000 + g] = RegrasGuild(ativo=True)
+        regras.palavras.update(palavras)
+        regras.dominios.update({'site13.example.com', 'golpe.example'})
+
+    mensagens = gerar_mensagens(n, palavras, rng)
+    relogio = [0.0]
+
+    # Aquecimento: compila as regex (compartilhadas entre servidores)
+    for _, msg in mensagens[:1000]:
+        automod.verificar(msg)
+
+    violacoes = Counter()
+    inicio = time.perf_counter()
+    for i, (_, msg) in enumerate(mensagens):
+        relogio[0] = i / 20_000  # 20 mil mensagens por segundo de relógio virtual
+        violacao = automod.verificar(msg)
+        if violacao is not None:
+            violacoes[violacao.motivo] += 1
+    duracao = time.perf_counter() - inicio
+    print(f"{n} mensagens, {N_GUILDS} servidores, {n_palavras} palavras proibidas por servidor")
+    print(f"Total: {n / duracao:,.0f} mensagens/s ({duracao / n * 1e6:.2f} µs/mensagem)")
+    print(f"Violações: {dict(violacoes)}")
+    print(f"Janelas na memória: {len(automod._usuarios)} usuários, {len(automod._canais)} canais")
+
+    print("\nPor tipo de mensagem:")
+    por_tipo = {}
+    for tipo, msg in mensagens:
+        por_tipo.setdefault(tipo, []).append(msg)
+    for tipo, lista in sorted(por_tipo.items()):
+        inicio = time.perf_counter()
+        for msg in lista:
+            automod.verificar(msg)
+        duracao = time.perf_counter() - inicio
+        print(f"  {tipo:<8} {len(lista) / duracao:>12,.0f} mensagens/s")
+
+    textos = [dobrar(msg.content) for _, msg in mensagens[:50_000]]
+    trie = compilar_palavras(tuple(palavras))
+    simples = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, palavras)) + r')(?!\w)')
+    for nome, regex in (('trie', trie), ('alternação', simples)):
+        inicio = time.perf_counter()
+        for texto in textos:
+            regex.search(texto)
+        duracao = time.perf_counter() - inicio
+        print(f"\nRegex {nome:<11} {len(textos) / duracao:>12,.0f} buscas/s", end='')
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Verifica que outros comandos continuam respondendo durante muitas consultas à API.
+
+Sobe um servidor local que imita a abibliadigital.com.br com latência
+artificial e o bot de ``main.py`` no Discord falso (``benchmarks.mock_discord``),
+sem Bíblia local. Dispara ``--consultas`` ``*versiculo`` simultâneos, cada um
+num capítulo diferente (sem cache), e, enquanto eles esperam a API, envia
+``/ping`` um atrás do outro pelos handlers reais.
+
+Sai com código 1 se algum comando falhar, se menos de ``--min-atendidos``
+``/ping`` forem atendidos durante as consultas ou se o event loop atrasar
+mais que ``--max-atraso`` ms.
+
+Uso: python -m benchmarks.bench_biblia_api [--consultas 100] [--latencia 500]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+from aiohttp import web
+
+from core.referencias import LIVROS
+
+
+def _verso(livro, capitulo, numero):
+    return {'book': {'name': livro.title()}, 'chapter': int(capitulo), 'number': int(numero),
+            'text': 'Texto de teste.'}
+
+
+async def iniciar_servidor(latencia):
+    """Servidor que imita as rotas da abibliadigital.com.br usadas pelo bot."""
+    async def verso(request):
+        await asyncio.sleep(latencia)
+        m = request.match_info
+        return web.json_response(_verso(m['livro'], m['cap'], m['vers']))
+
+    async def capitulo(request):
+        await asyncio.sleep(latencia)
+        m = request.match_info
+        versos = [_verso(m['livro'], m['cap'], i) for i in range(1, 31)]
+        return web.json_response({
+            'book': versos[0]['book'], 'chapter': {'number': int(m['cap']), 'verses': len(versos)},
+            'verses': [{'number': v['number'], 'text': v['text']} for v in versos],
+        })
+
+    async def aleatorio(request):
+        await asyncio.sleep(latencia)
+        return web.json_response(_verso('salmos', 23, 1))
+
+    async def pesquisa(request):
+        await asyncio.sleep(latencia)
+        return web.json_response([_verso('joão', 3, i) for i in range(1, 21)])
+
+    app = web.Application()
+    app.router.add_get('/api/verses/{versao}/random', aleatorio)
+    app.router.add_get('/api/verses/{versao}/search/{termo}', pesquisa)
+    app.router.add_get('/api/verses/{versao}/{livro}/{cap}', capitulo)
+    app.router.add_get('/api/verses/{versao}/{livro}/{cap}/{vers}', verso)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    porta = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{porta}/api"
+
+
+async def executar(args):
+    from benchmarks import carga  # carga importa este módulo; aqui não fica circular
+    from benchmarks.mock_discord import MockDiscord
+
+    diretorio = tempfile.mkdtemp(prefix='bench_api_')
+    mock = await MockDiscord(guilds=1, shards=1).start()
+    runner, url = await iniciar_servidor(args.latencia / 1000)
+    carga._preparar_ambiente(types.SimpleNamespace(modo='api'), diretorio, mock, url)
+    os.environ.update({'BIBLIA_API_TIMEOUT': '60', 'LOG_NIVEL': 'WARNING'})
+
+    import main  # só depois do ambiente configurado
+
+    bot = main.bot
+    bot.biblia.orcamento = None
+    tarefa_bot = asyncio.create_task(bot.start(os.environ['DISCORD_TOKEN']))
+    await asyncio.wait_for(bot.wait_until_ready(), timeout=60)
+    for limite in main.LIMITES:
+        limite.taxa = float('inf')
+
+    guild = bot.guilds[0]
+    gerador = carga.Carga(mock, bot, guild.id, guild.text_channels[0].id)
+    sentinela = carga.Sentinela()
+    sentinela.start()
+
+    # Um capítulo diferente por consulta: nada vem do cache nem é agrupado
+    consultas = [f"*versiculo {LIVROS[i % len(LIVROS)].nome} {i // len(LIVROS) + 1}:1" for i in range(args.consultas)]
+    latencias_biblia = []
+    inicio = time.perf_counter()
+    biblia = asyncio.gather(*(gerador.enviar('prefixo', 'versiculo', c, latencias_biblia) for c in consultas))
+
+    # Enquanto as consultas esperam a API, /ping continua chegando
+    latencias_ping = []
+    erros_ping = 0
+    while not biblia.done():
+        erros_ping += await gerador.enviar('slash', 'ping', [], latencias_ping)
+    erros_biblia = sum(await biblia)
+    duracao = time.perf_counter() - inicio
+    sentinela.stop()
+
+    await bot.close()
+    await tarefa_bot
+    await mock.stop()
+    await runner.cleanup()
+
+    latencias_ping.sort()
+    p99_ping = latencias_ping[max(0, int(len(latencias_ping) * 0.99) - 1)] * 1000
+    print(f"*versiculo: {args.consultas - erros_biblia}/{args.consultas} respondidos em {duracao:.2f}s "
+          f"({args.latencia:.0f} ms por consulta à API)")
+    print(f"/ping atendidos durante as consultas: {len(latencias_ping)} ({erros_ping} erros), "
+          f"p50={statistics.median(latencias_ping) * 1000:.2f}ms p99={p99_ping:.2f}ms")
+    print(f"atraso máximo do loop: {sentinela.maximo * 1000:.2f}ms")
+
+    falhas = []
+    if erros_biblia:
+        falhas.append(f"{erros_biblia} *versiculo com erro")
+    if erros_ping:
+        falhas.append(f"{erros_ping} /ping com erro")
+    if len(latencias_ping) < args.min_atendidos:
+        falhas.append(f"só {len(latencias_ping)} /ping atendidos (mínimo {args.min_atendidos})")
+    if sentinela.maximo * 1000 > args.max_atraso:
+        falhas.append(f"atraso do loop de {sentinela.maximo * 1000:.1f}ms (máximo {args.max_atraso:.0f}ms)")
+    for falha in falhas:
+        print(f"FALHOU: {falha}")
+    return 1 if falhas else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outros comandos respondem com consultas bíblicas em voo")
+    parser.add_argument('--consultas', type=int, default=100, help="*versiculo simultâneos")
+    parser.add_argument('--latencia', type=float, default=500.0, help="latência da API falsa (ms)")
+    parser.add_argument('--min-atendidos', type=int, default=20, help="mínimo de /ping atendidos durante as consultas")
+    parser.add_argument('--max-atraso', type=float, default=100.0, help="atraso máximo aceito do event loop (ms)")
+    return asyncio.run(executar(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
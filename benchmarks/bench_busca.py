@@ -0,0 +1,66 @@
+"""Latência das pesquisas no índice invertido local, em microssegundos.
+
+Uso: python -m benchmarks.bench_busca [versos.sbib índice.sidx]
+
+Sem argumentos, gera um corpus sintético do tamanho da Bíblia num
+diretório temporário.
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus_sintetico
+from core.biblia_busca import IndiceBusca
+from core.biblia_store import BibliaStore
+
+CONSULTAS = {
+    'termo comum': 'senhor',
+    'termo muito comum': 'de',
+    'termo raro': 'unigenito',
+    'dois termos (E)': 'deus amor',
+    'três termos (E)': 'senhor rei israel',
+    'frase': '"tanto amou"',
+    'prefixo': 'pa*',
+    'acentos/caixa': 'UNIGÊNITO',
+}
+
+
+def medir(indice, consulta, repeticoes):
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter_ns()
+        indice.pesquisar(consulta, k=5)
+        amostras.append((time.perf_counter_ns() - inicio) / 1000)
+    amostras.sort()
+    return amostras
+
+
+def main():
+    if len(sys.argv) == 3:
+        sbib, sidx = sys.argv[1:3]
+    else:
+        sbib, sidx = corpus_sintetico.preparar(tempfile.mkdtemp(prefix='bench_busca_'))
+
+    inicio = time.perf_counter()
+    indice = IndiceBusca(sidx)
+    abertura = (time.perf_counter() - inicio) * 1e6
+    store = BibliaStore(sbib)
+    print(f"{store.n_versos} versículos, {indice.n_termos} termos; abertura do índice: {abertura:.0f}µs")
+
+    print(f"{'consulta':<22}{'total':>8}{'1ª (fria)':>12}{'p50':>10}{'p99':>10}")
+    for nome, consulta in CONSULTAS.items():
+        inicio = time.perf_counter_ns()
+        total, _ = indice.pesquisar(consulta, k=5)
+        fria = (time.perf_counter_ns() - inicio) / 1000
+        amostras = medir(indice, consulta, 200)
+        p99 = amostras[int(len(amostras) * 0.99) - 1]
+        print(f"{nome:<22}{total:>8}{fria:>10.0f}µs{statistics.median(amostras):>8.0f}µs{p99:>8.0f}µs")
+
+    indice.close()
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Memória e custo por consulta dos limites de uso com milhões de usuários.
+
+Simula usuários distintos chegando a uma taxa fixa num relógio virtual e
+mostra quantos baldes ficam na memória: como os baldes cheios são
+descartados, o número se estabiliza abaixo de (usuários/s × ``por``),
+independente do total de usuários vistos.
+
+Uso: python -m benchmarks.bench_limites [usuarios] [usuarios_por_segundo]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from core.limites import Limite
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    por_segundo = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    relogio = [0.0]
+    limite = Limite(3, 30, relogio=lambda: relogio[0])
+    inicio = time.perf_counter()
+    for usuario in range(total):
+        relogio[0] = usuario / por_segundo
+        limite.consumir(usuario)
+    duracao = time.perf_counter() - inicio
+    print(f"{total / duracao / 1e6:.2f} M consultas/s ({duracao / total * 1e9:.0f} ns/consulta)\n")
+
+    relogio = [0.0]
+    limite = Limite(3, 30, relogio=lambda: relogio[0])
+    tracemalloc.start()
+    maximo = 0
+    for usuario in range(total):
+        relogio[0] = usuario / por_segundo
+        limite.consumir(usuario)
+        if usuario % 100_000 == 0:
+            maximo = max(maximo, len(limite))
+            print(f"{usuario:>10} usuários vistos: {len(limite):>7} baldes, "
+                  f"{tracemalloc.get_traced_memory()[0] / 2**20:6.1f} MiB")
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"\nBaldes: máximo {maximo} (limite teórico {por_segundo * limite.por}), pico {pico / 2**20:.1f} MiB")
+
+    # Um só usuário martelando: só os primeiros 3 usos passam
+    relogio[0] += 1000
+    permitidos = sum(1 for _ in range(1000) if not limite.consumir('spam'))
+    print(f"Usuário insistente: {permitidos} de 1000 usos permitidos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Atraso do event loop numa tempestade de erros: logging síncrono contra a fila.
+
+Tarefas no event loop emitem ``logger.error`` (com traceback) como o
+tratamento de erro das consultas bíblicas faz quando a API cai, enquanto uma
+sentinela mede o atraso do loop. A saída é um arquivo cuja escrita leva
+``--escrita`` ms por linha, como um terminal lento ou um disco ocupado.
+
+Cenários:
+
+* ``síncrono``: ``StreamHandler`` direto no logger raiz, como o
+  ``logging.basicConfig`` de antes; formatação e escrita acontecem no loop;
+* ``fila, distintos``: ``core.logs.configurar``, com cada erro diferente do
+  anterior (o filtro de repetidos não atua);
+* ``fila, repetidos``: o mesmo erro sempre, como numa queda da API.
+
+Para cada um: tempo no loop por registro, maior atraso e tempo total travado
+(acima de 10 ms), linhas escritas e quanto a thread levou para esvaziar a fila.
+
+Uso: python -m benchmarks.bench_logs [--registros 5000] [--escrita 0.2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.carga import Sentinela
+from core import logs
+
+
+class EscritaLenta:
+    """Arquivo em que cada ``write`` leva ``atraso`` segundos."""
+
+    def __init__(self, caminho, atraso):
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+        self.atraso = atraso
+        self.linhas = 0
+
+    def write(self, texto):
+        time.sleep(self.atraso)
+        self.linhas += texto.count('\n')
+        return self._arquivo.write(texto)
+
+    def flush(self):
+        self._arquivo.flush()
+
+    def close(self):
+        self._arquivo.close()
+
+
+def erro_da_api(i, repetido):
+    try:
+        raise ConnectionError("Cannot connect to host www.abibliadigital.com.br:443" + ('' if repetido else f" [{i}]"))
+    except ConnectionError as e:
+        return e
+
+
+async def tempestade(logger, registros, repetido, tarefas=20):
+    por_tarefa = registros // tarefas
+    gasto = 0.0
+
+    async def emitir(t):
+        nonlocal gasto
+        for i in range(por_tarefa):
+            e = erro_da_api(t * por_tarefa + i, repetido)
+            inicio = time.perf_counter()
+            logger.error(f"Erro ao buscar capítulo: {e}", exc_info=e)
+            gasto += time.perf_counter() - inicio
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(emitir(t) for t in range(tarefas)))
+    return gasto, por_tarefa * tarefas
+
+
+async def rodar(nome, configurar, registros, repetido):
+    logger = logging.getLogger('discord_bot.bench')
+    saida, fim = configurar()
+    sentinela = Sentinela(intervalo=0.002)
+    sentinela.start()
+    await asyncio.sleep(0.05)
+    inicio = time.perf_counter()
+    gasto, n = await tempestade(logger, registros, repetido)
+    no_loop = time.perf_counter() - inicio
+    sentinela.stop()
+    fim()
+    esvaziar = time.perf_counter() - inicio
+    print(f"{nome:<20}{gasto / n * 1e6:>10.1f} µs{sentinela.maximo * 1000:>10.1f} ms"
+          f"{sentinela.travado * 1000:>10.0f} ms{saida.linhas:>9}{no_loop:>9.2f} s{esvaziar:>9.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atraso do loop com logging síncrono e com a fila")
+    parser.add_argument('--registros', type=int, default=5000)
+    parser.add_argument('--escrita', type=float, default=0.2, help="tempo de cada escrita (ms)")
+    args = parser.parse_args()
+    diretorio = tempfile.mkdtemp(prefix='logs_')
+    atraso = args.escrita / 1000
+    raiz = logging.getLogger()
+
+    def sincrono():
+        saida = EscritaLenta(os.path.join(diretorio, 'sincrono.log'), atraso)
+        for antigo in raiz.handlers[:]:
+            raiz.removeHandler(antigo)
+        handler = logging.StreamHandler(saida)
+        handler.setFormatter(logging.Formatter(logs.FORMATO_TEXTO))
+        raiz.addHandler(handler)
+        raiz.setLevel(logging.INFO)
+        return saida, lambda: raiz.removeHandler(handler)
+
+    def fila(nome):
+        def configurar():
+            saida = EscritaLenta(os.path.join(diretorio, f'{nome}.log'), atraso)
+            pipeline = logs.configurar(arquivo=None, fila=args.registros * 2)
+            # O console vira o arquivo lento, para comparar com o mesmo destino
+            pipeline.saidas[0].setStream(saida)
+            return saida, pipeline.close
+        return configurar
+
+    print(f"{args.registros} erros com traceback, escrita de {args.escrita} ms por linha\n")
+    print(f"{'cenário':<20}{'no loop':>13}{'atraso máx':>13}{'travado':>13}{'linhas':>9}"
+          f"{'emissão':>11}{'escrita':>11}")
+    asyncio.run(rodar('síncrono', sincrono, args.registros, repetido=False))
+    asyncio.run(rodar('fila, distintos', fila('distintos'), args.registros, repetido=False))
+    asyncio.run(rodar('fila, repetidos', fila('repetidos'), args.registros, repetido=True))
+
+
+if __name__ == '__main__':
+    main()
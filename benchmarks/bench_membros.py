@@ -0,0 +1,95 @@
+"""Memória e tempo de inicialização de cada política de cache de membros.
+
+Monta um servidor sintético com 100 mil membros direto no ``ConnectionState``
+do discord.py (sem rede) e simula o que cada política faz na conexão: o chunk
+completo, nenhum chunk, ou um LRU alimentado por atividade de membros. Na
+conexão ``sob_demanda`` é igual a ``sem_chunk``: o chunk só vem na primeira
+busca que não acha um membro do servidor.
+
+Uso: python -m benchmarks.bench_membros [membros]
+"""
+
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import discord
+
+from core.membros import POLITICAS, CacheMembros, opcoes_bot
+
+GUILD_ID = 1_000_000_000_000_000
+
+
+def payload_guild(n_membros):
+    return {
+        'id': str(GUILD_ID), 'name': 'Servidor sintético', 'owner_id': str(GUILD_ID + 1),
+        'member_count': n_membros, 'large': True, 'features': [], 'emojis': [], 'stickers': [],
+        'roles': [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+        'channels': [], 'threads': [], 'members': [], 'voice_states': [], 'presences': [],
+    }
+
+
+def payload_membro(i):
+    return {
+        'user': {'id': str(GUILD_ID + i), 'username': f'membro{i}', 'discriminator': '0',
+                 'global_name': None, 'avatar': None},
+        'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False,
+        'nick': None, 'flags': 0,
+    }
+
+
+def conectar(politica, n_membros, eventos_atividade):
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    client = discord.Client(intents=intents, **opcoes_bot(politica, intents))
+    state = client._connection
+    guild = state._add_guild_from_data(payload_guild(n_membros))
+    cache = CacheMembros(politica)
+
+    if state._chunk_guilds:
+        # Equivalente ao GUILD_MEMBERS_CHUNK recebido na conexão
+        for inicio in range(0, n_membros, 1000):
+            for i in range(inicio, min(inicio + 1000, n_membros)):
+                membro = discord.Member(data=payload_membro(i), guild=guild, state=state)
+                if state.member_cache_flags.joined:
+                    guild._add_member(membro)
+
+    # Atividade: membros aparecendo em mensagens/interações
+    rng = random.Random(1)
+    for _ in range(eventos_atividade):
+        i = int(n_membros * rng.random() ** 3)
+        membro = guild.get_member(GUILD_ID + i)
+        if membro is None:
+            membro = discord.Member(data=payload_membro(i), guild=guild, state=state)
+        cache.lembrar(membro)
+
+    return client, guild, cache
+
+
+def main(n_membros=100_000, eventos=50_000):
+    print(f"{n_membros} membros, {eventos} eventos de atividade")
+    print(f"{'política':<14}{'tempo':>10}{'memória':>12}{'membros em cache':>20}")
+    for politica in POLITICAS:
+        gc.collect()
+        inicio = time.perf_counter()
+        client, guild, cache = conectar(politica, n_membros, eventos)
+        duracao = time.perf_counter() - inicio
+        del client, guild, cache
+
+        gc.collect()
+        tracemalloc.start()
+        client, guild, cache = conectar(politica, n_membros, eventos)
+        gc.collect()
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        em_cache = len(guild._members) + len(cache._lru)
+        print(f"{politica:<14}{duracao:>9.2f}s{memoria / 2**20:>10.1f}MiB{em_cache:>20}")
+        del client, guild, cache
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
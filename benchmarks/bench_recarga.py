@@ -0,0 +1,181 @@
+"""Recarga de extensões contra reinício completo do bot.
+
+Sobe o bot de ``main.py`` no Discord falso (``benchmarks.mock_discord``) com
+``--guilds`` servidores em ``--shards`` shards e mede:
+
+* a partida completa, do ``start`` ao ``on_ready`` (banco, Bíblia local,
+  IDENTIFY e GUILD_CREATE de todos os servidores);
+* ``reload_extension`` de cada extensão e a recarga de todas juntas (com a
+  sincronização de comandos, que não chama a API se nada mudou);
+* uma rodada de ``*versiculo`` enquanto a extensão bíblica é recarregada sem
+  parar, para mostrar que nenhum comando se perde no meio da troca;
+* o reinício (``close`` + partida de um bot novo) para comparar.
+
+Antes e depois das recargas confere o estado em memória: lembretes
+pendentes, itens do cache bíblico, cursores de pesquisa, os objetos
+``Limite`` dos comandos e o número de IDENTIFY enviados ao gateway.
+
+Uso: python -m benchmarks.bench_recarga [--guilds 2000] [--shards 4] [--repeticoes 20]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+from benchmarks import bench_biblia_api, carga
+from benchmarks.mock_discord import MockDiscord
+
+# Intervalo mínimo entre IDENTIFY no mesmo balde de max_concurrency (Discord)
+IDENTIFY_INTERVALO = 5.0
+
+TERMOS = ['amor', 'paz', 'fé', 'graça', 'luz', 'vida', 'caminho', 'verdade', 'senhor', 'deus',
+          'esperança', 'pão', 'água', 'pastor', 'reino', 'céu', 'terra', 'mar', 'monte', 'palavra']
+
+
+async def partir(bot):
+    inicio = time.perf_counter()
+    tarefa = asyncio.create_task(bot.start(os.environ['DISCORD_TOKEN']))
+    await asyncio.wait_for(bot.wait_until_ready(), timeout=120)
+    return time.perf_counter() - inicio, tarefa
+
+
+async def estado(bot):
+    return {
+        'lembretes pendentes': await bot.lembretes.pendentes(),
+        'itens no cache bíblico': bot.cache_biblia.stats()['itens'],
+        'cursores de pesquisa': bot.cursores.stats()['itens'],
+    }
+
+
+async def executar(args):
+    diretorio = tempfile.mkdtemp(prefix='recarga_')
+    mock = await MockDiscord(guilds=args.guilds, shards=args.shards).start()
+    biblia_runner, api_url = await bench_biblia_api.iniciar_servidor(0.0)
+    carga._preparar_ambiente(types.SimpleNamespace(modo='local'), diretorio, mock, api_url)
+    os.environ.update({'SHARD_COUNT': str(args.shards), 'CLUSTER_SHARDS': ','.join(map(str, range(args.shards)))})
+
+    import main  # só depois do ambiente configurado
+
+    bot = main.bot
+    bot.biblia.orcamento = None
+    partida, tarefa_bot = await partir(bot)
+    # Baldes que enchem na hora: a carga é de um só usuário. Mudar ``vezes``
+    # (como em benchmarks.carga) faria a recarga trocar o Limite por um novo.
+    for limite in main.LIMITES:
+        limite.taxa = float('inf')
+
+    # Estado em memória que a recarga não pode perder
+    guild = bot.guilds[0]
+    canal_id = guild.text_channels[0].id
+    uma_hora = time.time() + 3600
+    for i in range(args.lembretes):
+        await bot.lembretes.agendar(carga.ALVO_ID, canal_id, guild.id, f'lembrete {i}', uma_hora + i)
+    gerador = carga.Carga(mock, bot, guild.id, canal_id)
+    sentinela = carga.Sentinela()
+    sentinela.start()
+    for cenario in carga.CENARIOS:
+        if cenario[0] in ('versiculo', 'passagem', 'pesquisar_biblia', 'lembrar'):
+            await gerador.rodar(cenario, 20, 5, sentinela)
+    for termo in TERMOS:
+        await bot.get_cog('Biblia').pesquisar_versiculos(termo)
+    antes = await estado(bot)
+    limites_antes = {id(l) for l in main.LIMITES}
+    identifies_antes = sum(mock.identifies.values())
+
+    tempos = {}
+    for nome in main.EXTENSOES:
+        amostras = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            await bot.reload_extension(nome)
+            amostras.append(time.perf_counter() - inicio)
+        tempos[nome] = amostras
+    todas = []
+    for _ in range(args.repeticoes):
+        inicio = time.perf_counter()
+        await bot.recarregar(list(main.EXTENSOES))
+        todas.append(time.perf_counter() - inicio)
+
+    # Comandos chegando durante recargas seguidas da extensão bíblica
+    recargas = 0
+    parar = asyncio.Event()
+
+    async def recarregar_sem_parar():
+        nonlocal recargas
+        while not parar.is_set():
+            await bot.reload_extension('extensoes.biblia')
+            recargas += 1
+            await asyncio.sleep(args.intervalo / 1000)
+
+    recarregador = asyncio.create_task(recarregar_sem_parar())
+    passagem = next(c for c in carga.CENARIOS if c[0] == 'passagem')
+    durante = await gerador.rodar(passagem, args.comandos, 20, sentinela)
+    parar.set()
+    await recarregador
+    sentinela.stop()
+
+    depois = await estado(bot)
+    reaproveitados = len(limites_antes & {id(l) for l in main.LIMITES})
+    identifies_depois = sum(mock.identifies.values())
+
+    inicio = time.perf_counter()
+    await bot.close()
+    await tarefa_bot
+    fechamento = time.perf_counter() - inicio
+    novo = main.SoninhoBot(
+        command_prefix=main.prefixo_do_servidor,
+        intents=main.intents,
+        help_command=None,
+        case_insensitive=True,
+        shard_ids=main.CLUSTER_SHARDS,
+        shard_count=main.SHARD_COUNT,
+        **main.opcoes_bot(main.MEMBROS_POLITICA, main.intents),
+    )
+    novo.biblia.orcamento = None
+    repartida, tarefa_novo = await partir(novo)
+    apos_reinicio = await estado(novo)
+    await novo.close()
+    await tarefa_novo
+    await mock.stop()
+    await biblia_runner.cleanup()
+
+    ms = lambda s: f"{s * 1000:8.1f} ms"
+    print(f"\n{args.guilds} servidores em {args.shards} shard(s), {args.repeticoes} repetições\n")
+    print(f"{'partida completa (start → ready)':<40}{ms(partida)}")
+    for nome, amostras in tempos.items():
+        print(f"{'recarga ' + nome.split('.')[-1] + ' (mediana)':<40}{ms(statistics.median(amostras))}"
+              f"   máx {ms(max(amostras)).strip()}")
+    print(f"{'recarga de todas + sync (mediana)':<40}{ms(statistics.median(todas))}")
+    print(f"{'reinício (close + start → ready)':<40}{ms(fechamento + repartida)}")
+    lote = math.ceil(args.shards / 16)
+    print(f"\nNo Discord de verdade o reinício ainda espera {IDENTIFY_INTERVALO:.0f}s por balde de IDENTIFY "
+          f"({lote} balde(s) com max_concurrency=16, pelo menos {lote * IDENTIFY_INTERVALO:.0f}s de gateway "
+          f"fora) e perde os eventos desse intervalo; a recarga não reconecta.")
+    print(f"\n*versiculo durante {recargas} recargas da extensão bíblica: "
+          f"{durante['n']} comandos, {durante['erros']} erros, p99 {durante['p99_ms']:.1f} ms")
+    print(f"IDENTIFY enviados durante as recargas: {identifies_depois - identifies_antes}")
+    print(f"Limites (com os baldes) reaproveitados pela recarga: {reaproveitados} de {len(limites_antes)}\n")
+    print(f"{'estado':<28}{'antes':>8}{'depois':>8}{'reinício':>10}")
+    for chave in antes:
+        print(f"{chave:<28}{antes[chave]:>8}{depois[chave]:>8}{apos_reinicio[chave]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recarga de extensões contra reinício do bot")
+    parser.add_argument('--guilds', type=int, default=2000)
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--lembretes', type=int, default=500)
+    parser.add_argument('--comandos', type=int, default=500, help="*versiculo enviados durante as recargas")
+    parser.add_argument('--intervalo', type=float, default=20.0, help="pausa entre recargas seguidas (ms)")
+    asyncio.run(executar(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Vazão do interpretador de referências e da leitura de trechos em lote.
+
+Mede ``core.referencias.interpretar`` sem cache (``__wrapped__``) e com o
+``lru_cache``, e à parte a correção de digitação do nome do livro (que
+percorre a trie com a distância de edição). Depois compara, na Bíblia
+local sintética, ler um trecho com ``BibliaStore.versiculos`` (uma leitura)
+contra um ``buscar`` por versículo.
+
+Uso: python -m benchmarks.bench_referencias [repeticoes]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus_sintetico
+from core.biblia_store import BibliaStore
+from core.referencias import LIVROS, encontrar_livro, interpretar
+
+SEMENTE = 42
+
+EXATAS = [
+    "Jo 3:16", "João 3:16", "1 Coríntios 13:4-7", "salmo 23", "joão 3 16", "Gênesis 1:1-2:3",
+    "I Sam 3", "primeira corintios 13", "apoc 21:1-4", "Mateus 5:3-12,14;6:9-13", "rm 8:28-39",
+    "2 tm 3:16", "isaías 53", "Pv 3:5-6", "Filipenses 4:13", "1º Reis 19", "jo 3.16", "sl 1-3",
+]
+COM_ERRO = [
+    "genessis 1:1", "Apocalise 3:20", "ecleziastes 3:1", "Deutoronomio 6:4", "filipensses 4:13",
+    "Mateos 6:33", "corintios 13", "Hebrues 11:1", "Provervios 3:5", "lamentaçoes 3:22-23",
+]
+
+
+def medir(nome, funcao, entradas, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for texto in entradas:
+            try:
+                funcao(texto)
+            except ValueError:
+                pass
+    duracao = time.perf_counter() - inicio
+    n = repeticoes * len(entradas)
+    print(f"  {nome:<28} {n / duracao:>12,.0f} refs/s ({duracao / n * 1e6:6.2f} µs)")
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sem_cache = interpretar.__wrapped__
+
+    print("Interpretação:")
+    medir("exatas, sem cache", sem_cache, EXATAS, repeticoes)
+    # interpretar.__wrapped__ ainda passa pelo cache de encontrar_livro
+    medir("com erro, livro em cache", sem_cache, COM_ERRO, repeticoes)
+    medir("correção do livro, sem cache", encontrar_livro.__wrapped__,
+          [t.rsplit(' ', 1)[0] for t in COM_ERRO], repeticoes // 10)
+    medir("mistura, lru_cache", interpretar, EXATAS + COM_ERRO, repeticoes)
+    for texto in COM_ERRO:
+        try:
+            print(f"    {texto!r:<24} -> {interpretar(texto)}")
+        except ValueError as e:
+            print(f"    {texto!r:<24} !! {e}")
+
+    rng = random.Random(SEMENTE)
+    with tempfile.TemporaryDirectory() as diretorio:
+        corpus_sintetico.preparar(diretorio)
+        store = BibliaStore(os.path.join(diretorio, 'nvi.sbib'))
+        trechos = []
+        for _ in range(2000):
+            livro = rng.randrange(store.n_livros)
+            capitulo = rng.randint(1, store.n_capitulos(livro))
+            n = store.n_versiculos(livro, capitulo)
+            primeiro = rng.randint(1, n)
+            trechos.append((livro, capitulo, primeiro, min(n, primeiro + rng.randint(4, 20))))
+        versos = sum(fim - inicio + 1 for _, _, inicio, fim in trechos)
+
+        print(f"\nLeitura de {len(trechos)} trechos ({versos} versículos) na Bíblia local:")
+        inicio_t = time.perf_counter()
+        for livro, capitulo, inicio, fim in trechos:
+            store.versiculos(store.indice(livro, capitulo, inicio), store.indice(livro, capitulo, fim))
+        lote = time.perf_counter() - inicio_t
+
+        inicio_t = time.perf_counter()
+        for livro, capitulo, inicio, fim in trechos:
+            abrev = store.livros[livro]['abrev']
+            for numero in range(inicio, fim + 1):
+                store.buscar(abrev, capitulo, numero)
+        um_a_um = time.perf_counter() - inicio_t
+        store.close()
+
+    print(f"  {'versiculos() por trecho':<28} {len(trechos) / lote:>12,.0f} trechos/s")
+    print(f"  {'buscar() por versículo':<28} {len(trechos) / um_a_um:>12,.0f} trechos/s ({um_a_um / lote:.1f}x mais lento)")
+    print(f"\n{len(LIVROS)} livros")
+
+
+if __name__ == '__main__':
+    main()
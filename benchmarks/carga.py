@@ -0,0 +1,300 @@
+"""Teste de carga offline de todos os comandos, com os handlers reais do bot.
+
+O bot de ``main.py`` conecta ao Discord falso de ``benchmarks.mock_discord``
+(gateway + REST) e os eventos INTERACTION_CREATE / MESSAGE_CREATE são
+injetados pelo gateway, passando por todo o caminho do discord.py. A API
+bíblica é o servidor local de ``benchmarks.bench_biblia_api`` (modo ``api``)
+ou a Bíblia local gerada por ``benchmarks.corpus_sintetico`` (modo ``local``).
+
+Para cada comando são reportados: vazão (comandos/s), latência p50/p99 do
+evento até o fim do handler, chamadas REST por comando e o travamento do
+event loop (maior atraso e tempo total acima de 10ms) durante a rodada.
+
+Uso::
+
+    python -m benchmarks.carga [--n 200] [--concorrencia 20] [--modo local|api]
+                               [--json resultado.json] [--comparar base.json]
+
+Com a mesma semente e os mesmos parâmetros as rodadas são comparáveis;
+``--comparar`` mostra a variação em relação a um resultado salvo.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks import bench_biblia_api, corpus_sintetico
+from benchmarks.mock_discord import (BOT_ID, DONO_ID, MockDiscord, membro_payload,
+                                     mensagem_payload, usuario)
+
+TODAS_PERMISSOES = str((1 << 53) - 1)
+ALVO_ID = 900_000_000_000_000_100
+
+# nome, tipo ('slash' ou 'prefixo'), opções ou conteúdo
+CENARIOS = [
+    ('ajuda', 'slash', []),
+    ('ping', 'slash', []),
+    ('piada', 'slash', []),
+    ('info-servidor', 'slash', []),
+    ('info-usuario', 'slash', [{'name': 'membro', 'type': 6, 'value': str(ALVO_ID)}]),
+    ('expulsar', 'slash', [{'name': 'membro', 'type': 6, 'value': str(ALVO_ID)},
+                           {'name': 'motivo', 'type': 3, 'value': 'carga'}]),
+    ('banir', 'slash', [{'name': 'membro', 'type': 6, 'value': str(ALVO_ID)},
+                        {'name': 'motivo', 'type': 3, 'value': 'carga'}]),
+    ('silenciar', 'slash', [{'name': 'membro', 'type': 6, 'value': str(ALVO_ID)},
+                            {'name': 'motivo', 'type': 3, 'value': 'carga'}]),
+    ('limpar', 'slash', [{'name': 'quantidade', 'type': 4, 'value': 50}]),
+    ('lembrar', 'slash', [{'name': 'minutos', 'type': 4, 'value': 60},
+                          {'name': 'mensagem', 'type': 3, 'value': 'beber água'}]),
+    ('versiculo', 'prefixo', '*versiculo joão 3 16'),
+    ('versiculo_canal', 'prefixo', '*versiculo joão 3 16 <#{outro_canal}>'),
+    ('passagem', 'prefixo', '*versiculo 1 Coríntios 13:4-7'),
+    ('versiculo_diario', 'prefixo', '*versiculo_diario'),
+    ('pesquisar_biblia', 'prefixo', '*pesquisar_biblia amor'),
+]
+
+
+class Sentinela:
+    """Mede o atraso do event loop acordando a cada ``intervalo`` segundos."""
+
+    def __init__(self, intervalo=0.005, limiar=0.010):
+        self.intervalo = intervalo
+        self.limiar = limiar
+        self.maximo = 0.0
+        self.travado = 0.0
+        self._task = None
+
+    def reiniciar(self):
+        self.maximo = self.travado = 0.0
+
+    async def _rodar(self):
+        while True:
+            inicio = time.perf_counter()
+            await asyncio.sleep(self.intervalo)
+            atraso = time.perf_counter() - inicio - self.intervalo
+            self.maximo = max(self.maximo, atraso)
+            if atraso > self.limiar:
+                self.travado += atraso
+
+    def start(self):
+        self._task = asyncio.create_task(self._rodar())
+
+    def stop(self):
+        self._task.cancel()
+
+
+class Carga:
+    def __init__(self, mock, bot, guild_id, canal_id, outro_canal_id=None):
+        self.mock = mock
+        self.bot = bot
+        self.guild_id = guild_id
+        self.canal_id = canal_id
+        self.outro_canal_id = outro_canal_id
+        self._pendentes = {}
+        self.erros = 0
+
+        bot.add_listener(self._fim_slash, 'on_app_command_completion')
+        bot.add_listener(self._fim_prefixo, 'on_command_completion')
+        bot.add_listener(self._erro_prefixo, 'on_command_error')
+        tratador = bot.tree.on_error
+
+        async def on_error(interaction, error):
+            try:
+                await tratador(interaction, error)
+            finally:
+                self._concluir(interaction.id, erro=True)
+
+        bot.tree.on_error = on_error
+
+    def _concluir(self, evento_id, erro=False):
+        futuro = self._pendentes.pop(evento_id, None)
+        if futuro and not futuro.done():
+            futuro.set_result(erro)
+
+    async def _fim_slash(self, interaction, command):
+        self._concluir(interaction.id)
+
+    async def _fim_prefixo(self, ctx):
+        self._concluir(ctx.message.id)
+
+    async def _erro_prefixo(self, ctx, error):
+        self._concluir(ctx.message.id, erro=True)
+
+    def _interacao(self, evento_id, nome, opcoes):
+        autor = usuario(DONO_ID, 'dono')
+        alvo = usuario(ALVO_ID, 'alvo')
+        return {
+            'id': str(evento_id), 'application_id': str(BOT_ID), 'type': 2, 'version': 1,
+            'token': f'token-{evento_id}', 'guild_id': str(self.guild_id),
+            'channel_id': str(self.canal_id),
+            'channel': {'id': str(self.canal_id), 'type': 0, 'guild_id': str(self.guild_id)},
+            'member': {**membro_payload(autor), 'permissions': TODAS_PERMISSOES},
+            'app_permissions': TODAS_PERMISSOES, 'attachment_size_limit': 8 << 20, 'locale': 'pt-BR', 'guild_locale': 'pt-BR',
+            'entitlements': [], 'authorizing_integration_owners': {}, 'context': 0,
+            'data': {
+                'id': str(evento_id), 'name': nome, 'type': 1, 'options': opcoes,
+                'resolved': {'users': {str(ALVO_ID): alvo},
+                             'members': {str(ALVO_ID): {k: v for k, v in membro_payload(alvo).items()
+                                                        if k != 'user'}}},
+            },
+        }
+
+    def _mensagem(self, evento_id, conteudo):
+        autor = usuario(DONO_ID, 'dono')
+        conteudo = conteudo.replace('{outro_canal}', str(self.outro_canal_id))
+        payload = mensagem_payload(evento_id, self.canal_id, autor, conteudo)
+        payload['guild_id'] = str(self.guild_id)
+        payload['member'] = {k: v for k, v in membro_payload(autor).items() if k != 'user'}
+        return payload
+
+    async def enviar(self, tipo, nome, dados, latencias):
+        """Injeta um comando e espera o fim do handler; retorna True se deu erro."""
+        evento_id = self.mock.novo_id()
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes[evento_id] = futuro
+        inicio = time.perf_counter()
+        if tipo == 'slash':
+            await self.mock.dispatch('INTERACTION_CREATE', self._interacao(evento_id, nome, dados))
+        else:
+            await self.mock.dispatch('MESSAGE_CREATE', self._mensagem(evento_id, dados))
+        try:
+            erro = await asyncio.wait_for(futuro, timeout=30)
+        except asyncio.TimeoutError:
+            self._pendentes.pop(evento_id, None)
+            erro = True
+        latencias.append(time.perf_counter() - inicio)
+        return erro
+
+    async def rodar(self, cenario, n, concorrencia, sentinela):
+        nome, tipo, dados = cenario
+        semaforo = asyncio.Semaphore(concorrencia)
+        latencias = []
+
+        async def um():
+            async with semaforo:
+                return await self.enviar(tipo, nome, dados, latencias)
+
+        chamadas_antes = sum(self.mock.chamadas.values())
+        sentinela.reiniciar()
+        inicio = time.perf_counter()
+        erros = sum(await asyncio.gather(*(um() for _ in range(n))))
+        duracao = time.perf_counter() - inicio
+        # Espera respostas REST ainda em voo (ex.: edições após o fim do handler)
+        await asyncio.sleep(0.05)
+        rest = sum(self.mock.chamadas.values()) - chamadas_antes
+
+        latencias.sort()
+        return {
+            'comando': nome, 'n': n, 'erros': erros,
+            'vazao': n / duracao,
+            'p50_ms': statistics.median(latencias) * 1000,
+            'p99_ms': latencias[max(0, int(len(latencias) * 0.99) - 1)] * 1000,
+            'rest_por_comando': rest / n,
+            'loop_max_ms': sentinela.maximo * 1000,
+            'loop_travado_ms': sentinela.travado * 1000,
+        }
+
+
+def _preparar_ambiente(args, diretorio, mock, api_url):
+    os.environ.update({
+        'DISCORD_TOKEN': 'carga',
+        'DISCORD_API_URL': mock.api_url,
+        'DISCORD_GATEWAY_URL': mock.gateway_url,
+        'SHARD_COUNT': '1',
+        'CLUSTER_SHARDS': '0',
+        'BOT_DB': os.path.join(diretorio, 'bot.db'),
+        'BIBLIA_API_URL': api_url,
+        'MEMBROS_POLITICA': 'sob_demanda',
+        'LOG_ARQUIVO': os.path.join(diretorio, 'bot.jsonl'),
+    })
+    if args.modo == 'local':
+        sbib, sidx = corpus_sintetico.preparar(diretorio)
+        os.environ.update({'BIBLIA_CORPUS': sbib, 'BIBLIA_INDICE': sidx})
+    else:
+        os.environ.update({'BIBLIA_CORPUS': '', 'BIBLIA_INDICE': ''})
+
+
+def _imprimir(resultados, base=None):
+    base = {r['comando']: r for r in (base or [])}
+    print(f"{'comando':<18}{'n':>5}{'erros':>6}{'cmd/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'REST/cmd':>9}{'loop máx':>10}{'travado':>9}")
+    for r in resultados:
+        linha = (f"{r['comando']:<18}{r['n']:>5}{r['erros']:>6}{r['vazao']:>9.1f}{r['p50_ms']:>9.2f}"
+                 f"{r['p99_ms']:>9.2f}{r['rest_por_comando']:>9.2f}{r['loop_max_ms']:>8.1f}ms"
+                 f"{r['loop_travado_ms']:>7.0f}ms")
+        anterior = base.get(r['comando'])
+        if anterior:
+            delta = (r['p50_ms'] - anterior['p50_ms']) / anterior['p50_ms'] * 100 if anterior['p50_ms'] else 0
+            linha += f"  (p50 {delta:+.0f}%, REST {r['rest_por_comando'] - anterior['rest_por_comando']:+.2f})"
+        print(linha)
+
+
+async def executar(args):
+    diretorio = tempfile.mkdtemp(prefix='carga_')
+    mock = await MockDiscord(guilds=1, shards=1, latencia=args.latencia_rest / 1000).start()
+    biblia_runner, api_url = await bench_biblia_api.iniciar_servidor(args.latencia_api / 1000)
+    _preparar_ambiente(args, diretorio, mock, api_url)
+
+    import main  # só depois do ambiente configurado
+
+    bot = main.bot
+    bot.biblia.orcamento = None
+    tarefa_bot = asyncio.create_task(bot.start(os.environ['DISCORD_TOKEN']))
+    await asyncio.wait_for(bot.wait_until_ready(), timeout=60)
+    # A carga vem toda de um só usuário; os limites de uso recusariam quase tudo
+    # (os dos comandos só existem depois que as extensões carregam)
+    for limite in main.LIMITES:
+        limite.vezes, limite.taxa = 10**9, 10**9 / limite.por
+
+    guild = bot.guilds[0]
+    carga = Carga(mock, bot, guild.id, guild.text_channels[0].id, guild.text_channels[1].id)
+    sentinela = Sentinela()
+    sentinela.start()
+
+    filtro = set(args.comandos.split(',')) if args.comandos else None
+    resultados = []
+    for cenario in CENARIOS:
+        if filtro and cenario[0] not in filtro:
+            continue
+        # Aquecimento: caches, conexões e primeira importação de caminhos frios
+        await carga.rodar(cenario, min(5, args.n), 1, sentinela)
+        resultados.append(await carga.rodar(cenario, args.n, args.concorrencia, sentinela))
+
+    sentinela.stop()
+    await bot.close()
+    await tarefa_bot
+    await mock.stop()
+    await biblia_runner.cleanup()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga offline dos comandos do bot")
+    parser.add_argument('--n', type=int, default=200, help="comandos por cenário")
+    parser.add_argument('--concorrencia', type=int, default=20)
+    parser.add_argument('--modo', choices=('local', 'api'), default='local')
+    parser.add_argument('--latencia-rest', type=float, default=0.0, help="latência do REST falso (ms)")
+    parser.add_argument('--latencia-api', type=float, default=20.0, help="latência da API bíblica falsa (ms)")
+    parser.add_argument('--comandos', help="lista separada por vírgulas (padrão: todos)")
+    parser.add_argument('--json', help="grava os resultados neste arquivo")
+    parser.add_argument('--comparar', help="compara com um resultado salvo com --json")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(executar(args))
+    base = None
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)['resultados']
+    _imprimir(resultados, base)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'parametros': vars(args), 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
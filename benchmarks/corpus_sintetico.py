@@ -0,0 +1,81 @@
+"""Gera um corpus bíblico sintético para os benchmarks.
+
+O tamanho (66 livros, ~31 mil versículos) e a distribuição das palavras
+(Zipf) imitam uma tradução real, mas o texto é aleatório e reprodutível.
+"""
+
+import json
+import os
+import random
+
+from core import biblia_busca, biblia_store
+
+LIVROS = [
+    ('Gênesis', 'gn'), ('Êxodo', 'ex'), ('Levítico', 'lv'), ('Números', 'nm'),
+    ('Deuteronômio', 'dt'), ('Josué', 'js'), ('Juízes', 'jz'), ('Rute', 'rt'),
+    ('1 Samuel', '1sm'), ('2 Samuel', '2sm'), ('1 Reis', '1rs'), ('2 Reis', '2rs'),
+    ('1 Crônicas', '1cr'), ('2 Crônicas', '2cr'), ('Esdras', 'ed'), ('Neemias', 'ne'),
+    ('Ester', 'et'), ('Jó', 'jó'), ('Salmos', 'sl'), ('Provérbios', 'pv'),
+    ('Eclesiastes', 'ec'), ('Cânticos', 'ct'), ('Isaías', 'is'), ('Jeremias', 'jr'),
+    ('Lamentações', 'lm'), ('Ezequiel', 'ez'), ('Daniel', 'dn'), ('Oséias', 'os'),
+    ('Joel', 'jl'), ('Amós', 'am'), ('Obadias', 'ob'), ('Jonas', 'jn'),
+    ('Miquéias', 'mq'), ('Naum', 'na'), ('Habacuque', 'hc'), ('Sofonias', 'sf'),
+    ('Ageu', 'ag'), ('Zacarias', 'zc'), ('Malaquias', 'ml'), ('Mateus', 'mt'),
+    ('Marcos', 'mc'), ('Lucas', 'lc'), ('João', 'jo'), ('Atos', 'at'),
+    ('Romanos', 'rm'), ('1 Coríntios', '1co'), ('2 Coríntios', '2co'), ('Gálatas', 'gl'),
+    ('Efésios', 'ef'), ('Filipenses', 'fp'), ('Colossenses', 'cl'),
+    ('1 Tessalonicenses', '1ts'), ('2 Tessalonicenses', '2ts'), ('1 Timóteo', '1tm'),
+    ('2 Timóteo', '2tm'), ('Tito', 'tt'), ('Filemom', 'fm'), ('Hebreus', 'hb'),
+    ('Tiago', 'tg'), ('1 Pedro', '1pe'), ('2 Pedro', '2pe'), ('1 João', '1jo'),
+    ('2 João', '2jo'), ('3 João', '3jo'), ('Judas', 'jd'), ('Apocalipse', 'ap'),
+]
+
+COMUNS = ('o a de que e do da em para não se os com por senhor deus '
+          'ele seu sua povo terra filho rei israel coração palavra amor').split()
+
+JOAO_3_16 = ("Porque Deus tanto amou o mundo que deu o seu Filho Unigênito, para que "
+             "todo o que nele crer não pereça, mas tenha a vida eterna.")
+
+
+def gerar(semente=42, versos=31_000, vocabulario=12_000):
+    rng = random.Random(semente)
+    silabas = ['ba', 'ca', 'da', 'fé', 'ga', 'la', 'mã', 'na', 'pa', 'ra', 'sa', 'ta',
+               'vi', 'zo', 'lu', 'mi', 'ção', 'ro', 'te', 'ni']
+    raras = sorted({''.join(rng.choice(silabas) for _ in range(rng.randint(2, 4)))
+                    for _ in range(vocabulario)})
+    palavras = COMUNS + raras
+    pesos = [1 / (i + 1) for i in range(len(palavras))]
+
+    caps_por_livro = max(1, versos // (len(LIVROS) * 24))
+    corpus = []
+    for nome, abrev in LIVROS:
+        capitulos = []
+        for _ in range(rng.randint(caps_por_livro // 2 + 1, caps_por_livro * 3 // 2 + 1)):
+            capitulos.append([
+                ' '.join(rng.choices(palavras, pesos, k=rng.randint(8, 40))).capitalize() + '.'
+                for _ in range(rng.randint(12, 36))
+            ])
+        corpus.append({'name': nome, 'abbrev': abrev, 'chapters': capitulos})
+
+    joao = corpus[42]['chapters']
+    while len(joao) < 3:
+        joao.append(['.'])
+    while len(joao[2]) < 16:
+        joao[2].append('.')
+    joao[2][15] = JOAO_3_16
+    return corpus
+
+
+def preparar(diretorio, **kwargs):
+    """Grava corpus, arquivo de versículos e índice em ``diretorio``."""
+    os.makedirs(diretorio, exist_ok=True)
+    corpus = os.path.join(diretorio, 'corpus.json')
+    sbib = os.path.join(diretorio, 'nvi.sbib')
+    sidx = os.path.join(diretorio, 'nvi.sidx')
+    with open(corpus, 'w', encoding='utf-8') as f:
+        json.dump(gerar(**kwargs), f, ensure_ascii=False)
+    biblia_store.build(corpus, sbib)
+    store = biblia_store.BibliaStore(sbib)
+    biblia_busca.build(store, sidx)
+    store.close()
+    return sbib, sidx
@@ -0,0 +1,305 @@
+"""Discord falso (REST + gateway) para rodar o bot localmente sem rede.
+
+Implementa só o necessário para o bot conectar e responder: login,
+``/gateway/bot``, IDENTIFY/READY/GUILD_CREATE por shard, heartbeats,
+sincronização de comandos e um ``200`` genérico (com contagem por rota) para
+as demais chamadas REST.
+
+Uso isolado, por exemplo para testar os clusters::
+
+    python -m benchmarks.mock_discord --guilds 2000 --shards 4
+    DISCORD_TOKEN=x DISCORD_API_URL=http://127.0.0.1:8765/api/v10 \\
+        DISCORD_GATEWAY_URL=ws://127.0.0.1:8765/gateway python main.py cluster 2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import time
+from collections import Counter
+
+from aiohttp import WSMsgType, web
+
+BOT_ID = 900_000_000_000_000_001
+DONO_ID = 900_000_000_000_000_002
+SPAM_ID = 900_000_000_000_000_003
+PRIMEIRO_GUILD = 1_000_000_000_000_000_000
+
+DISCORD_EPOCH = 1420070400000
+
+_SNOWFLAKE = re.compile(r'/\d{15,}')
+
+
+def usuario(user_id, nome, bot=False):
+    return {'id': str(user_id), 'username': nome, 'discriminator': '0',
+            'global_name': None, 'avatar': None, 'bot': bot}
+
+
+def membro_payload(user, roles=()):
+    return {'user': user, 'roles': [str(r) for r in roles], 'joined_at': '2024-01-01T00:00:00+00:00',
+            'deaf': False, 'mute': False, 'flags': 0, 'nick': None}
+
+
+def mensagem_payload(message_id, canal_id, autor, conteudo='', embeds=()):
+    return {
+        'id': str(message_id), 'channel_id': str(canal_id), 'author': autor, 'content': conteudo,
+        'timestamp': '2024-01-01T00:00:00+00:00', 'edited_timestamp': None, 'tts': False,
+        'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [],
+        'embeds': list(embeds), 'pinned': False, 'type': 0,
+    }
+
+
+def _cargo(role_id, nome, posicao, permissoes=0):
+    return {'id': str(role_id), 'name': nome, 'permissions': str(permissoes), 'position': posicao,
+            'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}
+
+
+def guild_payload(guild_id, n_canais=3):
+    canais = [
+        {'id': str(guild_id + 1 + i), 'type': 0, 'name': f'canal-{i}', 'position': i,
+         'guild_id': str(guild_id), 'permission_overwrites': [], 'nsfw': False, 'parent_id': None}
+        for i in range(n_canais)
+    ]
+    return {
+        'id': str(guild_id), 'name': f'Servidor {guild_id}', 'owner_id': str(DONO_ID),
+        'member_count': 2, 'large': False, 'features': [], 'emojis': [], 'stickers': [],
+        'roles': [_cargo(guild_id, '@everyone', 0, (1 << 53) - 1),
+                  _cargo(guild_id + 100, 'Muted', 1),
+                  _cargo(guild_id + 101, 'Soninho', 10, (1 << 53) - 1)],
+        'channels': canais, 'threads': [], 'voice_states': [], 'presences': [],
+        'members': [membro_payload(usuario(BOT_ID, 'soninho', bot=True), [guild_id + 101])],
+        'system_channel_id': canais[0]['id'] if canais else None,
+        'unavailable': False,
+    }
+
+
+def _json(dados):
+    # O discord.py só decodifica quando o content-type é exatamente application/json
+    return web.Response(body=json.dumps(dados).encode(), headers={'Content-Type': 'application/json'})
+
+
+class MockDiscord:
+    """``historico`` mensagens por canal, uma a cada ``espacamento`` segundos
+    para trás a partir do início do mock; um terço delas é spam de um bot com
+    link e uma em cada cinco tem anexo."""
+
+    def __init__(self, *, guilds=10, shards=1, porta=0, latencia=0.0, historico=10_000, espacamento=180.0):
+        self.n_guilds = guilds
+        self.shards = shards
+        self.porta = porta
+        self.latencia = latencia
+        self.guilds = [PRIMEIRO_GUILD + (i << 22) for i in range(guilds)]
+        self.chamadas = Counter()
+        self.identifies = Counter()
+        self.conexoes = {}
+        self._ids = itertools.count(PRIMEIRO_GUILD * 2)
+        self._runner = None
+        self.historico = historico
+        self._espacamento_ms = int(espacamento * 1000)
+        self._agora_ms = int(time.time() * 1000)
+
+    @property
+    def api_url(self):
+        return f'http://127.0.0.1:{self.porta}/api/v10'
+
+    @property
+    def gateway_url(self):
+        return f'ws://127.0.0.1:{self.porta}/gateway'
+
+    def shard_de(self, guild_id):
+        return (guild_id >> 22) % self.shards
+
+    def novo_id(self):
+        return next(self._ids)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/gateway', self._gateway)
+        app.router.add_get('/api/v10/users/@me', self._eu)
+        app.router.add_get('/api/v10/oauth2/applications/@me', self._aplicacao)
+        app.router.add_get('/api/v10/gateway/bot', self._gateway_bot)
+        app.router.add_put('/api/v10/applications/{app}/commands', self._comandos)
+        app.router.add_put('/api/v10/applications/{app}/guilds/{guild}/commands', self._comandos)
+        app.router.add_route('*', '/api/v10/{caminho:.*}', self._generico)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.porta)
+        await site.start()
+        self.porta = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        for ws in list(self.conexoes.values()):
+            await ws.close()
+        await self._runner.cleanup()
+
+    def _contar(self, request):
+        rota = _SNOWFLAKE.sub('/{id}', request.path.removeprefix('/api/v10'))
+        self.chamadas[f'{request.method} {rota}'] += 1
+
+    async def _eu(self, request):
+        self._contar(request)
+        return _json(usuario(BOT_ID, 'soninho', bot=True))
+
+    async def _aplicacao(self, request):
+        self._contar(request)
+        return _json({
+            'id': str(BOT_ID), 'name': 'soninho', 'description': '', 'icon': None,
+            'bot_public': True, 'bot_require_code_grant': False, 'verify_key': '0' * 64,
+            'owner': usuario(DONO_ID, 'dono'), 'team': None, 'flags': 0,
+            'interactions_endpoint_url': None,
+        })
+
+    async def _gateway_bot(self, request):
+        self._contar(request)
+        return _json({
+            'url': self.gateway_url, 'shards': self.shards,
+            'session_start_limit': {'total': 1000, 'remaining': 1000,
+                                    'reset_after': 0, 'max_concurrency': 16},
+        })
+
+    async def _comandos(self, request):
+        self._contar(request)
+        comandos = await request.json()
+        for cmd in comandos:
+            cmd.update(id=str(self.novo_id()), application_id=str(BOT_ID), version='1')
+        return _json(comandos)
+
+    async def _generico(self, request):
+        self._contar(request)
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        if request.method == 'DELETE' or request.path.endswith('/bulk-delete') or '/roles/' in request.path:
+            return web.Response(status=204)
+        corpo = {}
+        if request.can_read_body and request.content_type == 'application/json':
+            corpo = await request.json()
+        return _json(self._resposta(request, corpo))
+
+    def _resposta(self, request, corpo):
+        """Resposta plausível para as rotas que o bot usa; eco do corpo para o resto."""
+        caminho, metodo = request.path, request.method
+        bot = usuario(BOT_ID, 'soninho', bot=True)
+
+        callback = re.search(r'/interactions/(\d+)/[^/]+/callback', caminho)
+        if callback:
+            return {'interaction': {'id': callback.group(1), 'type': 2}}
+
+        membro = re.search(r'/guilds/\d+/members/(\d+)$', caminho)
+        if membro and metodo == 'GET':
+            return membro_payload(usuario(int(membro.group(1)), f'membro{membro.group(1)}'))
+
+        canal = re.search(r'/channels/(\d+)/messages', caminho)
+        if canal and metodo == 'GET' and caminho.endswith('/messages'):
+            limite = min(int(request.query.get('limit', 50)), 100)
+            return self._historico(canal.group(1), limite, request.query.get('before'))
+
+        webhook = re.search(r'/webhooks/\d+/[^/]+', caminho)
+        if metodo in ('POST', 'PATCH') and (canal or webhook):
+            return mensagem_payload(
+                self.novo_id(), canal.group(1) if canal else PRIMEIRO_GUILD + 1, bot,
+                corpo.get('content') or '', corpo.get('embeds') or [],
+            )
+        return {'id': str(self.novo_id()), **corpo}
+
+    def _id_mensagem(self, i):
+        return ((self._agora_ms - i * self._espacamento_ms - DISCORD_EPOCH) << 22) + 1
+
+    def _historico(self, canal_id, limite, before):
+        """Página do histórico, da mais nova para a mais antiga, antes de ``before``."""
+        inicio = 0
+        if before:
+            ms = (int(before) >> 22) + DISCORD_EPOCH
+            inicio = max(0, -(-(self._agora_ms - ms) // self._espacamento_ms))
+            if self._id_mensagem(inicio) >= int(before):
+                inicio += 1
+        pagina = []
+        for i in range(inicio, min(inicio + limite, self.historico)):
+            if i % 3 == 0:
+                msg = mensagem_payload(self._id_mensagem(i), canal_id, usuario(SPAM_ID, 'spammer', bot=True),
+                                       f'compre agora https://spam.example/{i}')
+            else:
+                msg = mensagem_payload(self._id_mensagem(i), canal_id, usuario(DONO_ID, 'dono'), f'mensagem {i}')
+            if i % 5 == 0:
+                msg['attachments'] = [{'id': str(self._id_mensagem(i)), 'filename': 'a.png', 'size': 1,
+                                       'url': 'https://cdn.example/a.png', 'proxy_url': 'https://cdn.example/a.png'}]
+            pagina.append(msg)
+        return pagina
+
+    async def dispatch(self, evento, dados, shard=0):
+        """Envia um evento DISPATCH para a conexão do shard."""
+        ws = self.conexoes[shard]
+        ws.seq += 1
+        await ws.send_str(json.dumps({'op': 0, 't': evento, 's': ws.seq, 'd': dados}))
+
+    async def _gateway(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        ws.seq = 0
+        shard = None
+        await ws.send_str(json.dumps({'op': 10, 'd': {'heartbeat_interval': 41250}}))
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            op = payload['op']
+            if op == 1:
+                await ws.send_str(json.dumps({'op': 11}))
+            elif op == 2:
+                shard, total = payload['d'].get('shard', [0, 1])
+                self.identifies[shard] += 1
+                self.conexoes[shard] = ws
+                await self._identificar(ws, shard, total)
+            elif op == 6:
+                # Sem suporte a RESUME: força um novo IDENTIFY
+                await ws.send_str(json.dumps({'op': 9, 'd': False}))
+            elif op == 8:
+                # Chunk de membros: o bot, o dono e o spammer, num único pedaço
+                await self.dispatch('GUILD_MEMBERS_CHUNK', {
+                    'guild_id': payload['d']['guild_id'], 'nonce': payload['d'].get('nonce'),
+                    'chunk_index': 0, 'chunk_count': 1,
+                    'members': [membro_payload(usuario(BOT_ID, 'soninho', bot=True)),
+                                membro_payload(usuario(DONO_ID, 'dono')),
+                                membro_payload(usuario(SPAM_ID, 'spammer', bot=True))],
+                }, shard)
+        if shard is not None and self.conexoes.get(shard) is ws:
+            del self.conexoes[shard]
+        return ws
+
+    async def _identificar(self, ws, shard, total):
+        meus = [g for g in self.guilds if (g >> 22) % total == shard]
+        ws.seq += 1
+        await ws.send_str(json.dumps({'op': 0, 't': 'READY', 's': ws.seq, 'd': {
+            'v': 10, 'user': usuario(BOT_ID, 'soninho', bot=True),
+            'guilds': [{'id': str(g), 'unavailable': True} for g in meus],
+            'session_id': f'sessao-{shard}-{time.time_ns()}',
+            'resume_gateway_url': self.gateway_url, 'shard': [shard, total],
+            'application': {'id': str(BOT_ID), 'flags': 0},
+        }}))
+        for g in meus:
+            await self.dispatch('GUILD_CREATE', guild_payload(g), shard)
+
+
+async def _executar(args):
+    mock = await MockDiscord(guilds=args.guilds, shards=args.shards, porta=args.porta).start()
+    print(f"DISCORD_API_URL={mock.api_url}")
+    print(f"DISCORD_GATEWAY_URL={mock.gateway_url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"IDENTIFY por shard: {dict(mock.identifies)}; chamadas REST: {sum(mock.chamadas.values())}")
+    finally:
+        await mock.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guilds', type=int, default=100)
+    parser.add_argument('--shards', type=int, default=2)
+    parser.add_argument('--porta', type=int, default=8765)
+    try:
+        asyncio.run(_executar(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1 @@
+"""Subsistemas de suporte do bot (HTTP, armazenamento, agendamento...)."""
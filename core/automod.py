@@ -0,0 +1,343 @@
+"""Automod: palavras proibidas, convites, domínios bloqueados e spam.
+
+Roda em toda mensagem de servidor, então o caminho comum precisa ser barato:
+
+- servidor sem automod ativo: um ``dict.get``;
+- palavras proibidas: uma única regex por servidor, montada a partir de uma
+  trie das palavras (o motor de regex do Python não fatora alternativas
+  sozinho, então ``a|ab|abc`` vira ``a(?:b(?:c)?)?``). Ela só é recompilada
+  quando as palavras daquele servidor mudam, e listas iguais em servidores
+  diferentes compartilham a mesma regex compilada;
+- convites e links: só procurados se a mensagem tem ``://`` ou ``.gg/``;
+- spam: janelas deslizantes curtas por usuário (mensagens repetidas, excesso
+  de menções) e por canal (a mesma mensagem colada por várias contas). Durante
+  uma rajada de entradas (``rajada(guild_id)``, o sinal das boas-vindas) o
+  limite por canal é menor, já que é assim que um raid de contas novas chega.
+
+As janelas ficam em ``OrderedDict`` ordenados pelo último uso; entradas
+paradas há mais de uma janela saem da frente a cada mensagem, então a memória
+acompanha só quem falou nos últimos segundos.
+
+``verificar`` é síncrono e não faz chamadas REST; ``aplicar`` executa a ação
+configurada (apagar, silenciar com o cargo Muted ou expulsar).
+"""
+
+import functools
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+
+import discord
+
+from core.texto import dobrar
+
+logger = logging.getLogger('discord_bot.automod')
+
+ACOES = ('apagar', 'silenciar', 'expulsar')
+TIPOS = ('palavra', 'dominio')
+
+# Janelas de spam
+JANELA = 10.0
+REPETICOES_USUARIO = 3   # a mesma mensagem do mesmo usuário dentro da janela
+REPETICOES_CANAL = 5     # a mesma mensagem no canal, de qualquer usuário
+REPETICOES_CANAL_RAJADA = 3  # idem, durante uma rajada de entradas no servidor
+MIN_CARACTERES_CANAL = 10  # "ok", "kkkk" etc. se repetem naturalmente num canal
+MENCOES_MENSAGEM = 6     # menções numa única mensagem
+MENCOES_JANELA = 10      # menções somadas de um usuário dentro da janela
+
+_CONVITE = re.compile(r'(?:discord(?:app)?\.com/invite|discord\.gg)/[\w-]+', re.IGNORECASE)
+_HOST = re.compile(r'https?://([^/\s:?#]+)', re.IGNORECASE)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS automod_config (
+    guild_id INTEGER PRIMARY KEY,
+    ativo INTEGER NOT NULL,
+    acao TEXT NOT NULL,
+    convites INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS automod_termos (
+    guild_id INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (guild_id, tipo, valor)
+);
+"""
+
+
+def _trie_regex(no):
+    fim = '' in no
+    ramos = [re.escape(c) + _trie_regex(filho) for c, filho in sorted(no.items()) if c]
+    if not ramos:
+        return ''
+    if len(ramos) == 1 and not fim:
+        return ramos[0]
+    return '(?:' + '|'.join(ramos) + ')' + ('?' if fim else '')
+
+
+@functools.lru_cache(maxsize=256)
+def compilar_palavras(palavras):
+    """Regex única para uma tupla ordenada de palavras já dobradas."""
+    trie = {}
+    for palavra in palavras:
+        no = trie
+        for c in palavra:
+            no = no.setdefault(c, {})
+        no[''] = {}
+    return re.compile(r'(?<!\w)' + _trie_regex(trie) + r'(?!\w)')
+
+
+class Violacao:
+    __slots__ = ('motivo', 'detalhe')
+
+    def __init__(self, motivo, detalhe=''):
+        self.motivo = motivo
+        self.detalhe = detalhe
+
+
+class RegrasGuild:
+    __slots__ = ('ativo', 'acao', 'convites', 'palavras', 'dominios', '_regex')
+
+    def __init__(self, ativo=False, acao='apagar', convites=True):
+        self.ativo = ativo
+        self.acao = acao
+        self.convites = convites
+        self.palavras = set()
+        self.dominios = set()
+        self._regex = None
+
+    @property
+    def regex(self):
+        if self._regex is None and self.palavras:
+            self._regex = compilar_palavras(tuple(sorted(self.palavras)))
+        return self._regex
+
+    def invalidar(self):
+        self._regex = None
+
+    def dominio_bloqueado(self, host):
+        host = host.lower().rstrip('.')
+        while host:
+            if host in self.dominios:
+                return host
+            _, _, host = host.partition('.')
+        return None
+
+
+class _Janela:
+    __slots__ = ('eventos', 'ultimo')
+
+    def __init__(self):
+        self.eventos = deque(maxlen=10)
+        self.ultimo = 0.0
+
+
+class _JanelaCanal:
+    """Mensagens recentes do canal com a contagem por conteúdo, atualizada em O(1)."""
+
+    __slots__ = ('eventos', 'contagem', 'ultimo')
+
+    def __init__(self):
+        self.eventos = deque()
+        self.contagem = {}
+        self.ultimo = 0.0
+
+    def registrar(self, assinatura, agora):
+        """Quantas vezes ``assinatura`` apareceu na janela, contando esta."""
+        eventos, contagem = self.eventos, self.contagem
+        limite = agora - JANELA
+        while eventos and eventos[0][0] < limite:
+            _, antiga = eventos.popleft()
+            restantes = contagem[antiga] - 1
+            if restantes:
+                contagem[antiga] = restantes
+            else:
+                del contagem[antiga]
+        eventos.append((agora, assinatura))
+        vezes = contagem[assinatura] = contagem.get(assinatura, 0) + 1
+        return vezes
+
+
+class Automod:
+    def __init__(self, db, *, cargos_muted=None, casos=None, metricas=None, rajada=None, relogio=time.monotonic):
+        self.db = db
+        self.cargos_muted = cargos_muted
+        self.casos = casos
+        self.metricas = metricas
+        self._rajada = rajada or (lambda guild_id: False)
+        self._relogio = relogio
+        self.regras = {}
+        self._usuarios = OrderedDict()   # (guild_id, usuario_id) -> _Janela de (t, hash, menções)
+        self._canais = OrderedDict()     # canal_id -> _JanelaCanal
+        self._punidos = OrderedDict()    # (guild_id, usuario_id) -> t da última punição
+        if metricas is not None:
+            metricas.descrever('automod_violacoes_total', 'Mensagens barradas pelo automod, por motivo')
+
+    async def start(self):
+        await self.db.executescript(ESQUEMA)
+        for guild_id, ativo, acao, convites in await self.db.fetchall(
+            "SELECT guild_id, ativo, acao, convites FROM automod_config"
+        ):
+            self.regras[guild_id] = RegrasGuild(bool(ativo), acao, bool(convites))
+        for guild_id, tipo, valor in await self.db.fetchall(
+            "SELECT guild_id, tipo, valor FROM automod_termos"
+        ):
+            regras = self.regras.setdefault(guild_id, RegrasGuild())
+            (regras.palavras if tipo == 'palavra' else regras.dominios).add(valor)
+        ativos = sum(1 for r in self.regras.values() if r.ativo)
+        logger.info(f"Automod ativo em {ativos} servidor(es)")
+
+    # ===== Configuração =====
+
+    async def configurar(self, guild_id, *, ativo, acao='apagar', convites=True):
+        regras = self.regras.setdefault(guild_id, RegrasGuild())
+        regras.ativo, regras.acao, regras.convites = ativo, acao, convites
+        await self.db.execute(
+            "INSERT OR REPLACE INTO automod_config (guild_id, ativo, acao, convites) VALUES (?, ?, ?, ?)",
+            (guild_id, int(ativo), acao, int(convites)),
+        )
+        return regras
+
+    async def adicionar(self, guild_id, tipo, valor):
+        valor = dobrar(valor.strip()) if tipo == 'palavra' else valor.strip().lower().rstrip('.')
+        regras = self.regras.setdefault(guild_id, RegrasGuild())
+        conjunto = regras.palavras if tipo == 'palavra' else regras.dominios
+        if not valor or valor in conjunto:
+            return False
+        conjunto.add(valor)
+        regras.invalidar()
+        await self.db.execute(
+            "INSERT OR IGNORE INTO automod_termos (guild_id, tipo, valor) VALUES (?, ?, ?)",
+            (guild_id, tipo, valor),
+        )
+        return True
+
+    async def remover(self, guild_id, tipo, valor):
+        valor = dobrar(valor.strip()) if tipo == 'palavra' else valor.strip().lower().rstrip('.')
+        regras = self.regras.get(guild_id)
+        conjunto = None if regras is None else regras.palavras if tipo == 'palavra' else regras.dominios
+        if conjunto is None or valor not in conjunto:
+            return False
+        conjunto.discard(valor)
+        regras.invalidar()
+        await self.db.execute(
+            "DELETE FROM automod_termos WHERE guild_id = ? AND tipo = ? AND valor = ?",
+            (guild_id, tipo, valor),
+        )
+        return True
+
+    # ===== Verificação =====
+
+    def _janela(self, mapa, chave, tipo, agora):
+        # Descarta da frente as entradas paradas há mais de uma janela
+        while mapa:
+            primeira = next(iter(mapa))
+            if agora - mapa[primeira].ultimo <= JANELA:
+                break
+            del mapa[primeira]
+        janela = mapa.get(chave)
+        if janela is None:
+            janela = mapa[chave] = tipo()
+        else:
+            mapa.move_to_end(chave)
+        janela.ultimo = agora
+        return janela
+
+    def verificar(self, message):
+        """Violação encontrada na mensagem, ou None. Não faz chamadas REST."""
+        guild = message.guild
+        if guild is None or message.author.bot:
+            return None
+        regras = self.regras.get(guild.id)
+        if regras is None or not regras.ativo:
+            return None
+
+        conteudo = message.content
+        if regras.palavras and conteudo:
+            achado = regras.regex.search(dobrar(conteudo))
+            if achado:
+                return Violacao('palavra', achado.group())
+
+        if '://' in conteudo or '.gg/' in conteudo:
+            if regras.convites and _CONVITE.search(conteudo):
+                return Violacao('convite')
+            if regras.dominios:
+                for host in _HOST.findall(conteudo):
+                    bloqueado = regras.dominio_bloqueado(host)
+                    if bloqueado:
+                        return Violacao('dominio', bloqueado)
+
+        mencoes = len(message.mentions) + len(message.role_mentions) + (5 if message.mention_everyone else 0)
+        if mencoes >= MENCOES_MENSAGEM:
+            return Violacao('mencoes', str(mencoes))
+
+        agora = self._relogio()
+        limite = agora - JANELA
+        assinatura = hash(conteudo.casefold()) if conteudo else None
+
+        usuario = self._janela(self._usuarios, (guild.id, message.author.id), _Janela, agora)
+        repetidas = total_mencoes = 0
+        for t, h, m in usuario.eventos:
+            if t >= limite:
+                repetidas += h == assinatura
+                total_mencoes += m
+        usuario.eventos.append((agora, assinatura, mencoes))
+        if assinatura is not None and repetidas + 1 >= REPETICOES_USUARIO:
+            return Violacao('repeticao')
+        if mencoes and total_mencoes + mencoes >= MENCOES_JANELA:
+            return Violacao('mencoes', str(total_mencoes + mencoes))
+
+        if assinatura is not None and len(conteudo) >= MIN_CARACTERES_CANAL:
+            canal = self._janela(self._canais, message.channel.id, _JanelaCanal, agora)
+            maximo = REPETICOES_CANAL_RAJADA if self._rajada(guild.id) else REPETICOES_CANAL
+            if canal.registrar(assinatura, agora) >= maximo:
+                return Violacao('repeticao_canal')
+        return None
+
+    # ===== Ações =====
+
+    def isento(self, message):
+        """Moderadores e o dono não passam pelo automod (checado só quando há violação)."""
+        autor = message.author
+        return (autor.id == message.guild.owner_id
+                or getattr(autor, 'guild_permissions', discord.Permissions.none()).manage_messages)
+
+    async def aplicar(self, message, violacao):
+        """Apaga a mensagem e, uma vez por janela por usuário, aplica a ação configurada."""
+        guild = message.guild
+        regras = self.regras[guild.id]
+        if self.metricas is not None:
+            self.metricas.contar('automod_violacoes_total', motivo=violacao.motivo)
+
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            logger.warning(f"Automod não conseguiu apagar mensagem em {guild.id}: {e}")
+
+        agora = self._relogio()
+        chave = (guild.id, message.author.id)
+        while self._punidos and agora - next(iter(self._punidos.values())) > JANELA:
+            self._punidos.popitem(last=False)
+        if chave in self._punidos:
+            return
+        self._punidos[chave] = agora
+
+        motivo = f"Automod: {violacao.motivo}"
+        membro = message.author
+        aplicada = False
+        try:
+            if regras.acao == 'silenciar' and self.cargos_muted is not None:
+                role = self.cargos_muted.obter(guild)
+                if role is not None and role not in membro.roles:
+                    await membro.add_roles(role, reason=motivo)
+                    aplicada = True
+            elif regras.acao == 'expulsar':
+                await membro.kick(reason=motivo)
+                aplicada = True
+        except discord.HTTPException as e:
+            logger.warning(f"Automod não conseguiu aplicar '{regras.acao}' em {membro.id}: {e}")
+        if aplicada and self.casos is not None:
+            self.casos.registrar(guild.id, membro.id, guild.me.id, regras.acao, motivo)
+        logger.info(f"Automod em {guild.id}: {violacao.motivo} de {membro.id} ({regras.acao})")
@@ -0,0 +1,107 @@
+"""Cliente HTTP assíncrono e compartilhado para a API abibliadigital.com.br."""
+
+import asyncio
+import logging
+import time
+from urllib.parse import quote
+
+import aiohttp
+
+logger = logging.getLogger('discord_bot.biblia_api')
+
+BASE_URL = "https://www.abibliadigital.com.br/api"
+
+
+class BibliaAPI:
+    """Sessão aiohttp de vida longa com pool de conexões e concorrência limitada.
+
+    Uma única instância é criada no ``setup_hook`` do bot e fechada no
+    ``close``. Todas as consultas à API passam por aqui, então o event loop
+    nunca fica bloqueado esperando a rede. Com ``metricas`` (ver
+    ``core.metricas``), cada requisição registra latência e resultado.
+
+    ``orcamento`` é um ``core.limites.Limite`` global: sem tokens, a consulta
+    retorna None na hora, sem ir à rede nem esperar o semáforo.
+    """
+
+    def __init__(self, base_url=BASE_URL, *, max_concorrencia=8, timeout=10.0,
+                 limite_conexoes=16, keepalive=30.0, metricas=None, orcamento=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._limite_conexoes = limite_conexoes
+        self._keepalive = keepalive
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self._session = None
+        self.metricas = metricas
+        self.orcamento = orcamento
+        if metricas is not None:
+            metricas.descrever('biblia_api_requisicoes_total', 'Requisições à API bíblica por resultado')
+            metricas.descrever('biblia_api_latencia_segundos', 'Latência das requisições à API bíblica')
+
+    @property
+    def iniciado(self):
+        return self._session is not None and not self._session.closed
+
+    async def start(self):
+        if self.iniciado:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self._limite_conexoes,
+            keepalive_timeout=self._keepalive,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'Accept': 'application/json'},
+        )
+        logger.info(f"Cliente da API bíblica iniciado ({self.base_url})")
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, caminho, *, timeout=None):
+        """Faz um GET em ``caminho`` e retorna o JSON, ou None se o status não for 200.
+
+        ``timeout`` é o prazo total da requisição, incluindo a espera por uma
+        vaga no semáforo de concorrência.
+        """
+        if not self.iniciado:
+            raise RuntimeError("BibliaAPI.start() não foi chamado")
+
+        url = f"{self.base_url}/{caminho.lstrip('/')}"
+        if self.orcamento is not None and self.orcamento.consumir(None):
+            logger.warning(f"Orçamento da API bíblica esgotado, recusando {url}")
+            if self.metricas is not None:
+                self.metricas.contar('biblia_api_requisicoes_total', resultado='orcamento')
+            return None
+        prazo = timeout if timeout is not None else self.timeout
+
+        inicio = time.perf_counter()
+        resultado = 'erro'
+        try:
+            async with asyncio.timeout(prazo):
+                async with self._semaforo:
+                    inicio = time.perf_counter()
+                    async with self._session.get(url) as response:
+                        if response.status != 200:
+                            resultado = f'http_{response.status}'
+                            logger.warning(f"API bíblica respondeu {response.status} para {url}")
+                            return None
+                        dados = await response.json(content_type=None)
+                        resultado = 'ok'
+                        return dados
+        except TimeoutError:
+            resultado = 'timeout'
+            raise
+        finally:
+            if self.metricas is not None:
+                self.metricas.contar('biblia_api_requisicoes_total', resultado=resultado)
+                self.metricas.observar('biblia_api_latencia_segundos', time.perf_counter() - inicio)
+
+
+def segmento(valor):
+    """Escapa um valor para uso como segmento de caminho na URL."""
+    return quote(str(valor), safe='')
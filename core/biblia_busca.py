@@ -0,0 +1,327 @@
+"""Índice invertido local para pesquisa de texto nos versículos.
+
+Gerado a partir do arquivo de versículos (``core.biblia_store``)::
+
+    python -m core.biblia_busca build data/nvi.sbib data/nvi.sidx
+
+Layout do arquivo (little-endian)::
+
+    cabeçalho   magic, versão, n_termos, n_versos, tamanho do vocabulário, média de tokens
+    vocab       termos ordenados, separados por '\\n'
+    termos      offset u32 de cada termo no bloco de postings (+1 sentinela)
+    tamanhos    número de tokens u16 por versículo
+    postings    por termo: n u32 | deltas u16[n] | tf u16[n] | posições u16[soma tf]
+
+As listas de versículos são gravadas como deltas em arrays de 16 bits e
+decodificadas com ``array.frombytes`` + ``accumulate`` só quando um termo
+aparece numa consulta; o vocabulário também só é lido na primeira pesquisa.
+
+Sintaxe das consultas: palavras soltas são combinadas com E, ``"entre aspas"``
+exige a frase exata e ``prefixo*`` casa qualquer termo que comece com o prefixo.
+Acentos e maiúsculas são ignorados.
+"""
+
+import bisect
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import OrderedDict, defaultdict
+from itertools import accumulate
+
+from core.texto import dobrar
+
+MAGIC = b'SIDX'
+VERSAO_FORMATO = 1
+
+_CABECALHO = struct.Struct('<4sIIIIf')
+_U32 = struct.Struct('<I')
+_TOKEN = re.compile(r'\w+')
+_CONSULTA = re.compile(r'"([^"]*)"|(\S+)')
+
+# Parâmetros do BM25
+K1 = 1.2
+B = 0.75
+# Limite de termos expandidos por um prefixo (os mais frequentes primeiro)
+MAX_EXPANSAO_PREFIXO = 64
+
+
+def tokenizar(texto):
+    return _TOKEN.findall(dobrar(texto))
+
+
+def _array(codigo, dados):
+    a = array(codigo)
+    a.frombytes(dados)
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a
+
+
+def _bytes(codigo, valores):
+    a = array(codigo, valores)
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a.tobytes()
+
+
+class _Postings:
+    __slots__ = ('docs', 'contrib', 'tfs', '_pos_bytes', '_pos', '_inicio_pos')
+
+    def __init__(self, docs, tfs, pos_bytes, contrib):
+        self.docs = docs
+        self.tfs = tfs
+        self.contrib = contrib
+        self._pos_bytes = pos_bytes
+        self._pos = None
+        self._inicio_pos = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def localizar(self, doc):
+        """Posição de ``doc`` na lista, ou -1."""
+        i = bisect.bisect_left(self.docs, doc)
+        return i if i < len(self.docs) and self.docs[i] == doc else -1
+
+    def posicoes(self, i):
+        if self._pos is None:
+            self._pos = _array('H', self._pos_bytes)
+            self._inicio_pos = [0, *accumulate(self.tfs)]
+        return self._pos[self._inicio_pos[i]:self._inicio_pos[i + 1]]
+
+
+def _fluxo(requisito):
+    """Itera (versículo, pontuação) em ordem de versículo, somando os termos do requisito."""
+    if len(requisito) == 1:
+        yield from zip(requisito[0].docs, requisito[0].contrib)
+        return
+    atual, soma = -1, 0.0
+    for doc, pontuacao in heapq.merge(*(zip(p.docs, p.contrib) for p in requisito)):
+        if doc != atual:
+            if atual >= 0:
+                yield atual, soma
+            atual, soma = doc, 0.0
+        soma += pontuacao
+    if atual >= 0:
+        yield atual, soma
+
+
+class IndiceBusca:
+    """Pesquisa ranqueada (BM25) sobre um arquivo ``.sidx`` mapeado em memória."""
+
+    def __init__(self, caminho, *, cache_postings=256):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'rb')
+        self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, versao, self.n_termos, self.n_versos, tam_vocab, self.media_tokens = \
+            _CABECALHO.unpack_from(self._mm, 0)
+        if magic != MAGIC or versao != VERSAO_FORMATO:
+            self.close()
+            raise ValueError(f"{caminho} não é um índice de pesquisa válido")
+
+        self._off_vocab = _CABECALHO.size
+        self._tam_vocab = tam_vocab
+        self._off_termos = self._off_vocab + tam_vocab
+        self._off_tamanhos = self._off_termos + (self.n_termos + 1) * _U32.size
+        self._off_postings = self._off_tamanhos + self.n_versos * 2
+
+        self._vocab = None
+        self._normas = None
+        self._cache = OrderedDict()
+        self._cache_max = cache_postings
+
+    @classmethod
+    def abrir(cls, caminho):
+        """Abre o índice se o arquivo existir; senão retorna None."""
+        if caminho and os.path.exists(caminho):
+            return cls(caminho)
+        return None
+
+    def close(self):
+        self._cache.clear()
+        self._mm.close()
+        self._arquivo.close()
+
+    def _carregar(self):
+        if self._vocab is None:
+            bruto = self._mm[self._off_vocab:self._off_vocab + self._tam_vocab]
+            self._vocab = bruto.decode('utf-8').split('\n') if bruto else []
+            tamanhos = _array('H', self._mm[self._off_tamanhos:self._off_postings])
+            media = self.media_tokens or 1.0
+            self._normas = [K1 * (1 - B + B * t / media) for t in tamanhos]
+
+    def _id_termo(self, termo):
+        i = bisect.bisect_left(self._vocab, termo)
+        return i if i < len(self._vocab) and self._vocab[i] == termo else -1
+
+    def _postings(self, id_termo):
+        p = self._cache.get(id_termo)
+        if p is not None:
+            self._cache.move_to_end(id_termo)
+            return p
+
+        inicio, fim = struct.unpack_from('<II', self._mm, self._off_termos + id_termo * _U32.size)
+        base = self._off_postings + inicio
+        n = _U32.unpack_from(self._mm, base)[0]
+        base += 4
+        docs = list(accumulate(_array('H', self._mm[base:base + 2 * n])))
+        tfs = _array('H', self._mm[base + 2 * n:base + 4 * n])
+        # Contribuição BM25 de cada ocorrência, calculada uma vez por termo carregado
+        idf = self._idf(n)
+        normas = self._normas
+        contrib = [idf * tf * (K1 + 1) / (tf + normas[d]) for d, tf in zip(docs, tfs)]
+        p = _Postings(docs, tfs, self._mm[base + 4 * n:self._off_postings + fim], contrib)
+
+        self._cache[id_termo] = p
+        if len(self._cache) > self._cache_max:
+            self._cache.popitem(last=False)
+        return p
+
+    def _df(self, id_termo):
+        inicio = _U32.unpack_from(self._mm, self._off_termos + id_termo * _U32.size)[0]
+        return _U32.unpack_from(self._mm, self._off_postings + inicio)[0]
+
+    def _idf(self, df):
+        return math.log(1 + (self.n_versos - df + 0.5) / (df + 0.5))
+
+    def _expandir_prefixo(self, prefixo):
+        inicio = bisect.bisect_left(self._vocab, prefixo)
+        fim = bisect.bisect_left(self._vocab, prefixo + '￿')
+        ids = range(inicio, fim)
+        if len(ids) > MAX_EXPANSAO_PREFIXO:
+            ids = heapq.nlargest(MAX_EXPANSAO_PREFIXO, ids, key=self._df)
+        return list(ids)
+
+    def _interpretar(self, consulta):
+        """Divide a consulta em grupos: cada grupo é (tipo, [ids de termos])."""
+        grupos = []
+        for frase, palavra in _CONSULTA.findall(consulta):
+            if frase:
+                tokens = tokenizar(frase)
+                if len(tokens) > 1:
+                    grupos.append(('frase', [self._id_termo(t) for t in tokens]))
+                    continue
+                palavra = frase
+            tokens = tokenizar(palavra)
+            for n, token in enumerate(tokens, 1):
+                if n == len(tokens) and palavra.endswith('*'):
+                    grupos.append(('prefixo', self._expandir_prefixo(token)))
+                else:
+                    grupos.append(('termo', [self._id_termo(token)]))
+        return grupos
+
+    def pesquisar(self, consulta, k=5):
+        """Retorna ``(total, [(pontuação, índice do versículo), ...])`` com os k melhores.
+
+        Os candidatos são gerados um a um e só os k melhores ficam no heap.
+        """
+        self._carregar()
+        grupos = self._interpretar(consulta)
+        if not grupos or any(-1 in ids or not ids for _, ids in grupos):
+            return 0, []
+
+        # Cada requisito é uma lista de postings; um versículo precisa casar
+        # com pelo menos um termo de cada requisito (vários só em prefixos).
+        requisitos = []
+        for tipo, ids in grupos:
+            if tipo == 'prefixo':
+                requisitos.append([self._postings(i) for i in ids])
+            else:
+                requisitos.extend([self._postings(i)] for i in ids)
+        frases = [[self._postings(i) for i in ids] for tipo, ids in grupos if tipo == 'frase']
+
+        requisitos.sort(key=lambda ps: sum(len(p) for p in ps))
+        guia, resto = requisitos[0], requisitos[1:]
+
+        if not resto and not frases and len(guia) == 1:
+            p = guia[0]
+            return len(p), heapq.nlargest(k, zip(p.contrib, p.docs))
+
+        total = 0
+
+        def pontuados():
+            nonlocal total
+            for doc, pontuacao in _fluxo(guia):
+                for requisito in resto:
+                    encontrou = False
+                    for p in requisito:
+                        i = p.localizar(doc)
+                        if i >= 0:
+                            pontuacao += p.contrib[i]
+                            encontrou = True
+                    if not encontrou:
+                        break
+                else:
+                    if frases and not all(self._casa_frase(f, doc) for f in frases):
+                        continue
+                    total += 1
+                    yield pontuacao, doc
+
+        melhores = heapq.nlargest(k, pontuados())
+        return total, melhores
+
+    def _casa_frase(self, postings, doc):
+        listas = [p.posicoes(p.localizar(doc)) for p in postings]
+        seguintes = [set(l) for l in listas[1:]]
+        return any(all(pos + j + 1 in s for j, s in enumerate(seguintes)) for pos in listas[0])
+
+
+def build(store, destino):
+    """Gera o índice a partir de um ``BibliaStore`` aberto."""
+    if store.n_versos > 0xFFFF:
+        raise ValueError("o formato suporta no máximo 65535 versículos")
+    postings = defaultdict(lambda: ([], [], []))
+    tamanhos = []
+    for doc in range(store.n_versos):
+        tokens = tokenizar(store.texto(doc))
+        tamanhos.append(min(len(tokens), 0xFFFF))
+        posicoes = defaultdict(list)
+        for pos, token in enumerate(tokens[:0xFFFF]):
+            posicoes[token].append(pos)
+        for token, lista in posicoes.items():
+            docs, tfs, pos_termo = postings[token]
+            docs.append(doc)
+            tfs.append(len(lista))
+            pos_termo.extend(lista)
+
+    vocab = sorted(postings)
+    blob = bytearray()
+    offsets = [0]
+    for termo in vocab:
+        docs, tfs, pos_termo = postings[termo]
+        deltas = [docs[0]] + [b - a for a, b in zip(docs, docs[1:])]
+        blob += _U32.pack(len(docs))
+        blob += _bytes('H', deltas)
+        blob += _bytes('H', tfs)
+        blob += _bytes('H', pos_termo)
+        offsets.append(len(blob))
+
+    vocab_bytes = '\n'.join(vocab).encode('utf-8')
+    media = sum(tamanhos) / len(tamanhos) if tamanhos else 1.0
+
+    with open(destino, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGIC, VERSAO_FORMATO, len(vocab), store.n_versos,
+                                len(vocab_bytes), media))
+        f.write(vocab_bytes)
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(_bytes('H', tamanhos))
+        f.write(blob)
+    return len(vocab)
+
+
+if __name__ == '__main__':
+    from core.biblia_store import BibliaStore
+
+    if len(sys.argv) != 4 or sys.argv[1] != 'build':
+        print("Uso: python -m core.biblia_busca build <versos.sbib> <destino.sidx>")
+        sys.exit(1)
+    store = BibliaStore(sys.argv[2])
+    n = build(store, sys.argv[3])
+    store.close()
+    print(f"{n} termos indexados em {sys.argv[3]}")
@@ -0,0 +1,280 @@
+"""Armazenamento local e compacto dos versículos, aberto com mmap.
+
+O arquivo é gerado uma única vez a partir de um corpus JSON::
+
+    python -m core.biblia_store build nvi.json data/nvi.sbib
+
+O corpus segue o formato comum de bíblias em JSON: uma lista de livros, cada um
+com ``name``, ``abbrev`` e ``chapters`` (lista de capítulos, cada capítulo uma
+lista de textos de versículo).
+
+Layout do arquivo (inteiros little-endian)::
+
+    cabeçalho   magic, versão, n_livros, n_caps, n_versos, tamanho do meta
+    meta        JSON com versão da tradução, nomes/abreviações dos livros e o
+                índice no arquivo de cada livro do cânon
+    livros      (primeiro_cap u32, n_caps u32) por livro
+    capítulos   (primeiro_verso u32, n_versos u32, livro u32) por capítulo
+    versos      offset u32 no bloco de texto por versículo (+1 sentinela)
+    vers_cap    índice global do capítulo u32 por versículo
+    texto       UTF-8 de todos os versículos concatenados
+
+Uma consulta livro/capítulo/versículo são três leituras de tabela e um slice,
+sem carregar o texto em memória.
+
+Os livros são procurados pelo nome ou abreviação com acentos ("jó" é Jó,
+"jo" é João); sem acentos só quando a forma não é de mais de um livro. Dois
+livros com o mesmo nome ou abreviação fazem ``build`` (e a abertura) falhar.
+Os comandos não procuram por nome: o parser já resolve o livro para a posição
+no cânon (``core.referencias.LIVROS``) e ``livro_canonico`` a traduz. ``build``
+resolve o nome (ou a abreviação) de cada livro do corpus com o mesmo parser e
+grava esse mapeamento no meta, falhando se dois livros caem no mesmo do cânon;
+a ordem do corpus não importa. Arquivos gerados antes disso calculam o
+mapeamento ao abrir.
+"""
+
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+
+from core.referencias import LIVROS, encontrar_livro
+from core.texto import chave_livro, chave_livro_exata
+
+MAGIC = b'SBIB'
+VERSAO_FORMATO = 1
+
+_CABECALHO = struct.Struct('<4sIIIII')
+_LIVRO = struct.Struct('<II')
+_CAP = struct.Struct('<III')
+_U32 = struct.Struct('<I')
+
+
+class BibliaStore:
+    """Leitor somente-leitura de um arquivo ``.sbib``."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'rb')
+        self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, versao, self.n_livros, self.n_caps, self.n_versos, tam_meta = \
+            _CABECALHO.unpack_from(self._mm, 0)
+        if magic != MAGIC or versao != VERSAO_FORMATO:
+            self.close()
+            raise ValueError(f"{caminho} não é um arquivo de versículos válido")
+
+        inicio_meta = _CABECALHO.size
+        meta = json.loads(self._mm[inicio_meta:inicio_meta + tam_meta].decode('utf-8'))
+        self.versao = meta['versao']
+        self.livros = meta['livros']
+
+        self._off_livros = inicio_meta + tam_meta
+        self._off_caps = self._off_livros + self.n_livros * _LIVRO.size
+        self._off_versos = self._off_caps + self.n_caps * _CAP.size
+        self._off_vers_cap = self._off_versos + (self.n_versos + 1) * _U32.size
+        self._off_texto = self._off_vers_cap + self.n_versos * _U32.size
+
+        try:
+            self._indice_livros, self._indice_livros_dobrado = _indexar_livros(self.livros)
+            self._canon = meta.get('canon') or _mapear_canon(self.livros)
+        except ValueError as e:
+            self.close()
+            raise ValueError(f"{caminho}: {e}") from None
+
+    @classmethod
+    def abrir(cls, caminho):
+        """Abre o arquivo se ele existir; senão retorna None."""
+        if caminho and os.path.exists(caminho):
+            return cls(caminho)
+        return None
+
+    def close(self):
+        self._mm.close()
+        self._arquivo.close()
+
+    def livro(self, nome):
+        """Índice do livro a partir do nome ou abreviação, ou None."""
+        i = self._indice_livros.get(chave_livro_exata(nome))
+        if i is None:
+            i = self._indice_livros_dobrado.get(chave_livro(nome))
+        return i
+
+    def livro_canonico(self, posicao):
+        """Índice no arquivo do livro ``LIVROS[posicao]``, ou None se o corpus não o tem."""
+        return self._canon[posicao]
+
+    def n_capitulos(self, livro):
+        return _LIVRO.unpack_from(self._mm, self._off_livros + livro * _LIVRO.size)[1]
+
+    def n_versiculos(self, livro, capitulo):
+        primeiro_cap, n_caps = _LIVRO.unpack_from(self._mm, self._off_livros + livro * _LIVRO.size)
+        if not 1 <= capitulo <= n_caps:
+            return 0
+        return _CAP.unpack_from(self._mm, self._off_caps + (primeiro_cap + capitulo - 1) * _CAP.size)[1]
+
+    def indice(self, livro, capitulo, versiculo):
+        """Índice global do versículo, ou None se a referência não existir."""
+        primeiro_cap, n_caps = _LIVRO.unpack_from(self._mm, self._off_livros + livro * _LIVRO.size)
+        if not 1 <= capitulo <= n_caps:
+            return None
+        primeiro_verso, n_versos, _ = _CAP.unpack_from(
+            self._mm, self._off_caps + (primeiro_cap + capitulo - 1) * _CAP.size
+        )
+        if not 1 <= versiculo <= n_versos:
+            return None
+        return primeiro_verso + versiculo - 1
+
+    def texto(self, indice):
+        inicio, fim = struct.unpack_from('<II', self._mm, self._off_versos + indice * _U32.size)
+        return self._mm[self._off_texto + inicio:self._off_texto + fim].decode('utf-8')
+
+    def referencia(self, indice):
+        """(livro, capítulo, versículo) de um índice global."""
+        cap_global = _U32.unpack_from(self._mm, self._off_vers_cap + indice * _U32.size)[0]
+        primeiro_verso, _, livro = _CAP.unpack_from(self._mm, self._off_caps + cap_global * _CAP.size)
+        primeiro_cap = _LIVRO.unpack_from(self._mm, self._off_livros + livro * _LIVRO.size)[0]
+        return livro, cap_global - primeiro_cap + 1, indice - primeiro_verso + 1
+
+    def versiculo(self, indice):
+        """Monta o versículo no mesmo formato retornado pela API."""
+        livro, capitulo, numero = self.referencia(indice)
+        info = self.livros[livro]
+        return {
+            'book': {'name': info['nome'], 'abbrev': {'pt': info['abrev']}},
+            'chapter': capitulo,
+            'number': numero,
+            'text': self.texto(indice),
+        }
+
+    def versiculos(self, inicio, fim):
+        """Versículos de ``inicio`` a ``fim`` (índices globais, inclusive) do mesmo livro.
+
+        Os offsets saem de uma única leitura da tabela e o texto de um único
+        slice, em vez de uma consulta completa por versículo.
+        """
+        n = fim - inicio + 1
+        offsets = struct.unpack_from(f'<{n + 1}I', self._mm, self._off_versos + inicio * _U32.size)
+        base = offsets[0]
+        bloco = self._mm[self._off_texto + base:self._off_texto + offsets[-1]]
+        livro, capitulo, numero = self.referencia(inicio)
+        info = self.livros[livro]
+        book = {'name': info['nome'], 'abbrev': {'pt': info['abrev']}}
+        no_capitulo = self.n_versiculos(livro, capitulo)
+        resultado = []
+        for k in range(n):
+            if numero > no_capitulo:
+                capitulo, numero = capitulo + 1, 1
+                no_capitulo = self.n_versiculos(livro, capitulo)
+            resultado.append({
+                'book': book,
+                'chapter': capitulo,
+                'number': numero,
+                'text': bloco[offsets[k] - base:offsets[k + 1] - base].decode('utf-8'),
+            })
+            numero += 1
+        return resultado
+
+    def buscar(self, livro, capitulo, versiculo):
+        i = self.livro(livro)
+        if i is None:
+            return None
+        indice = self.indice(i, int(capitulo), int(versiculo))
+        return self.versiculo(indice) if indice is not None else None
+
+    def aleatorio(self, rng=random):
+        return self.versiculo(rng.randrange(self.n_versos))
+
+
+def _indexar_livros(livros):
+    """({chave exata: livro}, {chave sem acentos: livro}); ValueError se duas chaves exatas coincidem.
+
+    Uma chave sem acentos de mais de um livro ("jo" de "jó" e de "jo") fica de
+    fora, para nunca trocar um livro pelo outro.
+    """
+    exatas, dobradas, ambiguas = {}, {}, set()
+    for i, livro in enumerate(livros):
+        for campo in ('abrev', 'nome'):
+            chave = chave_livro_exata(livro[campo])
+            if exatas.get(chave, i) != i:
+                outro = livros[exatas[chave]]['nome']
+                raise ValueError(f"'{livro[campo]}' é de dois livros: {outro} e {livro['nome']}")
+            exatas[chave] = i
+            chave = chave_livro(livro[campo])
+            if dobradas.get(chave, i) != i:
+                ambiguas.add(chave)
+            dobradas[chave] = i
+    for chave in ambiguas:
+        del dobradas[chave]
+    return exatas, dobradas
+
+
+def _mapear_canon(livros):
+    """[índice no arquivo ou None] para cada livro de ``LIVROS``.
+
+    ValueError se o nome e a abreviação de um livro apontam livros diferentes
+    ou se dois livros caem no mesmo. Livros que o parser não reconhece
+    (deuterocanônicos, por exemplo) ficam de fora: nenhuma referência chega a
+    eles.
+    """
+    canon = [None] * len(LIVROS)
+    for i, livro in enumerate(livros):
+        pelo_nome, pela_abrev = encontrar_livro(livro['nome']), encontrar_livro(livro['abrev'])
+        if None not in (pelo_nome, pela_abrev) and pelo_nome != pela_abrev:
+            raise ValueError(f"{livro['nome']} ({livro['abrev']}) pode ser {LIVROS[pelo_nome].nome} "
+                             f"ou {LIVROS[pela_abrev].nome}")
+        posicao = pela_abrev if pelo_nome is None else pelo_nome
+        if posicao is None:
+            continue
+        if canon[posicao] is not None:
+            outro = livros[canon[posicao]]['nome']
+            raise ValueError(f"{outro} e {livro['nome']} são os dois {LIVROS[posicao].nome}")
+        canon[posicao] = i
+    return canon
+
+
+def build(corpus, destino, versao='nvi'):
+    """Converte um corpus JSON no formato binário descrito no topo do módulo."""
+    with open(corpus, encoding='utf-8-sig') as f:
+        dados = json.load(f)
+
+    livros, caps, offsets, vers_cap = [], [], [0], []
+    texto = bytearray()
+    meta_livros = [{'nome': livro['name'], 'abrev': livro['abbrev']} for livro in dados]
+    _indexar_livros(meta_livros)
+    canon = _mapear_canon(meta_livros)
+
+    for i, livro in enumerate(dados):
+        livros.append(_LIVRO.pack(len(caps), len(livro['chapters'])))
+        for capitulo in livro['chapters']:
+            caps.append(_CAP.pack(len(vers_cap), len(capitulo), i))
+            for verso in capitulo:
+                texto += verso.strip().encode('utf-8')
+                offsets.append(len(texto))
+                vers_cap.append(len(caps) - 1)
+
+    meta = json.dumps({'versao': versao, 'livros': meta_livros, 'canon': canon}, ensure_ascii=False).encode('utf-8')
+    n_versos = len(vers_cap)
+
+    tmp = f"{destino}.tmp"
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGIC, VERSAO_FORMATO, len(livros), len(caps), n_versos, len(meta)))
+        f.write(meta)
+        f.write(b''.join(livros))
+        f.write(b''.join(caps))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(struct.pack(f'<{n_versos}I', *vers_cap))
+        f.write(texto)
+    os.replace(tmp, destino)
+    return len(livros), n_versos
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 4 or sys.argv[1] != 'build':
+        print("Uso: python -m core.biblia_store build <corpus.json> <destino.sbib> [versao]")
+        sys.exit(1)
+    n_livros, n_versos = build(*sys.argv[2:5])
+    print(f"{n_livros} livros, {n_versos} versículos gravados em {sys.argv[3]}")
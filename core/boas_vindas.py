@@ -0,0 +1,153 @@
+"""Boas-vindas agregadas por servidor, resistentes a rajadas de entradas.
+
+Com tráfego normal cada entrada gera a sua mensagem, como antes. Quando a
+taxa de entradas de um servidor passa de ``limiar`` por minuto, o servidor
+entra em modo rajada: as entradas se acumulam por ``janela`` segundos e saem
+num único resumo ("Olá @a, @b, ... e mais 37"). O modo rajada só termina
+quando a taxa cai abaixo da metade do limiar, para não ficar alternando na
+borda.
+
+O estado de cada servidor fica num ``OrderedDict`` ordenado pela última
+entrada. Um servidor sem entradas no último minuto e sem resumo pendente tem
+o mesmo comportamento de um novo, então sai da frente do dicionário a cada
+entrada registrada; a memória acompanha os servidores ativos, não todos os
+que já foram vistos.
+
+``taxa(guild_id)`` e ``em_rajada(guild_id)`` são o sinal de rajada para
+outras funções de moderação; o automod usa ``em_rajada`` para barrar mais
+cedo a mesma mensagem colada por várias contas.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger('discord_bot.boas_vindas')
+
+# Janela usada para medir a taxa de entradas (por minuto)
+JANELA_TAXA = 60.0
+
+
+class _EstadoGuild:
+    __slots__ = ('entradas', 'rajada', 'pendentes', 'outros', 'task')
+
+    def __init__(self):
+        self.entradas = deque(maxlen=10_000)
+        self.rajada = False
+        self.pendentes = []
+        self.outros = 0
+        self.task = None
+
+
+class BoasVindas:
+    """Agregador de boas-vindas.
+
+    ``renderizar(guild, membros, outros)`` monta o embed: um membro para a
+    mensagem individual, vários (mais a contagem dos que não cabem) para o
+    resumo de uma rajada. ``canal(guild)`` escolhe onde enviar (None desliga
+    o envio, mas a taxa de entradas continua sendo medida).
+    """
+
+    def __init__(self, renderizar, *, canal=None, limiar=10, janela=10.0, max_mencoes=20, metricas=None):
+        self.renderizar = renderizar
+        self.canal = canal or (lambda guild: guild.system_channel)
+        self.limiar = limiar
+        self.janela = janela
+        self.max_mencoes = max_mencoes
+        self.metricas = metricas
+        self._estados = OrderedDict()
+        if metricas is not None:
+            metricas.descrever('entradas_total', 'Membros que entraram nos servidores')
+            metricas.descrever('boas_vindas_mensagens_total', 'Mensagens de boas-vindas enviadas por modo')
+            metricas.medidor('boas_vindas_servidores', lambda: len(self._estados),
+                             'Servidores com entradas recentes acompanhados pelas boas-vindas')
+
+    def _podar(self, estado, agora):
+        entradas = estado.entradas
+        while entradas and agora - entradas[0] > JANELA_TAXA:
+            entradas.popleft()
+
+    def taxa(self, guild_id):
+        """Entradas no último minuto."""
+        estado = self._estados.get(guild_id)
+        if estado is None:
+            return 0
+        self._podar(estado, time.monotonic())
+        return len(estado.entradas)
+
+    def em_rajada(self, guild_id):
+        estado = self._estados.get(guild_id)
+        return estado is not None and estado.rajada
+
+    def _descartar_inativos(self, agora):
+        estados = self._estados
+        while estados:
+            estado = estados[next(iter(estados))]
+            if estado.task is not None or (estado.entradas and agora - estado.entradas[-1] <= JANELA_TAXA):
+                break
+            estados.popitem(last=False)
+
+    async def registrar(self, membro):
+        guild = membro.guild
+        agora = time.monotonic()
+        self._descartar_inativos(agora)
+        estado = self._estados.get(guild.id)
+        if estado is None:
+            estado = self._estados[guild.id] = _EstadoGuild()
+        else:
+            self._estados.move_to_end(guild.id)
+
+        estado.entradas.append(agora)
+        self._podar(estado, agora)
+        taxa = len(estado.entradas)
+        if self.metricas is not None:
+            self.metricas.contar('entradas_total')
+
+        if not estado.rajada and taxa >= self.limiar:
+            estado.rajada = True
+            logger.warning(f"Rajada de entradas em {guild.id}: {taxa}/min, boas-vindas agrupadas")
+        elif estado.rajada and taxa < self.limiar / 2:
+            estado.rajada = False
+            logger.info(f"Fim da rajada de entradas em {guild.id}")
+
+        # Com um resumo pendente, as entradas seguintes entram nele para manter a ordem
+        if not estado.rajada and estado.task is None:
+            await self._enviar(guild, [membro], 0, 'individual')
+            return
+
+        if len(estado.pendentes) < self.max_mencoes:
+            estado.pendentes.append(membro)
+        else:
+            estado.outros += 1
+        if estado.task is None:
+            estado.task = asyncio.create_task(self._descarregar(guild, estado))
+
+    async def _descarregar(self, guild, estado):
+        try:
+            await asyncio.sleep(self.janela)
+        finally:
+            membros, outros = estado.pendentes, estado.outros
+            estado.pendentes, estado.outros, estado.task = [], 0, None
+        await self._enviar(guild, membros, outros, 'resumo' if len(membros) + outros > 1 else 'individual')
+
+    async def _enviar(self, guild, membros, outros, modo):
+        canal = self.canal(guild)
+        if canal is None or not canal.permissions_for(guild.me).send_messages:
+            return
+        try:
+            await canal.send(embed=self.renderizar(guild, membros, outros))
+        except Exception as e:
+            logger.error(f"Erro ao enviar boas-vindas em {guild.id}: {e}")
+            return
+        if self.metricas is not None:
+            self.metricas.contar('boas_vindas_mensagens_total', modo=modo)
+
+    def esquecer(self, guild_id):
+        estado = self._estados.pop(guild_id, None)
+        if estado is not None and estado.task is not None:
+            estado.task.cancel()
+
+    def close(self):
+        for guild_id in list(self._estados):
+            self.esquecer(guild_id)
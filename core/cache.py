@@ -0,0 +1,120 @@
+"""Cache LRU com TTL, limite de memória e coalescência de requisições em voo."""
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+
+
+def estimar_bytes(valor):
+    """Estimativa barata do tamanho de respostas JSON (dict/list/str/números)."""
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(estimar_bytes(k) + estimar_bytes(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(estimar_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheTTL:
+    """Cache limitado por número de itens e por bytes estimados.
+
+    ``obter(chave, carregar)`` devolve o valor em cache ou chama ``carregar()``;
+    chamadas simultâneas com a mesma chave esperam a mesma carga
+    ("singleflight"). Resultados ``None`` não são guardados.
+    """
+
+    def __init__(self, *, max_itens=1024, max_bytes=8 * 1024 * 1024, ttl=3600.0,
+                 medir=estimar_bytes, relogio=time.monotonic):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._medir = medir
+        self._relogio = relogio
+        self._itens = OrderedDict()  # chave -> (expira_em, valor, bytes)
+        self._em_voo = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalescidas = 0
+        self.evictions = 0
+        self.expiradas = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def get(self, chave):
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        if item[0] <= self._relogio():
+            self._remover(chave)
+            self.expiradas += 1
+            return None
+        self._itens.move_to_end(chave)
+        return item[1]
+
+    def put(self, chave, valor):
+        if chave in self._itens:
+            self._remover(chave)
+        tamanho = self._medir(valor)
+        if tamanho > self.max_bytes:
+            return
+        self._itens[chave] = (self._relogio() + self.ttl, valor, tamanho)
+        self.bytes += tamanho
+        while len(self._itens) > self.max_itens or self.bytes > self.max_bytes:
+            _, (_, _, liberado) = self._itens.popitem(last=False)
+            self.bytes -= liberado
+            self.evictions += 1
+
+    def _remover(self, chave):
+        _, _, tamanho = self._itens.pop(chave)
+        self.bytes -= tamanho
+
+    def clear(self):
+        self._itens.clear()
+        self.bytes = 0
+
+    async def obter(self, chave, carregar):
+        valor = self.get(chave)
+        if valor is not None:
+            self.hits += 1
+            return valor
+
+        futuro = self._em_voo.get(chave)
+        if futuro is not None:
+            self.coalescidas += 1
+            return await asyncio.shield(futuro)
+
+        self.misses += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self._em_voo[chave] = futuro
+        try:
+            valor = await carregar()
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except Exception as e:
+            futuro.set_exception(e)
+            # Evita "Future exception was never retrieved" quando ninguém esperava
+            futuro.exception()
+            raise
+        else:
+            if valor is not None:
+                self.put(chave, valor)
+            futuro.set_result(valor)
+            return valor
+        finally:
+            del self._em_voo[chave]
+
+    def stats(self):
+        consultas = self.hits + self.misses + self.coalescidas
+        return {
+            'itens': len(self._itens),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalescidas': self.coalescidas,
+            'evictions': self.evictions,
+            'expiradas': self.expiradas,
+            'taxa_acerto': (self.hits + self.coalescidas) / consultas if consultas else 0.0,
+        }
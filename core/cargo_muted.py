@@ -0,0 +1,186 @@
+"""Cargo "Muted": cache do ID por servidor e aplicação das permissões em segundo plano.
+
+Ao criar o cargo é preciso gravar um overwrite em cada canal do servidor. Isso
+roda numa task por servidor, com várias requisições em paralelo limitadas por
+um semáforo e pelo ritmo global do bot (o limite global da API é 50 req/s; a rota
+de permissões tem um bucket por canal). O progresso fica no SQLite para que
+um rollout interrompido por reinício seja retomado; canais cujo overwrite
+já está correto são pulados, então retomar não repete chamadas. Um rollout
+com falhas também fica gravado até que todos os canais estejam aplicados.
+
+Categorias são atualizadas primeiro. Os canais sincronizados com a categoria
+não podem ser pulados: a API não propaga overwrites da categoria para os
+filhos (quem faz isso é o cliente oficial, canal a canal).
+"""
+
+import asyncio
+import logging
+import time
+
+import discord
+
+logger = logging.getLogger('discord_bot.cargo_muted')
+
+PERMISSOES = {'speak': False, 'send_messages': False, 'add_reactions': False}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS rollout_muted (
+    guild_id INTEGER PRIMARY KEY,
+    role_id INTEGER NOT NULL,
+    iniciado_em REAL NOT NULL
+);
+"""
+
+
+class Rollout:
+    """Estado de uma aplicação de permissões em andamento num servidor."""
+
+    def __init__(self, guild, role):
+        self.guild = guild
+        self.role = role
+        self.total = 0
+        self.feitos = 0
+        self.pulados = 0
+        self.falhas = 0
+        self.concluido = False
+        self.task = None
+
+    def resumo(self):
+        return (f"{self.feitos + self.pulados}/{self.total} canais"
+                f"{f' ({self.falhas} falha(s))' if self.falhas else ''}")
+
+
+def _ja_aplicado(canal, role):
+    overwrite = canal.overwrites_for(role)
+    return all(getattr(overwrite, nome) is valor for nome, valor in PERMISSOES.items())
+
+
+class CargosMuted:
+    """``nome`` é o nome do cargo ou uma função ``nome(guild)`` (configuração por servidor).
+
+    ``ritmo`` é o ``core.ritmo.Ritmo`` global do bot.
+    """
+
+    def __init__(self, db, *, ritmo, nome='Muted', concorrencia=8):
+        self.db = db
+        self.nome = nome
+        self._ids = {}
+        self._rollouts = {}
+        self._semaforo = asyncio.Semaphore(concorrencia)
+        self._ritmo = ritmo
+
+    async def start(self):
+        await self.db.executescript(ESQUEMA)
+
+    def _nome(self, guild):
+        return self.nome(guild) if callable(self.nome) else self.nome
+
+    def obter(self, guild):
+        """Cargo Muted do servidor; a busca por nome só acontece uma vez por servidor."""
+        role_id = self._ids.get(guild.id)
+        if role_id is not None:
+            role = guild.get_role(role_id)
+            if role is not None:
+                return role
+        role = discord.utils.get(guild.roles, name=self._nome(guild))
+        if role is not None:
+            self._ids[guild.id] = role.id
+        return role
+
+    def esquecer(self, guild_id, role_id=None):
+        if role_id is None or self._ids.get(guild_id) == role_id:
+            self._ids.pop(guild_id, None)
+
+    def rollout(self, guild_id):
+        return self._rollouts.get(guild_id)
+
+    async def criar(self, guild, ao_progresso=None):
+        """Cria o cargo e inicia a aplicação das permissões sem esperar por ela."""
+        role = await guild.create_role(
+            name=self._nome(guild),
+            color=discord.Color.dark_gray(),
+            reason="Cargo criado automaticamente pelo bot"
+        )
+        self._ids[guild.id] = role.id
+        await self.aplicar(guild, role, ao_progresso)
+        return role
+
+    async def aplicar(self, guild, role, ao_progresso=None):
+        atual = self._rollouts.get(guild.id)
+        if atual is not None and not atual.concluido:
+            return atual
+
+        await self.db.execute(
+            "INSERT OR REPLACE INTO rollout_muted (guild_id, role_id, iniciado_em) VALUES (?, ?, ?)",
+            (guild.id, role.id, time.time()),
+        )
+        rollout = Rollout(guild, role)
+        rollout.task = asyncio.create_task(
+            self._executar(rollout, ao_progresso), name=f'rollout-muted-{guild.id}'
+        )
+        self._rollouts[guild.id] = rollout
+        return rollout
+
+    async def retomar(self, bot):
+        """Retoma rollouts interrompidos (chamado quando o bot fica pronto)."""
+        for guild_id, role_id in await self.db.fetchall("SELECT guild_id, role_id FROM rollout_muted"):
+            guild = bot.get_guild(guild_id)
+            if guild is None:
+                # Servidor de outro cluster (ou indisponível no momento)
+                continue
+            role = guild.get_role(role_id)
+            if role is None:
+                await self.db.execute("DELETE FROM rollout_muted WHERE guild_id = ?", (guild_id,))
+                continue
+            logger.info(f"Retomando permissões do cargo Muted em {guild.name} ({guild_id})")
+            await self.aplicar(guild, role)
+
+    async def _executar(self, rollout, ao_progresso):
+        guild, role = rollout.guild, rollout.role
+        canais = sorted(guild.channels, key=lambda c: not isinstance(c, discord.CategoryChannel))
+        rollout.total = len(canais)
+
+        async def aplicar_canal(canal):
+            if _ja_aplicado(canal, role):
+                rollout.pulados += 1
+                return
+            async with self._semaforo:
+                await self._ritmo.aguardar()
+                try:
+                    await canal.set_permissions(role, reason="Configuração do cargo Muted", **PERMISSOES)
+                    rollout.feitos += 1
+                except discord.HTTPException as e:
+                    rollout.falhas += 1
+                    logger.warning(f"Falha ao aplicar Muted em #{canal} ({guild.id}): {e}")
+
+        async def informar():
+            try:
+                await ao_progresso(rollout)
+            except Exception as e:
+                logger.debug(f"Falha ao informar progresso do Muted: {e}")
+
+        async def informar_periodicamente():
+            while True:
+                await asyncio.sleep(5)
+                await informar()
+
+        relator = asyncio.create_task(informar_periodicamente()) if ao_progresso else None
+        try:
+            categorias = [c for c in canais if isinstance(c, discord.CategoryChannel)]
+            await asyncio.gather(*(aplicar_canal(c) for c in categorias))
+            await asyncio.gather(*(aplicar_canal(c) for c in canais[len(categorias):]))
+            if rollout.falhas:
+                # A linha fica: o próximo ``retomar`` refaz só os canais que falharam
+                logger.warning(f"Cargo Muted aplicado em parte em {guild.name}: {rollout.resumo()}; "
+                               f"os canais com falha serão refeitos quando o bot reconectar")
+            else:
+                await self.db.execute("DELETE FROM rollout_muted WHERE guild_id = ?", (guild.id,))
+                logger.info(f"Cargo Muted aplicado em {guild.name}: {rollout.resumo()}")
+        except Exception as e:
+            logger.error(f"Erro ao aplicar cargo Muted em {guild.name}: {e}")
+        finally:
+            rollout.concluido = True
+            if relator:
+                relator.cancel()
+        if ao_progresso:
+            await informar()
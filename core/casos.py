@@ -0,0 +1,230 @@
+"""Registro de casos de moderação (expulsões, banimentos, silenciamentos).
+
+``registrar`` é síncrono: numera o caso (sequência por servidor, mantida em
+memória) e o coloca numa fila. O último número de cada servidor também fica
+na tabela ``casos_numeracao``, gravada junto com os casos; a numeração não
+volta a 1 quando a poda apaga todos os casos de um servidor, então ``/caso N``
+sempre se refere ao mesmo caso. Uma task grava a fila no SQLite em lotes de
+até ``lote`` casos num único ``executemany``, esperando ``intervalo``
+segundos para juntar o que chegar em sequência; o comando de moderação nunca
+espera pelo disco.
+
+As consultas usam o índice ``(guild_id, usuario_id, numero)`` e incluem os
+casos que ainda estão na fila, então um caso aparece no histórico assim que
+é registrado.
+
+Casos mais antigos que ``retencao`` dias são removidos em segundo plano (uma
+vez ao iniciar e depois a cada 24h), em lotes para não segurar a thread do
+banco. Com ``exportar`` definido, eles são antes gravados num
+``casos-AAAAMMDD-HHMMSS.jsonl.gz`` nesse diretório.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger('discord_bot.casos')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS casos (
+    guild_id INTEGER NOT NULL,
+    numero INTEGER NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    moderador_id INTEGER NOT NULL,
+    acao TEXT NOT NULL,
+    motivo TEXT NOT NULL,
+    criado_em REAL NOT NULL,
+    PRIMARY KEY (guild_id, numero)
+);
+CREATE INDEX IF NOT EXISTS casos_usuario ON casos (guild_id, usuario_id, numero);
+CREATE INDEX IF NOT EXISTS casos_criado_em ON casos (criado_em);
+CREATE TABLE IF NOT EXISTS casos_numeracao (
+    guild_id INTEGER PRIMARY KEY,
+    ultimo INTEGER NOT NULL
+);
+"""
+
+# Guarda o maior número já usado no servidor (nunca diminui)
+_NUMERACAO = (
+    "INSERT INTO casos_numeracao (guild_id, ultimo) VALUES (?, ?) "
+    "ON CONFLICT (guild_id) DO UPDATE SET ultimo = MAX(ultimo, excluded.ultimo)"
+)
+
+# Intervalo entre podas de casos antigos
+PODA_INTERVALO = 24 * 3600
+# Linhas removidas (e exportadas) por ida à thread do banco
+PODA_LOTE = 5000
+
+
+class Caso(NamedTuple):
+    guild_id: int
+    numero: int
+    usuario_id: int
+    moderador_id: int
+    acao: str
+    motivo: str
+    criado_em: float
+
+
+class RegistroCasos:
+    def __init__(self, db, *, intervalo=2.0, lote=500, retencao=365, exportar=None, metricas=None):
+        self.db = db
+        self.intervalo = intervalo
+        self.lote = lote
+        self.retencao = retencao
+        self.exportar = exportar
+        self.metricas = metricas
+        self._ultimos = {}     # guild_id -> último número de caso
+        self._fila = []
+        self._acordar = asyncio.Event()
+        self._gravacao = None
+        self._poda = None
+        if metricas is not None:
+            metricas.descrever('casos_total', 'Casos de moderação registrados por ação')
+            metricas.medidor('casos_fila', lambda: len(self._fila), 'Casos aguardando gravação no banco')
+
+    async def start(self):
+        await self.db.executescript(ESQUEMA)
+        # Bancos de antes da tabela de numeração: parte do maior caso gravado
+        await self.db.executemany(
+            _NUMERACAO, await self.db.fetchall("SELECT guild_id, MAX(numero) FROM casos GROUP BY guild_id")
+        )
+        for guild_id, ultimo in await self.db.fetchall("SELECT guild_id, ultimo FROM casos_numeracao"):
+            self._ultimos[guild_id] = ultimo
+        logger.info(f"Casos de moderação de {len(self._ultimos)} servidor(es) carregados")
+        self._gravacao = asyncio.create_task(self._gravar_continuamente(), name='casos')
+        if self.retencao:
+            self._poda = asyncio.create_task(self._podar_continuamente(), name='casos-poda')
+
+    async def close(self):
+        for task in (self._gravacao, self._poda):
+            if task is not None:
+                task.cancel()
+        self._gravacao = self._poda = None
+        await self.gravar()
+
+    # ===== Escrita =====
+
+    def registrar(self, guild_id, usuario_id, moderador_id, acao, motivo):
+        numero = self._ultimos.get(guild_id, 0) + 1
+        self._ultimos[guild_id] = numero
+        caso = Caso(guild_id, numero, usuario_id, moderador_id, acao, motivo, time.time())
+        self._fila.append(caso)
+        self._acordar.set()
+        if self.metricas is not None:
+            self.metricas.contar('casos_total', acao=acao)
+        return caso
+
+    async def _gravar_continuamente(self):
+        while True:
+            await self._acordar.wait()
+            # Junta os casos que chegarem em sequência num único lote
+            if len(self._fila) < self.lote:
+                await asyncio.sleep(self.intervalo)
+            self._acordar.clear()
+            await self.gravar()
+            if self._fila:
+                self._acordar.set()
+
+    async def gravar(self):
+        while self._fila:
+            lote, self._fila = self._fila[:self.lote], self._fila[self.lote:]
+            ultimos = {}
+            for caso in lote:
+                ultimos[caso.guild_id] = max(ultimos.get(caso.guild_id, 0), caso.numero)
+
+            def gravar_lote(conn):
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO casos (guild_id, numero, usuario_id, moderador_id, acao, motivo, criado_em) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        lote,
+                    )
+                    conn.executemany(_NUMERACAO, ultimos.items())
+
+            try:
+                await self.db.run(gravar_lote)
+            except Exception as e:
+                logger.error(f"Erro ao gravar {len(lote)} caso(s) de moderação: {e}")
+                self._fila[:0] = lote
+                return
+
+    # ===== Consulta =====
+
+    async def historico(self, guild_id, usuario_id, limite=10):
+        """Casos mais recentes do usuário no servidor e o total deles."""
+        # As gravações passam pela mesma thread do banco, em ordem: o que está
+        # na fila agora ainda não foi gravado quando a consulta abaixo rodar.
+        pendentes = [c for c in self._fila if c.guild_id == guild_id and c.usuario_id == usuario_id]
+
+        def consultar(conn):
+            linhas = conn.execute(
+                "SELECT guild_id, numero, usuario_id, moderador_id, acao, motivo, criado_em FROM casos "
+                "WHERE guild_id = ? AND usuario_id = ? ORDER BY numero DESC LIMIT ?",
+                (guild_id, usuario_id, limite),
+            ).fetchall()
+            (total,) = conn.execute(
+                "SELECT COUNT(*) FROM casos WHERE guild_id = ? AND usuario_id = ?", (guild_id, usuario_id)
+            ).fetchone()
+            return linhas, total
+
+        linhas, total = await self.db.run(consultar)
+        casos = pendentes[::-1] + [Caso(*linha) for linha in linhas]
+        return casos[:limite], total + len(pendentes)
+
+    async def caso(self, guild_id, numero):
+        for c in self._fila:
+            if c.guild_id == guild_id and c.numero == numero:
+                return c
+        linha = await self.db.fetchone(
+            "SELECT guild_id, numero, usuario_id, moderador_id, acao, motivo, criado_em FROM casos "
+            "WHERE guild_id = ? AND numero = ?",
+            (guild_id, numero),
+        )
+        return Caso(*linha) if linha else None
+
+    # ===== Retenção =====
+
+    async def _podar_continuamente(self):
+        while True:
+            try:
+                removidos = await self.podar()
+                if removidos:
+                    logger.info(f"{removidos} caso(s) de moderação com mais de {self.retencao} dias removido(s)")
+            except Exception as e:
+                logger.error(f"Erro ao podar casos de moderação: {e}")
+            await asyncio.sleep(PODA_INTERVALO)
+
+    async def podar(self):
+        """Remove (e exporta, se configurado) os casos mais antigos que a retenção."""
+        corte = time.time() - self.retencao * 86400
+        arquivo = None
+        if self.exportar:
+            os.makedirs(self.exportar, exist_ok=True)
+            arquivo = os.path.join(self.exportar, time.strftime('casos-%Y%m%d-%H%M%S.jsonl.gz'))
+
+        def podar_lote(conn):
+            with conn:
+                linhas = conn.execute(
+                    "DELETE FROM casos WHERE rowid IN "
+                    "(SELECT rowid FROM casos WHERE criado_em < ? ORDER BY criado_em LIMIT ?) "
+                    "RETURNING guild_id, numero, usuario_id, moderador_id, acao, motivo, criado_em",
+                    (corte, PODA_LOTE),
+                ).fetchall()
+                if arquivo and linhas:
+                    # Exporta antes do commit: se a escrita falhar, nada é apagado
+                    with gzip.open(arquivo, 'at', encoding='utf-8') as f:
+                        for linha in linhas:
+                            f.write(json.dumps(Caso(*linha)._asdict(), ensure_ascii=False) + '\n')
+            return len(linhas)
+
+        total = 0
+        while True:
+            removidos = await self.db.run(podar_lote)
+            total += removidos
+            if removidos < PODA_LOTE:
+                return total
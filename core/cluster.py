@@ -0,0 +1,224 @@
+"""Execução do bot em vários processos (clusters), cada um com uma faixa de shards.
+
+O lançador (``python main.py cluster <n>``) descobre o número de shards,
+divide as faixas entre ``n`` processos, reinicia um cluster que cair e serve
+um canal de IPC local (TCP em 127.0.0.1, uma mensagem JSON por linha).
+
+Cada cluster publica um pequeno dicionário de estado (por exemplo o número de
+servidores) e pode pedir o estado agregado de todos os clusters::
+
+    {"op": "ola", "cluster": 0, "segredo": "..."}        primeira mensagem
+    {"op": "publicar", "dados": {"guilds": 120}}
+    {"op": "agregar", "id": 7}  ->  {"id": 7, "dados": {"0": {...}, "1": {...}}}
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import signal
+import sys
+import time
+
+import aiohttp
+
+logger = logging.getLogger('discord_bot.cluster')
+
+# Espera antes de reiniciar um cluster que caiu (dobra a cada queda seguida)
+ESPERA_REINICIO = 5.0
+ESPERA_REINICIO_MAX = 300.0
+# Um cluster que ficou de pé por este tempo zera a contagem de quedas
+TEMPO_ESTAVEL = 600.0
+
+
+def dividir_shards(total, n_clusters):
+    """Divide ``range(total)`` em ``n_clusters`` faixas contíguas de tamanho parecido."""
+    n_clusters = max(1, min(n_clusters, total))
+    base, resto = divmod(total, n_clusters)
+    faixas, inicio = [], 0
+    for i in range(n_clusters):
+        fim = inicio + base + (1 if i < resto else 0)
+        faixas.append(list(range(inicio, fim)))
+        inicio = fim
+    return faixas
+
+
+async def shards_recomendados(token, api_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{api_url}/gateway/bot", headers={'Authorization': f'Bot {token}'}) as r:
+            r.raise_for_status()
+            return (await r.json())['shards']
+
+
+class Lancador:
+    def __init__(self, n_clusters, *, token, api_url, shard_count=None, comando=None):
+        self.n_clusters = n_clusters
+        self.token = token
+        self.api_url = api_url
+        self.shard_count = shard_count
+        self.comando = comando or [sys.executable, os.path.abspath(sys.argv[0])]
+        self.segredo = secrets.token_hex(16)
+        self.estado = {}
+        self._processos = {}
+        self._parando = asyncio.Event()
+
+    async def executar(self):
+        if self.shard_count is None:
+            self.shard_count = await shards_recomendados(self.token, self.api_url)
+        faixas = dividir_shards(self.shard_count, self.n_clusters)
+        logger.info(f"{self.shard_count} shards em {len(faixas)} cluster(s): {faixas}")
+
+        servidor = await asyncio.start_server(self._atender, '127.0.0.1', 0)
+        porta = servidor.sockets[0].getsockname()[1]
+
+        loop = asyncio.get_running_loop()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sinal, self._parando.set)
+            except NotImplementedError:
+                pass
+
+        async with servidor:
+            supervisores = [
+                asyncio.create_task(self._supervisionar(i, faixa, porta))
+                for i, faixa in enumerate(faixas)
+            ]
+            await self._parando.wait()
+            logger.info("Encerrando clusters...")
+            for processo in self._processos.values():
+                if processo.returncode is None:
+                    processo.terminate()
+            await asyncio.gather(*supervisores, return_exceptions=True)
+
+    async def _supervisionar(self, cluster_id, shards, porta):
+        quedas = 0
+        env = {
+            **os.environ,
+            'CLUSTER_ID': str(cluster_id),
+            'CLUSTER_COUNT': str(self.n_clusters),
+            'CLUSTER_SHARDS': ','.join(map(str, shards)),
+            'SHARD_COUNT': str(self.shard_count),
+            'CLUSTER_IPC': f'127.0.0.1:{porta}',
+            'CLUSTER_IPC_SEGREDO': self.segredo,
+        }
+        while not self._parando.is_set():
+            inicio = time.monotonic()
+            processo = await asyncio.create_subprocess_exec(*self.comando, env=env)
+            self._processos[cluster_id] = processo
+            logger.info(f"Cluster {cluster_id} iniciado (pid {processo.pid}, shards {shards})")
+            codigo = await processo.wait()
+            self.estado.pop(str(cluster_id), None)
+            if self._parando.is_set():
+                break
+
+            quedas = 1 if time.monotonic() - inicio > TEMPO_ESTAVEL else quedas + 1
+            espera = min(ESPERA_REINICIO * 2 ** (quedas - 1), ESPERA_REINICIO_MAX)
+            logger.warning(f"Cluster {cluster_id} saiu com código {codigo}; reiniciando em {espera:.0f}s")
+            try:
+                await asyncio.wait_for(self._parando.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _atender(self, reader, writer):
+        cluster = None
+        try:
+            ola = json.loads(await reader.readline() or b'{}')
+            if ola.get('op') != 'ola' or not secrets.compare_digest(ola.get('segredo', ''), self.segredo):
+                return
+            cluster = str(ola['cluster'])
+            async for linha in reader:
+                mensagem = json.loads(linha)
+                if mensagem['op'] == 'publicar':
+                    self.estado[cluster] = mensagem['dados']
+                elif mensagem['op'] == 'agregar':
+                    resposta = {'id': mensagem['id'], 'dados': self.estado}
+                    writer.write(json.dumps(resposta).encode() + b'\n')
+                    await writer.drain()
+        except (ConnectionError, json.JSONDecodeError, KeyError) as e:
+            logger.warning(f"Conexão IPC do cluster {cluster} encerrada: {e}")
+        finally:
+            writer.close()
+
+
+class ClienteIPC:
+    """Lado do cluster do canal de IPC. Sem lançador, responde só com o estado local."""
+
+    def __init__(self, cluster_id, endereco=None, segredo=''):
+        self.cluster_id = cluster_id
+        self.endereco = endereco
+        self.segredo = segredo
+        self._local = {}
+        self._reader = None
+        self._writer = None
+        self._pendentes = {}
+        self._proximo_id = 0
+        self._leitor = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def do_ambiente(cls):
+        return cls(int(os.getenv('CLUSTER_ID', '0')), os.getenv('CLUSTER_IPC'),
+                   os.getenv('CLUSTER_IPC_SEGREDO', ''))
+
+    async def _conectar(self):
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        host, porta = self.endereco.rsplit(':', 1)
+        self._reader, self._writer = await asyncio.open_connection(host, int(porta))
+        self._enviar({'op': 'ola', 'cluster': self.cluster_id, 'segredo': self.segredo})
+        self._leitor = asyncio.create_task(self._ler())
+
+    def _enviar(self, mensagem):
+        self._writer.write(json.dumps(mensagem).encode() + b'\n')
+
+    async def _ler(self):
+        try:
+            async for linha in self._reader:
+                mensagem = json.loads(linha)
+                futuro = self._pendentes.pop(mensagem.get('id'), None)
+                if futuro and not futuro.done():
+                    futuro.set_result(mensagem['dados'])
+        except ConnectionError:
+            pass
+        finally:
+            for futuro in self._pendentes.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("IPC desconectado"))
+            self._pendentes.clear()
+            self._writer = None
+
+    async def publicar(self, **dados):
+        self._local.update(dados)
+        if not self.endereco:
+            return
+        async with self._lock:
+            try:
+                await self._conectar()
+                self._enviar({'op': 'publicar', 'dados': self._local})
+                await self._writer.drain()
+            except (OSError, AttributeError) as e:
+                logger.warning(f"Falha ao publicar estado no IPC: {e}")
+
+    async def agregar(self, timeout=5.0):
+        """Estado publicado por todos os clusters: ``{cluster_id: dados}``."""
+        if not self.endereco:
+            return {str(self.cluster_id): dict(self._local)}
+        async with self._lock:
+            await self._conectar()
+            self._proximo_id += 1
+            futuro = asyncio.get_running_loop().create_future()
+            self._pendentes[self._proximo_id] = futuro
+            self._enviar({'op': 'agregar', 'id': self._proximo_id})
+            await self._writer.drain()
+        return await asyncio.wait_for(futuro, timeout)
+
+    async def total(self, chave):
+        """Soma ``chave`` no estado de todos os clusters."""
+        return sum(dados.get(chave, 0) for dados in (await self.agregar()).values())
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._leitor is not None:
+            self._leitor.cancel()
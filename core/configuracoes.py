@@ -0,0 +1,136 @@
+"""Configurações por servidor: SQLite como armazenamento e cache em memória.
+
+O prefixo é resolvido a cada mensagem que o bot vê, então a leitura tem que
+ser um ``dict.get``: todas as linhas são carregadas no ``start`` (só existem
+linhas para servidores que mudaram algo) e servidores sem linha usam o objeto
+``PADRAO``. Cada ``Configuracao`` é imutável na prática; ``definir`` troca o
+objeto no cache de uma vez, então uma leitura nunca vê uma mudança pela
+metade.
+
+As escritas atualizam o cache na hora e marcam o servidor como pendente; os
+pendentes são gravados juntos num único ``executemany`` depois de
+``atraso_gravacao`` segundos (e no ``close``).
+"""
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger('discord_bot.configuracoes')
+
+# Campo -> valor padrão (o comportamento de antes das configurações)
+CAMPOS = {
+    'prefixo': '*',
+    'boas_vindas': True,
+    'canal_boas_vindas': None,  # None: canal de sistema do servidor
+    'versao_biblia': 'nvi',
+    'cargo_muted': 'Muted',
+}
+
+VERSOES_BIBLIA = {
+    'nvi': 'NVI (Nova Versão Internacional)',
+    'acf': 'ACF (Almeida Corrigida Fiel)',
+    'ra': 'RA (Almeida Revista e Atualizada)',
+    'apee': 'APEE (A Bíblia Sagrada, Portugal)',
+    'kjv': 'KJV (King James Version)',
+    'bbe': 'BBE (Bible in Basic English)',
+    'rvr': 'RVR (Reina Valera)',
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS configuracoes (
+    guild_id INTEGER PRIMARY KEY,
+    prefixo TEXT NOT NULL,
+    boas_vindas INTEGER NOT NULL,
+    canal_boas_vindas INTEGER,
+    versao_biblia TEXT NOT NULL,
+    cargo_muted TEXT NOT NULL,
+    atualizado_em REAL NOT NULL
+);
+"""
+
+
+class Configuracao:
+    __slots__ = tuple(CAMPOS)
+
+    def __init__(self, **valores):
+        for campo, padrao in CAMPOS.items():
+            setattr(self, campo, valores.get(campo, padrao))
+
+    def com(self, **mudancas):
+        """Cópia com ``mudancas`` aplicadas."""
+        desconhecidos = set(mudancas) - set(CAMPOS)
+        if desconhecidos:
+            raise KeyError(f"Configuração desconhecida: {', '.join(sorted(desconhecidos))}")
+        valores = {campo: getattr(self, campo) for campo in CAMPOS}
+        valores.update(mudancas)
+        return Configuracao(**valores)
+
+
+PADRAO = Configuracao()
+
+
+class Configuracoes:
+    def __init__(self, db, *, atraso_gravacao=1.0):
+        self.db = db
+        self.atraso_gravacao = atraso_gravacao
+        self._cache = {}
+        self._pendentes = set()
+        self._gravacao = None
+
+    async def start(self):
+        await self.db.executescript(ESQUEMA)
+        for guild_id, prefixo, boas_vindas, canal, versao, cargo in await self.db.fetchall(
+            "SELECT guild_id, prefixo, boas_vindas, canal_boas_vindas, versao_biblia, cargo_muted "
+            "FROM configuracoes"
+        ):
+            self._cache[guild_id] = Configuracao(
+                prefixo=prefixo, boas_vindas=bool(boas_vindas), canal_boas_vindas=canal,
+                versao_biblia=versao, cargo_muted=cargo,
+            )
+        logger.info(f"Configurações de {len(self._cache)} servidor(es) carregadas")
+
+    def obter(self, guild_id):
+        return self._cache.get(guild_id, PADRAO)
+
+    def definir(self, guild_id, **mudancas):
+        """Aplica as mudanças no cache imediatamente e agenda a gravação."""
+        config = self.obter(guild_id).com(**mudancas)
+        self._cache[guild_id] = config
+        self._pendentes.add(guild_id)
+        if self._gravacao is None:
+            self._gravacao = asyncio.create_task(self._gravar_depois())
+        return config
+
+    async def _gravar_depois(self):
+        try:
+            await asyncio.sleep(self.atraso_gravacao)
+        finally:
+            self._gravacao = None
+        await self.gravar()
+
+    async def gravar(self):
+        if not self._pendentes:
+            return
+        pendentes, self._pendentes = self._pendentes, set()
+        agora = time.time()
+        linhas = []
+        for guild_id in pendentes:
+            c = self._cache[guild_id]
+            linhas.append((guild_id, c.prefixo, int(c.boas_vindas), c.canal_boas_vindas,
+                           c.versao_biblia, c.cargo_muted, agora))
+        try:
+            await self.db.executemany(
+                "INSERT OR REPLACE INTO configuracoes (guild_id, prefixo, boas_vindas, canal_boas_vindas, "
+                "versao_biblia, cargo_muted, atualizado_em) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                linhas,
+            )
+        except Exception as e:
+            logger.error(f"Erro ao gravar configurações: {e}")
+            self._pendentes |= pendentes
+
+    async def close(self):
+        if self._gravacao is not None:
+            self._gravacao.cancel()
+            self._gravacao = None
+        await self.gravar()
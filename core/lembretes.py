@@ -0,0 +1,161 @@
+"""Agendador persistente de lembretes.
+
+Os lembretes ficam no SQLite; em memória só existe um heap com
+``(horário, id)`` dos que vencem dentro da janela atual (``horizonte``
+segundos). Uma única task despacha os vencidos e recarrega a janela quando
+ela termina, então centenas de milhares de lembretes pendentes não ocupam
+memória além do que vence na próxima hora.
+
+A entrega é "no máximo uma vez": o lembrete é removido do banco
+(``DELETE ... RETURNING``) antes de ser entregue. Por isso o despachante só
+retira lembretes depois que ``entregador`` retorna a função de entrega; o bot
+espera o READY e a extensão carregada, então um lembrete vencido nunca sai do
+banco enquanto o processo ainda não consegue entregá-lo (antes do READY, no
+meio de uma recarga ou em ``python main.py sync``).
+
+Com clusters, cada processo só carrega os lembretes dos servidores dos seus
+shards (``(guild_id >> 22) % shard_count``); os de DM ficam com o cluster
+que tem o shard 0, que é o que recebe as interações em DM.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger('discord_bot.lembretes')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS lembretes (
+    id INTEGER PRIMARY KEY,
+    quando REAL NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    canal_id INTEGER,
+    guild_id INTEGER,
+    mensagem TEXT NOT NULL,
+    criado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lembretes_quando ON lembretes (quando);
+"""
+
+# Máximo de lembretes entregues por rodada do despachante
+LOTE = 100
+
+
+class Lembrete(NamedTuple):
+    id: int
+    quando: float
+    usuario_id: int
+    canal_id: int
+    guild_id: int
+    mensagem: str
+
+
+class AgendadorLembretes:
+    def __init__(self, db, entregador, *, horizonte=3600.0, relogio=time.time,
+                 shards=None, shard_count=None):
+        self.db = db
+        self._entregador = entregador
+        self.horizonte = horizonte
+        self._relogio = relogio
+        self._heap = []
+        self._fim_janela = 0.0
+        self._acordar = asyncio.Event()
+        self._task = None
+
+        self._filtro, self._filtro_params = '', ()
+        if shards is not None and shard_count:
+            marcadores = ','.join('?' * len(shards))
+            dm = 'guild_id IS NULL OR ' if 0 in shards else ''
+            self._filtro = f" AND ({dm}(guild_id >> 22) % ? IN ({marcadores}))"
+            self._filtro_params = (shard_count, *shards)
+
+    async def start(self):
+        await self.db.executescript(ESQUEMA)
+        await self._recarregar()
+        pendentes = await self.pendentes()
+        logger.info(f"{pendentes} lembrete(s) pendente(s) carregado(s)")
+        self._task = asyncio.create_task(self._despachar(), name='lembretes')
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def pendentes(self):
+        return (await self.db.fetchone("SELECT COUNT(*) FROM lembretes"))[0]
+
+    async def agendar(self, usuario_id, canal_id, guild_id, mensagem, quando):
+        """Grava um lembrete para o horário ``quando`` (timestamp Unix) e retorna o id."""
+        lembrete_id = await self.db.execute(
+            "INSERT INTO lembretes (quando, usuario_id, canal_id, guild_id, mensagem, criado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (quando, usuario_id, canal_id, guild_id, mensagem, self._relogio()),
+        )
+        if quando < self._fim_janela:
+            heapq.heappush(self._heap, (quando, lembrete_id))
+            if self._heap[0][1] == lembrete_id:
+                self._acordar.set()
+        return lembrete_id
+
+    async def _recarregar(self):
+        self._fim_janela = self._relogio() + self.horizonte
+        linhas = await self.db.fetchall(
+            f"SELECT quando, id FROM lembretes WHERE quando < ?{self._filtro}",
+            (self._fim_janela, *self._filtro_params),
+        )
+        self._heap = [tuple(linha) for linha in linhas]
+        heapq.heapify(self._heap)
+
+    async def _retirar(self, ids):
+        marcadores = ','.join('?' * len(ids))
+
+        def retirar(conn):
+            with conn:
+                return conn.execute(
+                    f"DELETE FROM lembretes WHERE id IN ({marcadores}) "
+                    "RETURNING id, quando, usuario_id, canal_id, guild_id, mensagem",
+                    ids,
+                ).fetchall()
+
+        return [Lembrete(*linha) for linha in await self.db.run(retirar)]
+
+    async def _despachar(self):
+        while True:
+            try:
+                agora = self._relogio()
+                if agora >= self._fim_janela:
+                    await self._recarregar()
+
+                if self._heap and self._heap[0][0] <= agora:
+                    entregar = await self._entregador()
+                    vencidos = []
+                    while self._heap and self._heap[0][0] <= agora and len(vencidos) < LOTE:
+                        vencidos.append(heapq.heappop(self._heap)[1])
+                    lembretes = await self._retirar(vencidos)
+                    resultados = await asyncio.gather(
+                        *(entregar(l) for l in lembretes), return_exceptions=True
+                    )
+                    for lembrete, resultado in zip(lembretes, resultados):
+                        if isinstance(resultado, Exception):
+                            logger.warning(f"Falha ao entregar lembrete {lembrete.id}: {resultado}")
+                    continue
+
+                proximo = self._heap[0][0] if self._heap else math.inf
+                espera = max(0.0, min(proximo, self._fim_janela) - agora)
+                self._acordar.clear()
+                try:
+                    await asyncio.wait_for(self._acordar.wait(), timeout=espera)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no despachante de lembretes: {e}")
+                await asyncio.sleep(5)
@@ -0,0 +1,196 @@
+"""Limites de uso (token bucket) por usuário, canal, servidor ou global.
+
+Cada ``Limite`` permite ``vezes`` usos a cada ``por`` segundos, com rajada de
+até ``vezes``. Os baldes são objetos com ``__slots__`` num ``OrderedDict``
+ordenado pelo último uso. Um balde que voltou a encher é igual a um balde
+novo, então pode ser descartado sem mudar o comportamento. A cada consulta
+saem da frente os baldes já cheios, e o dicionário só guarda quem usou o
+comando nos últimos ``por`` segundos, com milhões de usuários ou não.
+
+Os decoradores ``limitar_slash`` e ``limitar_prefixo`` aplicam um limite a um
+comando. A rejeição acontece no check, antes de qualquer chamada REST; nos
+comandos de prefixo só a primeira rejeição da janela é avisada no canal, as
+seguintes são descartadas em silêncio. Vários decoradores no mesmo comando
+(usuário e servidor, por exemplo) viram um único check que confere todos os
+baldes antes de gastar de qualquer um: um uso recusado pelo limite do
+servidor não conta no do usuário. Ao recarregar uma extensão, o comando
+volta a usar o mesmo ``Limite`` (com os baldes de antes) se os parâmetros não
+mudaram.
+"""
+
+import time
+from collections import OrderedDict
+
+from discord import app_commands
+from discord.ext import commands
+
+ESCOPOS = ('usuario', 'canal', 'guild', 'global')
+
+# Todos os limites criados, para exportar métricas
+LIMITES = []
+
+
+class Balde:
+    __slots__ = ('tokens', 'atualizado', 'avisado')
+
+    def __init__(self, tokens, atualizado):
+        self.tokens = tokens
+        self.atualizado = atualizado
+        self.avisado = False
+
+
+class Limite:
+    def __init__(self, vezes, por, *, escopo='usuario', nome=None, relogio=time.monotonic):
+        if escopo not in ESCOPOS:
+            raise ValueError(f"Escopo desconhecido: {escopo!r} (use um de {', '.join(ESCOPOS)})")
+        self.vezes = vezes
+        self.por = por
+        self.taxa = vezes / por
+        self.escopo = escopo
+        self.nome = nome
+        self._relogio = relogio
+        self._baldes = OrderedDict()
+        self.rejeicoes = 0
+        LIMITES.append(self)
+
+    def __len__(self):
+        return len(self._baldes)
+
+    def _descartar_cheios(self, agora):
+        baldes = self._baldes
+        while baldes:
+            chave = next(iter(baldes))
+            balde = baldes[chave]
+            if balde.tokens + (agora - balde.atualizado) * self.taxa < self.vezes:
+                break
+            del baldes[chave]
+
+    def espera(self, chave, custo=1):
+        """Segundos até o balde de ``chave`` ter ``custo`` tokens (0.0 se já tem), sem gastar."""
+        agora = self._relogio()
+        self._descartar_cheios(agora)
+        balde = self._baldes.get(chave)
+        if balde is None:
+            balde = self._baldes[chave] = Balde(float(self.vezes), agora)
+        else:
+            self._baldes.move_to_end(chave)
+            balde.tokens = min(float(self.vezes), balde.tokens + (agora - balde.atualizado) * self.taxa)
+            balde.atualizado = agora
+        return max(0.0, (custo - balde.tokens) / self.taxa)
+
+    def consumir(self, chave, custo=1):
+        """Gasta ``custo`` tokens do balde de ``chave``.
+
+        Retorna 0.0 se o uso foi permitido ou, se não foi, quantos segundos
+        faltam para haver tokens suficientes.
+        """
+        espera = self.espera(chave, custo)
+        if espera:
+            self.rejeicoes += 1
+            return espera
+        balde = self._baldes[chave]
+        balde.tokens -= custo
+        balde.avisado = False
+        return 0.0
+
+    def avisar(self, chave):
+        """True só na primeira rejeição desde o último uso permitido."""
+        balde = self._baldes.get(chave)
+        if balde is None or balde.avisado:
+            return False
+        balde.avisado = True
+        return True
+
+    def chave(self, usuario, canal_id, guild_id):
+        if self.escopo == 'usuario':
+            return usuario.id
+        if self.escopo == 'canal':
+            return canal_id
+        if self.escopo == 'guild':
+            return guild_id or usuario.id
+        return None
+
+
+class Limitado(commands.CommandOnCooldown):
+    """Rejeição de um comando de prefixo; ``silencioso`` se o usuário já foi avisado."""
+
+    def __init__(self, limite, retry_after, silencioso):
+        super().__init__(commands.Cooldown(limite.vezes, limite.por), retry_after, commands.BucketType.default)
+        self.silencioso = silencioso
+
+
+def _limite_do_comando(func, vezes, por, escopo):
+    """O ``Limite`` já registrado para o comando, ou um novo se não há ou os parâmetros mudaram."""
+    nome = f"{func.__name__}:{escopo}"
+    for i, limite in enumerate(LIMITES):
+        if limite.nome == nome:
+            if (limite.vezes, limite.por) == (vezes, por):
+                return limite
+            del LIMITES[i]
+            break
+    return Limite(vezes, por, escopo=escopo, nome=nome)
+
+
+def _consumir_todos(limites, usuario, canal_id, guild_id):
+    """Gasta um token de cada limite só se todos permitem.
+
+    Retorna ``(None, 0.0, None)`` se o uso foi permitido, senão o limite que
+    mais demora a liberar, a espera e a chave dele.
+    """
+    chaves = [(limite, limite.chave(usuario, canal_id, guild_id)) for limite in limites]
+    pior = (None, 0.0, None)
+    for limite, chave in chaves:
+        espera = limite.espera(chave)
+        if espera > pior[1]:
+            pior = (limite, espera, chave)
+    if pior[0] is not None:
+        pior[0].rejeicoes += 1
+        return pior
+    for limite, chave in chaves:
+        limite.consumir(chave)
+    return pior
+
+
+def _limites_da_funcao(func, limite):
+    """Junta ``limite`` aos já aplicados em ``func``; True se é o primeiro (e o check ainda não existe)."""
+    limites = getattr(func, '__limites__', None)
+    if limites is not None:
+        limites.append(limite)
+        return False
+    func.__limites__ = [limite]
+    return True
+
+
+def limitar_slash(vezes, por, escopo='usuario'):
+    """Limite para um comando slash; a rejeição vira ``app_commands.CommandOnCooldown``."""
+    def decorador(func):
+        if not _limites_da_funcao(func, _limite_do_comando(func, vezes, por, escopo)):
+            return func
+        limites = func.__limites__
+
+        async def predicado(interaction):
+            limite, espera, _ = _consumir_todos(limites, interaction.user, interaction.channel_id, interaction.guild_id)
+            if espera:
+                raise app_commands.CommandOnCooldown(app_commands.Cooldown(limite.vezes, limite.por), espera)
+            return True
+
+        return app_commands.check(predicado)(func)
+    return decorador
+
+
+def limitar_prefixo(vezes, por, escopo='usuario'):
+    """Limite para um comando de prefixo; a rejeição vira ``Limitado``."""
+    def decorador(func):
+        if not _limites_da_funcao(func, _limite_do_comando(func, vezes, por, escopo)):
+            return func
+        limites = func.__limites__
+
+        async def predicado(ctx):
+            limite, espera, chave = _consumir_todos(limites, ctx.author, ctx.channel.id,
+                                                    ctx.guild.id if ctx.guild else None)
+            if espera:
+                raise Limitado(limite, espera, silencioso=not limite.avisar(chave))
+            return True
+
+        return commands.check(predicado)(func)
+    return decorador
@@ -0,0 +1,158 @@
+"""Limpeza de mensagens em fluxo para o ``/limpar``.
+
+O histórico do canal é lido página a página (100 mensagens por GET) e nunca
+fica inteiro na memória: as mensagens que passam no filtro vão para um lote
+de no máximo 100, apagado com um único bulk delete assim que enche. A API só
+aceita bulk delete de mensagens com menos de 14 dias; as mais antigas são
+apagadas uma a uma, num ritmo bem abaixo do limite da rota. Todas as
+exclusões passam também pelo ritmo global do bot (``bot.ritmo``). Como o histórico
+vem da mais nova para a mais antiga, depois da primeira mensagem antiga todas
+as seguintes também são.
+"""
+
+import datetime
+import logging
+import re
+import time
+
+import discord
+
+from core.ritmo import Ritmo
+
+logger = logging.getLogger('discord_bot.limpeza')
+
+LOTE_MAX = 100
+# Margem para a varredura não cruzar o limite de 14 dias no meio do lote
+IDADE_MAX_LOTE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+
+_LINK = re.compile(r'https?://\S', re.IGNORECASE)
+
+
+class FiltroLimpeza:
+    """Critérios de seleção; todos os informados precisam ser atendidos."""
+
+    def __init__(self, *, autor_id=None, so_bots=False, padrao=None, anexos=False, links=False):
+        self.autor_id = autor_id
+        self.so_bots = so_bots
+        self.padrao = re.compile(padrao, re.IGNORECASE) if padrao else None
+        self.anexos = anexos
+        self.links = links
+
+    def __call__(self, mensagem):
+        if mensagem.pinned:
+            return False
+        if self.autor_id is not None and mensagem.author.id != self.autor_id:
+            return False
+        if self.so_bots and not mensagem.author.bot:
+            return False
+        if self.anexos and not mensagem.attachments:
+            return False
+        if self.links and not _LINK.search(mensagem.content):
+            return False
+        if self.padrao is not None and not self.padrao.search(mensagem.content):
+            return False
+        return True
+
+
+class Limpeza:
+    """Uma limpeza em andamento num canal.
+
+    ``limite`` é o número de mensagens examinadas (como no ``purge`` do
+    discord.py); ``desde`` restringe a janela de tempo e encerra a leitura do
+    histórico assim que ela é ultrapassada. ``ao_progresso`` é chamado no
+    máximo a cada ``intervalo_progresso`` segundos. ``ritmo`` é o ritmo global
+    do bot; ``ritmo_antigas`` espaça só as exclusões uma a uma deste canal.
+    """
+
+    def __init__(self, canal, limite, filtro, *, ritmo, desde=None, motivo=None, ao_progresso=None,
+                 intervalo_progresso=2.0, ritmo_antigas=None):
+        self.canal = canal
+        self.limite = limite
+        self.filtro = filtro
+        self.desde = desde
+        self.motivo = motivo
+        self.ao_progresso = ao_progresso
+        self.intervalo_progresso = intervalo_progresso
+        self._ritmo = ritmo
+        self._ritmo_antigas = ritmo_antigas or Ritmo(1.0)
+        self.examinadas = 0
+        self.apagadas = 0
+        self.falhas = 0
+        self.cancelada = False
+        self.concluida = False
+        self._ultimo_progresso = time.monotonic()
+
+    def cancelar(self):
+        self.cancelada = True
+
+    def resumo(self):
+        return (f"{self.apagadas} apagada(s) de {self.examinadas} examinada(s)"
+                f"{f' • {self.falhas} falha(s)' if self.falhas else ''}")
+
+    async def executar(self):
+        lote = []
+        corte = discord.utils.utcnow() - IDADE_MAX_LOTE
+        try:
+            async for mensagem in self.canal.history(limit=self.limite, after=self.desde, oldest_first=False):
+                if self.cancelada:
+                    break
+                self.examinadas += 1
+                await self._progresso()
+                if not self.filtro(mensagem):
+                    continue
+                if mensagem.created_at > corte:
+                    lote.append(mensagem)
+                    if len(lote) == LOTE_MAX:
+                        await self._apagar_lote(lote)
+                        lote = []
+                else:
+                    if lote:
+                        # As recentes vão antes de começar o ritmo lento das antigas,
+                        # senão podem passar dos 14 dias esperando a vez
+                        await self._apagar_lote(lote)
+                        lote = []
+                    await self._apagar_antiga(mensagem)
+            if lote and not self.cancelada:
+                await self._apagar_lote(lote)
+        finally:
+            self.concluida = True
+        return self
+
+    async def _apagar_lote(self, lote):
+        await self._ritmo.aguardar()
+        try:
+            # Com uma única mensagem o discord.py usa o DELETE simples
+            await self.canal.delete_messages(lote, reason=self.motivo)
+            self.apagadas += len(lote)
+        except discord.NotFound:
+            # Alguma já tinha sido apagada; o bulk delete falha inteiro
+            for mensagem in lote:
+                await self._apagar_antiga(mensagem, pausar=False)
+        except discord.HTTPException as e:
+            self.falhas += len(lote)
+            logger.warning(f"Falha no bulk delete em {self.canal.id}: {e}")
+
+    async def _apagar_antiga(self, mensagem, pausar=True):
+        if pausar:
+            await self._ritmo_antigas.aguardar()
+        await self._ritmo.aguardar()
+        try:
+            await mensagem.delete()
+            self.apagadas += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            self.falhas += 1
+            logger.warning(f"Falha ao apagar mensagem {mensagem.id}: {e}")
+
+    async def _progresso(self):
+        if self.ao_progresso is None:
+            return
+        agora = time.monotonic()
+        if agora - self._ultimo_progresso < self.intervalo_progresso:
+            return
+        self._ultimo_progresso = agora
+        try:
+            await self.ao_progresso(self)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar o progresso da limpeza: {e}")
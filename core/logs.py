@@ -0,0 +1,211 @@
+"""Logs sem bloquear o event loop: fila, thread própria, JSON e rotação.
+
+No event loop, um ``logger.x(...)`` só passa pelo filtro de repetições e vai
+para uma fila com ``put_nowait``. A formatação e a escrita (console e
+arquivo) ficam numa thread do ``QueueListener``. Se a fila encher (disco
+travado, por exemplo), os registros novos são descartados e contados, sem
+fazer ninguém esperar.
+
+O arquivo tem um registro JSON por linha e é rotacionado por tamanho
+(``RotatingFileHandler``). Além de data, nível, logger e mensagem, cada
+registro leva os campos de contexto que existirem (``CAMPOS``). Eles podem
+vir de ``extra=`` ou do comando em execução: ``contexto(...)`` guarda os
+campos numa ``ContextVar`` e o handler da fila os copia para o registro
+ainda na thread do loop, que é onde a variável tem valor.
+
+Avisos e erros repetidos (mesmo logger, nível e mensagem) passam uma vez por
+``janela`` segundos. As cópias suprimidas são contadas, e a próxima que
+passar leva o total no campo ``suprimidas``. Numa tempestade de erros (a API
+bíblica fora do ar, por exemplo) sai uma linha por janela, não milhares.
+"""
+
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from collections import OrderedDict
+
+# Campos de contexto exportados no JSON quando presentes no registro
+CAMPOS = ('guild_id', 'canal_id', 'usuario_id', 'comando', 'latencia_ms', 'erro', 'shard_id', 'suprimidas')
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_CONTEXTO = contextvars.ContextVar('contexto_log', default=None)
+
+
+def contexto(**campos):
+    """Campos anexados a todo registro emitido daqui em diante nesta task."""
+    _CONTEXTO.set(campos)
+
+
+class _Vista:
+    __slots__ = ('inicio', 'suprimidas')
+
+    def __init__(self, inicio):
+        self.inicio = inicio
+        self.suprimidas = 0
+
+
+class FiltroRepetidos(logging.Filter):
+    """Deixa passar um aviso/erro igual por ``janela`` segundos."""
+
+    def __init__(self, janela=60.0, nivel=logging.WARNING, max_chaves=1024, relogio=time.monotonic):
+        super().__init__()
+        self.janela = janela
+        self.nivel = nivel
+        self.max_chaves = max_chaves
+        self.suprimidas = 0
+        self._relogio = relogio
+        self._vistas = OrderedDict()
+
+    def filter(self, record):
+        if record.levelno < self.nivel or not self.janela:
+            return True
+        # Mensagens do repositório são f-strings (sem args); com args, formata
+        chave = (record.name, record.levelno, record.getMessage() if record.args else str(record.msg))
+        agora = self._relogio()
+        vista = self._vistas.get(chave)
+        if vista is not None and agora - vista.inicio < self.janela:
+            vista.suprimidas += 1
+            self.suprimidas += 1
+            return False
+        if vista is not None and vista.suprimidas:
+            record.suprimidas = vista.suprimidas
+        self._vistas[chave] = _Vista(agora)
+        self._vistas.move_to_end(chave)
+        while len(self._vistas) > self.max_chaves:
+            self._vistas.popitem(last=False)
+        return True
+
+    def pendentes(self):
+        """[(logger, nível, mensagem, suprimidas)] das janelas ainda abertas com cópias suprimidas."""
+        return [(*chave, v.suprimidas) for chave, v in self._vistas.items() if v.suprimidas]
+
+
+class FilaLogs(logging.handlers.QueueHandler):
+    """QueueHandler que não formata nem bloqueia na thread de quem loga."""
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        # O QueueHandler padrão formata aqui (na thread do loop); a fila é
+        # só entre threads, então o registro vai como está e a thread formata.
+        campos = _CONTEXTO.get()
+        if campos:
+            for nome, valor in campos.items():
+                if not hasattr(record, nome):
+                    setattr(record, nome, valor)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class FormatoJSON(logging.Formatter):
+    def __init__(self, fixos=None):
+        super().__init__()
+        self.fixos = fixos or {}
+
+    def format(self, record):
+        dados = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            **self.fixos,
+        }
+        for campo in CAMPOS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                dados[campo] = valor
+        if record.exc_info:
+            dados['exc'] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    """O formato de sempre no console, com o total de repetições suprimidas."""
+
+    def format(self, record):
+        texto = super().format(record)
+        suprimidas = getattr(record, 'suprimidas', None)
+        if suprimidas:
+            texto += f" (+{suprimidas} igual(is) suprimida(s))"
+        return texto
+
+
+class Logs:
+    """Pipeline montado por ``configurar``; ``close`` esvazia a fila e para a thread."""
+
+    def __init__(self, fila, handler, filtro, listener, saidas):
+        self.fila = fila
+        self.handler = handler
+        self.filtro = filtro
+        self.listener = listener
+        self.saidas = saidas
+
+    @property
+    def descartados(self):
+        return self.handler.descartados
+
+    @property
+    def suprimidas(self):
+        return self.filtro.suprimidas
+
+    def close(self):
+        if self.listener is None:
+            return
+        for nome, nivel, msg, suprimidas in self.filtro.pendentes():
+            logging.getLogger(nome).log(nivel, f"{msg} (repetida mais {suprimidas} vez(es) antes de encerrar)")
+        self.listener.stop()
+        self.listener = None
+        for saida in self.saidas:
+            saida.close()
+
+
+def configurar(*, nivel='INFO', formato='texto', arquivo=None, arquivo_bytes=10 * 1024 * 1024,
+               arquivo_copias=5, janela=60.0, fila=10000, fixos=None):
+    """Troca os handlers do logger raiz pela fila; retorna o ``Logs``.
+
+    ``formato`` é o do console (``texto`` ou ``json``); o arquivo, se houver,
+    é sempre JSON.
+    """
+    fixos = fixos or {}
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(FormatoJSON(fixos) if formato == 'json' else FormatoTexto(FORMATO_TEXTO))
+    handlers = [console]
+    if arquivo:
+        os.makedirs(os.path.dirname(arquivo) or '.', exist_ok=True)
+        rotativo = logging.handlers.RotatingFileHandler(
+            arquivo, maxBytes=arquivo_bytes, backupCount=arquivo_copias, encoding='utf-8', delay=True
+        )
+        rotativo.setFormatter(FormatoJSON(fixos))
+        handlers.append(rotativo)
+
+    fila = queue.Queue(maxsize=fila)
+    handler = FilaLogs(fila)
+    filtro = FiltroRepetidos(janela)
+    handler.addFilter(filtro)
+
+    raiz = logging.getLogger()
+    for antigo in raiz.handlers[:]:
+        raiz.removeHandler(antigo)
+    raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+
+    listener = logging.handlers.QueueListener(fila, *handlers)
+    listener.start()
+    logs = Logs(fila, handler, filtro, listener, handlers)
+    atexit.register(logs.close)
+    return logs
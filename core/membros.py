@@ -0,0 +1,98 @@
+"""Políticas de cache de membros para limitar a memória em servidores grandes.
+
+O bot usa o intent de membros só para ``on_member_join`` e para comandos que
+já recebem o ``Member`` pronto na interação; baixar e manter todos os membros
+de todos os servidores é desperdício. A política é escolhida na
+inicialização (``MEMBROS_POLITICA``):
+
+``completo``
+    comportamento padrão do discord.py: chunk de todos os servidores na
+    conexão e cache de todos os membros.
+``sem_chunk``
+    nenhum chunk; só ficam em cache os membros vistos em eventos. O que
+    falta em cache (o dono no ``/info-servidor``) vem de ``fetch_member``.
+``sob_demanda``
+    como ``sem_chunk``, mas a primeira busca que não acha um membro de um
+    servidor dispara o chunk dele em segundo plano; essa busca ainda usa
+    ``fetch_member`` (o comando não espera a lista toda) e as seguintes
+    acham os membros em cache.
+``lru``
+    o discord.py não guarda membros; um LRU limitado (``MEMBROS_LRU``)
+    guarda os membros ativos recentemente.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+import discord
+
+logger = logging.getLogger('discord_bot.membros')
+
+POLITICAS = ('completo', 'sem_chunk', 'sob_demanda', 'lru')
+
+
+def opcoes_bot(politica, intents):
+    """Argumentos de ``commands.Bot`` correspondentes à política."""
+    if politica not in POLITICAS:
+        raise ValueError(f"Política de membros desconhecida: {politica!r} (use {', '.join(POLITICAS)})")
+    if politica == 'completo':
+        return {'chunk_guilds_at_startup': True,
+                'member_cache_flags': discord.MemberCacheFlags.from_intents(intents)}
+    if politica == 'lru':
+        return {'chunk_guilds_at_startup': False,
+                'member_cache_flags': discord.MemberCacheFlags.none()}
+    return {'chunk_guilds_at_startup': False,
+            'member_cache_flags': discord.MemberCacheFlags.from_intents(intents)}
+
+
+class CacheMembros:
+    def __init__(self, politica, *, max_lru=10_000):
+        self.politica = politica
+        self.max_lru = max_lru
+        self._lru = OrderedDict()
+        self._chunks = {}      # guild_id -> task do chunk em andamento
+
+    def lembrar(self, membro):
+        """Registra atividade de um membro (só tem efeito na política ``lru``)."""
+        if self.politica == 'lru' and isinstance(membro, discord.Member):
+            self._guardar(membro)
+
+    def _guardar(self, membro):
+        chave = (membro.guild.id, membro.id)
+        self._lru[chave] = membro
+        self._lru.move_to_end(chave)
+        if len(self._lru) > self.max_lru:
+            self._lru.popitem(last=False)
+
+    def esquecer(self, guild_id, user_id):
+        self._lru.pop((guild_id, user_id), None)
+
+    def obter(self, guild, user_id):
+        """Membro em cache (do discord.py ou do LRU), sem chamada REST."""
+        return guild.get_member(user_id) or self._lru.get((guild.id, user_id))
+
+    async def buscar(self, guild, user_id):
+        """Como ``obter``, mas cai para ``fetch_member`` se não estiver em cache."""
+        membro = self.obter(guild, user_id)
+        if membro is None:
+            if self.politica == 'sob_demanda' and not guild.chunked:
+                self._chunk(guild)
+            membro = await guild.fetch_member(user_id)
+            self.lembrar(membro)
+        return membro
+
+    def _chunk(self, guild):
+        """Inicia (uma vez por servidor) o chunk em segundo plano."""
+        if guild.id in self._chunks:
+            return
+        logger.info(f"Carregando membros de {guild.name} ({guild.id}) sob demanda")
+        task = asyncio.create_task(guild.chunk(cache=True), name=f'chunk-{guild.id}')
+        self._chunks[guild.id] = task
+
+        def concluido(task):
+            del self._chunks[guild.id]
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Falha no chunk de {guild.id}: {task.exception()}")
+
+        task.add_done_callback(concluido)
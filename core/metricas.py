@@ -0,0 +1,301 @@
+"""Métricas internas do bot: contadores, histogramas e atraso do event loop.
+
+Tudo fica em memória, em dicionários simples; registrar uma observação é um
+``bisect`` e algumas somas, então o custo no caminho quente é desprezível. O
+estado é exportado em formato de texto do Prometheus por um endpoint HTTP
+local (``Metricas.servir``) e resumido no ``/ping``.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import deque
+
+from aiohttp import web
+from discord import app_commands
+
+from core.logs import contexto as contexto_log
+
+logger = logging.getLogger('discord_bot.metricas')
+# Um registro por comando concluído; servidor, canal e comando vêm do contexto
+# (os eventos de conclusão são criados na task do comando e herdam o contexto)
+logger_comandos = logging.getLogger('discord_bot.comandos')
+
+# Limites (em segundos) dos buckets de latência
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    """Histograma de buckets fixos, como o do Prometheus."""
+
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites=BUCKETS_PADRAO):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # o último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def quantil(self, q):
+        """Estimativa do quantil ``q`` por interpolação linear dentro do bucket."""
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            if acumulado + contagem >= alvo and contagem:
+                inicio = self.limites[i - 1] if i else 0.0
+                if i == len(self.limites):
+                    return inicio
+                return inicio + (self.limites[i] - inicio) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites[-1]
+
+
+def _rotulos(rotulos):
+    if not rotulos:
+        return ''
+    pares = ','.join(f'{chave}="{str(valor)}"' for chave, valor in rotulos)
+    return '{' + pares + '}'
+
+
+class Metricas:
+    """Registro de contadores, histogramas e medidores com rótulos.
+
+    Os rótulos são passados como argumentos nomeados e viram uma tupla de
+    pares ordenada, usada como chave. Medidores são funções avaliadas só na
+    exportação e podem devolver um número ou uma lista de ``(rotulos, valor)``.
+    """
+
+    def __init__(self, prefixo='soninho'):
+        self.prefixo = prefixo
+        self._contadores = {}
+        self._histogramas = {}
+        self._medidores = {}
+        self._ajuda = {}
+        self._runner = None
+
+    def contar(self, nome, valor=1, **rotulos):
+        serie = self._contadores.setdefault(nome, {})
+        chave = tuple(sorted(rotulos.items()))
+        serie[chave] = serie.get(chave, 0) + valor
+
+    def observar(self, nome, valor, **rotulos):
+        serie = self._histogramas.setdefault(nome, {})
+        chave = tuple(sorted(rotulos.items()))
+        histograma = serie.get(chave)
+        if histograma is None:
+            histograma = serie[chave] = Histograma()
+        histograma.observar(valor)
+
+    def medidor(self, nome, funcao, ajuda=''):
+        self._medidores[nome] = funcao
+        if ajuda:
+            self._ajuda[nome] = ajuda
+
+    def descrever(self, nome, ajuda):
+        self._ajuda[nome] = ajuda
+
+    def contador(self, nome, **rotulos):
+        """Soma das séries de ``nome`` que têm todos os ``rotulos`` dados."""
+        filtro = set(rotulos.items())
+        return sum(v for chave, v in self._contadores.get(nome, {}).items() if filtro <= set(chave))
+
+    def histograma(self, nome, **rotulos):
+        """Junta as séries de ``nome`` que têm os ``rotulos`` dados num só histograma."""
+        filtro = set(rotulos.items())
+        junto = Histograma()
+        for chave, h in self._histogramas.get(nome, {}).items():
+            if filtro <= set(chave):
+                junto.contagens = [a + b for a, b in zip(junto.contagens, h.contagens)]
+                junto.soma += h.soma
+                junto.total += h.total
+        return junto
+
+    # ===== Instrumentação de comandos =====
+
+    def comando(self, nome, tipo, inicio, erro=False):
+        rotulos = {'comando': nome, 'tipo': tipo}
+        self.contar('comandos_total', **rotulos)
+        if erro:
+            self.contar('comandos_erros_total', **rotulos)
+        latencia = None
+        if inicio is not None:
+            latencia = time.perf_counter() - inicio
+            self.observar('comandos_latencia_segundos', latencia, **rotulos)
+        if logger_comandos.isEnabledFor(logging.INFO):
+            logger_comandos.info(
+                f"{tipo} {nome} {'falhou' if erro else 'concluído'}",
+                extra={'latencia_ms': round(latencia * 1000, 2) if latencia is not None else None, 'erro': erro},
+            )
+
+    def interacao(self, interaction, erro=False):
+        """Registra o fim de um comando slash (o início é marcado pela árvore)."""
+        comando = interaction.command
+        nome = comando.qualified_name if comando else 'desconhecido'
+        self.comando(nome, 'slash', interaction.extras.get('metricas_inicio'), erro)
+
+    # ===== Exportação =====
+
+    def texto(self):
+        """Estado atual no formato de exposição em texto do Prometheus."""
+        linhas = []
+
+        def cabecalho(nome, tipo):
+            completo = f'{self.prefixo}_{nome}'
+            if nome in self._ajuda:
+                linhas.append(f'# HELP {completo} {self._ajuda[nome]}')
+            linhas.append(f'# TYPE {completo} {tipo}')
+            return completo
+
+        for nome, serie in sorted(self._contadores.items()):
+            completo = cabecalho(nome, 'counter')
+            for chave, valor in sorted(serie.items()):
+                linhas.append(f'{completo}{_rotulos(chave)} {valor}')
+
+        for nome, serie in sorted(self._histogramas.items()):
+            completo = cabecalho(nome, 'histogram')
+            for chave, h in sorted(serie.items()):
+                acumulado = 0
+                for limite, contagem in zip(h.limites + ('+Inf',), h.contagens):
+                    acumulado += contagem
+                    linhas.append(f'{completo}_bucket{_rotulos(chave + (("le", limite),))} {acumulado}')
+                linhas.append(f'{completo}_sum{_rotulos(chave)} {h.soma}')
+                linhas.append(f'{completo}_count{_rotulos(chave)} {h.total}')
+
+        for nome, funcao in sorted(self._medidores.items()):
+            try:
+                valor = funcao()
+            except Exception as e:
+                logger.warning(f"Falha ao ler o medidor {nome}: {e}")
+                continue
+            completo = cabecalho(nome, 'gauge')
+            if isinstance(valor, (int, float)):
+                linhas.append(f'{completo} {valor}')
+            else:
+                for rotulos, v in valor:
+                    linhas.append(f'{completo}{_rotulos(tuple(sorted(rotulos.items())))} {v}')
+
+        return '\n'.join(linhas) + '\n'
+
+    async def servir(self, host, porta):
+        async def metrics(request):
+            return web.Response(text=self.texto(), content_type='text/plain', charset='utf-8')
+
+        app = web.Application()
+        app.router.add_get('/metrics', metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, porta).start()
+        logger.info(f"Métricas disponíveis em http://{host}:{porta}/metrics")
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class AtrasoLoop:
+    """Mede o atraso do event loop acordando a cada ``intervalo`` segundos.
+
+    Se uma corrotina segura o loop (I/O síncrono, CPU), o ``sleep`` acorda
+    atrasado; a diferença vai para o histograma ``loop_atraso_segundos``. As
+    últimas ``janela`` amostras ficam guardadas para o resumo do ``/ping``.
+    """
+
+    def __init__(self, metricas, intervalo=0.25, janela=240):
+        self.metricas = metricas
+        self.intervalo = intervalo
+        self._recentes = deque(maxlen=janela)
+        self._task = None
+        metricas.descrever('loop_atraso_segundos', 'Atraso do event loop em relação ao agendado')
+
+    async def _medir(self):
+        while True:
+            inicio = time.perf_counter()
+            await asyncio.sleep(self.intervalo)
+            atraso = max(0.0, time.perf_counter() - inicio - self.intervalo)
+            self._recentes.append(atraso)
+            self.metricas.observar('loop_atraso_segundos', atraso)
+
+    def recente(self):
+        """(máximo, p99) do atraso na janela recente, em segundos."""
+        if not self._recentes:
+            return 0.0, 0.0
+        ordenados = sorted(self._recentes)
+        return ordenados[-1], ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.99))]
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._medir())
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class ArvoreInstrumentada(app_commands.CommandTree):
+    """Árvore de comandos que marca o início de cada comando slash.
+
+    O check roda na task do comando, então também define ali o contexto dos
+    logs (servidor, canal, usuário e comando).
+    """
+
+    async def interaction_check(self, interaction):
+        interaction.extras['metricas_inicio'] = time.perf_counter()
+        comando = interaction.command
+        contexto_log(guild_id=interaction.guild_id, canal_id=interaction.channel_id, usuario_id=interaction.user.id,
+                     comando=comando.qualified_name if comando else None)
+        return True
+
+
+def instrumentar(bot, metricas):
+    """Liga os eventos do bot às métricas de comandos e do gateway.
+
+    Erros de comandos slash são registrados pelo tratador de erros da árvore
+    com ``metricas.interacao(interaction, erro=True)``, já que o discord.py
+    não emite um evento para eles. O início dos comandos de prefixo
+    (``ctx.metricas_inicio``) é marcado pelo ``invoke`` do bot: o
+    ``on_command`` roda numa task própria e pode chegar depois do comando.
+    """
+    metricas.descrever('comandos_total', 'Comandos executados')
+    metricas.descrever('comandos_erros_total', 'Comandos que terminaram com erro')
+    metricas.descrever('comandos_latencia_segundos', 'Duração dos comandos, do início do handler ao fim')
+    metricas.descrever('gateway_eventos_total', 'Conexões, quedas e retomadas de sessão dos shards')
+
+    async def slash_concluido(interaction, command):
+        metricas.interacao(interaction)
+
+    async def prefixo_concluido(ctx):
+        metricas.comando(ctx.command.qualified_name, 'prefixo', getattr(ctx, 'metricas_inicio', None))
+
+    async def prefixo_erro(ctx, error):
+        if ctx.command is not None:
+            metricas.comando(ctx.command.qualified_name, 'prefixo',
+                             getattr(ctx, 'metricas_inicio', None), erro=True)
+
+    def evento_gateway(evento):
+        async def registrar(shard_id, *args):
+            metricas.contar('gateway_eventos_total', evento=evento, shard=shard_id)
+        return registrar
+
+    bot.add_listener(slash_concluido, 'on_app_command_completion')
+    bot.add_listener(prefixo_concluido, 'on_command_completion')
+    bot.add_listener(prefixo_erro, 'on_command_error')
+    bot.add_listener(evento_gateway('conexao'), 'on_shard_connect')
+    bot.add_listener(evento_gateway('queda'), 'on_shard_disconnect')
+    bot.add_listener(evento_gateway('retomada'), 'on_shard_resumed')
+
+    metricas.medidor(
+        'gateway_latencia_segundos',
+        lambda: [({'shard': shard_id}, latencia) for shard_id, latencia in bot.latencies],
+        'Latência do heartbeat de cada shard',
+    )
+    metricas.medidor('guilds', lambda: len(bot.guilds), 'Servidores visíveis neste processo')
@@ -0,0 +1,62 @@
+"""Cursores de paginação guardados na memória do bot.
+
+Uma pesquisa guarda todos os resultados (já reduzidos ao que é exibido) num
+``Cursor``. Trocar de página só fatia essa lista e monta o embed de novo, sem
+consultar a API nem o índice. Com isso a edição cabe folgada nos 3 segundos
+da interação.
+
+Os cursores ficam num ``CacheTTL``: expiram depois de ``ttl`` segundos e,
+passando de ``max_itens`` ou ``max_bytes`` no total, os menos usados saem
+primeiro. Um botão de um cursor que já saiu só avisa que a pesquisa expirou.
+"""
+
+import itertools
+import sys
+import time
+
+from core.cache import CacheTTL
+
+
+class Cursor:
+    __slots__ = ('itens', 'por_pagina', 'autor_id', 'dados', 'bytes')
+
+    def __init__(self, itens, por_pagina, autor_id, dados):
+        self.itens = itens
+        self.por_pagina = por_pagina
+        self.autor_id = autor_id
+        self.dados = dados
+        self.bytes = sys.getsizeof(itens) + sum(sys.getsizeof(c) for item in itens for c in item)
+
+    @property
+    def paginas(self):
+        return max(1, -(-len(self.itens) // self.por_pagina))
+
+    def pagina(self, n):
+        """Itens da página ``n`` (começando em 0), limitada ao intervalo válido."""
+        n = min(max(n, 0), self.paginas - 1)
+        inicio = n * self.por_pagina
+        return n, self.itens[inicio:inicio + self.por_pagina]
+
+
+class Cursores:
+    def __init__(self, *, ttl=600.0, max_itens=2000, max_bytes=16 * 1024 * 1024, relogio=time.monotonic):
+        self._cache = CacheTTL(max_itens=max_itens, max_bytes=max_bytes, ttl=ttl,
+                               medir=lambda cursor: cursor.bytes, relogio=relogio)
+        self._ids = itertools.count(1)
+
+    @property
+    def ttl(self):
+        return self._cache.ttl
+
+    def criar(self, itens, *, por_pagina, autor_id, **dados):
+        """Guarda ``itens`` (tuplas de strings); retorna ``(id, cursor)``."""
+        cursor_id = next(self._ids)
+        cursor = Cursor(itens, por_pagina, autor_id, dados)
+        self._cache.put(cursor_id, cursor)
+        return cursor_id, cursor
+
+    def obter(self, cursor_id):
+        return self._cache.get(cursor_id)
+
+    def stats(self):
+        return self._cache.stats()
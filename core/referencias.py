@@ -0,0 +1,272 @@
+"""Interpretação de referências bíblicas: "Jo 3:16", "1 Coríntios 13:4-7", "salmo 23".
+
+O nome do livro é procurado numa trie montada uma única vez com os nomes,
+abreviações e apelidos dos 66 livros, sem acentos e sem espaços ("I",
+"primeira" e "1º" viram "1" antes). A procura tenta, nesta ordem:
+
+1. o apelido exato, com acento (só para desempatar "Jó" de "Jo" = João);
+2. o apelido exato sem acento;
+3. um prefixo que só leve a um livro ("apoc", "deuter");
+4. uma correção de digitação: a mesma trie é percorrida com uma linha da
+   distância de edição (com transposição) por nó, e os ramos que já passaram
+   da distância máxima são cortados, então só uma fração dos nós é visitada.
+
+Os números aceitam capítulo inteiro ("23"), faixas de capítulos ("1-3"),
+versículo ("3:16" ou "3.16"), faixas ("3:16-18", "3:16-4:2"), listas
+("3:16,18,20-21") e vários trechos separados por ";". A forma antiga
+"joão 3 16" continua valendo.
+
+O resultado é uma ``Referencia`` com o índice do livro em ``LIVROS`` e os
+trechos; ``interpretar`` guarda as últimas consultas num ``lru_cache``.
+"""
+
+import functools
+import re
+from typing import NamedTuple, Optional
+
+from core.texto import dobrar
+
+
+class Livro(NamedTuple):
+    nome: str
+    abrev: str       # abreviação usada pela API
+    apelidos: tuple
+
+
+# Ordem canônica; ``abrev`` é a abreviação da abibliadigital.com.br
+LIVROS = [Livro(nome, abrev, tuple(apelidos.split())) for nome, abrev, apelidos in (
+    ('Gênesis', 'gn', 'gen'), ('Êxodo', 'ex', 'exo'), ('Levítico', 'lv', 'lev'),
+    ('Números', 'nm', 'num'), ('Deuteronômio', 'dt', 'deut'), ('Josué', 'js', 'jos'),
+    ('Juízes', 'jz', 'jui juiz'), ('Rute', 'rt', 'rut'),
+    ('1 Samuel', '1sm', '1sam'), ('2 Samuel', '2sm', '2sam'),
+    ('1 Reis', '1rs', '1re'), ('2 Reis', '2rs', '2re'),
+    ('1 Crônicas', '1cr', '1cro'), ('2 Crônicas', '2cr', '2cro'),
+    ('Esdras', 'ed', 'esd'), ('Neemias', 'ne', 'nee'), ('Ester', 'et', 'est'),
+    ('Jó', 'jó', ''), ('Salmos', 'sl', 'sal salmo'), ('Provérbios', 'pv', 'pro prov'),
+    ('Eclesiastes', 'ec', 'ecl'), ('Cânticos', 'ct', 'cant cantares canticodoscanticos canticosdoscanticos'),
+    ('Isaías', 'is', 'isa'), ('Jeremias', 'jr', 'jer'), ('Lamentações', 'lm', 'lam'),
+    ('Ezequiel', 'ez', 'eze'), ('Daniel', 'dn', 'dan'), ('Oséias', 'os', 'ose oseias'),
+    ('Joel', 'jl', ''), ('Amós', 'am', 'amo'), ('Obadias', 'ob', 'oba'), ('Jonas', 'jn', 'jon'),
+    ('Miquéias', 'mq', 'miq miqueias'), ('Naum', 'na', ''), ('Habacuque', 'hc', 'hab'),
+    ('Sofonias', 'sf', 'sof'), ('Ageu', 'ag', 'age'), ('Zacarias', 'zc', 'zac'),
+    ('Malaquias', 'ml', 'mal'), ('Mateus', 'mt', 'mat'), ('Marcos', 'mc', 'mar mr'),
+    ('Lucas', 'lc', 'luc'), ('João', 'jo', 'joa'), ('Atos', 'at', 'atos'),
+    ('Romanos', 'rm', 'rom'), ('1 Coríntios', '1co', '1cor'), ('2 Coríntios', '2co', '2cor'),
+    ('Gálatas', 'gl', 'gal'), ('Efésios', 'ef', 'efe'), ('Filipenses', 'fp', 'flp'),
+    ('Colossenses', 'cl', 'col'), ('1 Tessalonicenses', '1ts', '1tes'),
+    ('2 Tessalonicenses', '2ts', '2tes'), ('1 Timóteo', '1tm', '1tim'), ('2 Timóteo', '2tm', '2tim'),
+    ('Tito', 'tt', 'tit'), ('Filemom', 'fm', 'flm filemon'), ('Hebreus', 'hb', 'heb'),
+    ('Tiago', 'tg', 'tia'), ('1 Pedro', '1pe', '1ped'), ('2 Pedro', '2pe', '2ped'),
+    ('1 João', '1jo', '1joa'), ('2 João', '2jo', '2joa'), ('3 João', '3jo', '3joa'),
+    ('Judas', 'jd', 'jud'), ('Apocalipse', 'ap', 'apoc'),
+)]
+
+# Formas do número nos livros numerados ("I Samuel", "Primeiro Samuel", "1º Samuel"),
+# trocadas pelo algarismo antes da procura para não multiplicar os ramos da trie
+_NUMERAL = re.compile(r'^(?:(primeir[oa]|i)|(segund[oa]|ii)|(terceir[oa]|iii))\s+|^([123])[oa]?\s*(?=[^\d\s])')
+
+# Limites de uma referência (um comando não vira um capítulo inteiro de Salmos 119)
+MAX_TRECHOS = 10
+
+
+class Trecho(NamedTuple):
+    cap_inicio: int
+    vers_inicio: Optional[int]   # None: capítulos inteiros
+    cap_fim: int
+    vers_fim: Optional[int]
+
+
+class Referencia(NamedTuple):
+    livro: int
+    trechos: tuple
+
+    def __str__(self):
+        partes = []
+        cap_atual = None
+        for t in self.trechos:
+            if t.vers_inicio is None:
+                texto = str(t.cap_inicio) if t.cap_fim == t.cap_inicio else f"{t.cap_inicio}-{t.cap_fim}"
+                cap_atual = None
+            else:
+                texto = f"{t.cap_inicio}:{t.vers_inicio}" if t.cap_inicio != cap_atual else str(t.vers_inicio)
+                if t.cap_fim != t.cap_inicio:
+                    texto += f"-{t.cap_fim}:{t.vers_fim}"
+                elif t.vers_fim != t.vers_inicio:
+                    texto += f"-{t.vers_fim}"
+                cap_atual = t.cap_fim
+            partes.append(texto)
+        # "3:16, 18" dentro do mesmo capítulo; "; " quando muda de capítulo
+        saida = partes[0]
+        for anterior, t, texto in zip(self.trechos, self.trechos[1:], partes[1:]):
+            mesmo_cap = t.vers_inicio is not None and anterior.vers_inicio is not None and t.cap_inicio == anterior.cap_fim
+            saida += (', ' if mesmo_cap else '; ') + texto
+        return f"{LIVROS[self.livro].nome} {saida}"
+
+
+class ReferenciaInvalida(ValueError):
+    """Referência que não pôde ser interpretada; a mensagem vai para o usuário."""
+
+
+# ===== Livros =====
+
+class _No:
+    __slots__ = ('filhos', 'livro', 'livros')
+
+    def __init__(self):
+        self.filhos = {}
+        self.livro = None      # livro de um apelido que termina aqui
+        self.livros = set()    # livros de todos os apelidos abaixo deste nó
+
+
+def _chave(texto):
+    texto = ' '.join(dobrar(texto).replace('.', ' ').split())
+    return ''.join(_NUMERAL.sub(lambda m: m[4] or str(m.lastindex), texto, count=1).split())
+
+
+def _montar():
+    raiz = _No()
+    exatos = {}
+    abreviacoes = {_chave(livro.abrev): i for i, livro in enumerate(LIVROS) if livro.abrev.isascii()}
+    for i, livro in enumerate(LIVROS):
+        for apelido in (livro.nome, livro.abrev, *livro.apelidos):
+            exatos.setdefault(''.join(apelido.casefold().split()), i)
+            chave = _chave(apelido)
+            # "jó" sem acento é "jo", a abreviação de João: Jó fica só com a forma acentuada
+            if abreviacoes.get(chave, i) != i:
+                continue
+            no = raiz
+            no.livros.add(i)
+            for c in chave:
+                no = no.filhos.setdefault(c, _No())
+                no.livros.add(i)
+            if no.livro is None:
+                no.livro = i
+    return raiz, exatos
+
+
+_TRIE, _EXATOS = _montar()
+
+
+def _distancia_maxima(n):
+    return 0 if n < 4 else 1 if n < 7 else 2
+
+
+def _corrigir(chave):
+    """Livro do apelido mais próximo de ``chave`` (distância de edição com transposição)."""
+    maxima = _distancia_maxima(len(chave))
+    if not maxima:
+        return None
+    n = len(chave)
+    fora = maxima + 1
+    melhor, livros = fora, set()
+    # (nó, caractere, caractere anterior, profundidade, linha anterior, linha antes dela)
+    pilha = [(filho, c, None, 1, list(range(n + 1)), None) for c, filho in _TRIE.filhos.items()]
+    while pilha:
+        no, c, anterior_c, i, linha, linha_ante = pilha.pop()
+        # Só a faixa |i - j| <= maxima pode ficar dentro da distância máxima
+        atual = [i if i < fora else fora] + [fora] * n
+        minimo = atual[0]
+        for j in range(max(1, i - maxima), min(n, i + maxima) + 1):
+            d = linha[j - 1] + (chave[j - 1] != c)
+            x = atual[j - 1] + 1
+            if x < d:
+                d = x
+            x = linha[j] + 1
+            if x < d:
+                d = x
+            if linha_ante is not None and j > 1 and c == chave[j - 2] and anterior_c == chave[j - 1]:
+                x = linha_ante[j - 2] + 1
+                if x < d:
+                    d = x
+            atual[j] = d
+            if d < minimo:
+                minimo = d
+        if no.livro is not None and atual[n] <= melhor:
+            if atual[n] < melhor:
+                melhor, livros = atual[n], set()
+            livros.add(no.livro)
+        if minimo <= melhor and minimo <= maxima:
+            for proximo, filho in no.filhos.items():
+                pilha.append((filho, proximo, c, i + 1, atual, linha))
+    # Empate entre livros diferentes: melhor não adivinhar
+    return next(iter(livros)) if melhor <= maxima and len(livros) == 1 else None
+
+
+@functools.lru_cache(maxsize=1024)
+def encontrar_livro(nome):
+    """Índice em ``LIVROS`` a partir de um nome, abreviação ou erro de digitação, ou None."""
+    exato = _EXATOS.get(''.join(nome.casefold().replace('.', ' ').split()))
+    if exato is not None:
+        return exato
+    chave = _chave(nome)
+    if not chave:
+        return None
+    no = _TRIE
+    for c in chave:
+        no = no.filhos.get(c)
+        if no is None:
+            return _corrigir(chave)
+    if no.livro is not None:
+        return no.livro
+    if len(chave) >= 3 and len(no.livros) == 1:
+        return next(iter(no.livros))
+    return _corrigir(chave)
+
+
+# ===== Capítulos e versículos =====
+
+_SEPARAR = re.compile(r'^(.*?[^\d\s])\s*(\d[\d\s:.,;\-–]*)$')
+_ANTIGA = re.compile(r'(\d+)\s+(\d+(?:\s*-\s*\d+)?)')
+_VERSOS = re.compile(r'(\d+)[:.](\d+)(?:-(?:(\d+)[:.])?(\d+))?')
+_FAIXA = re.compile(r'(\d+)(?:-(\d+))?')
+
+
+def _trechos(numeros):
+    numeros = numeros.replace('–', '-').strip()
+    # "joão 3 16" (forma antiga, com argumentos separados)
+    antiga = _ANTIGA.fullmatch(numeros)
+    if antiga:
+        numeros = f"{antiga[1]}:{antiga[2]}"
+    numeros = ''.join(numeros.split())
+
+    trechos = []
+    for grupo in numeros.split(';'):
+        cap_atual = None   # capítulo de "3:16,18": os números seguintes são versículos dele
+        for parte in grupo.split(','):
+            versos = _VERSOS.fullmatch(parte)
+            faixa = _FAIXA.fullmatch(parte)
+            if versos:
+                cap, vers = int(versos[1]), int(versos[2])
+                cap_fim = int(versos[3]) if versos[3] else cap
+                vers_fim = int(versos[4]) if versos[4] else vers
+                trecho = Trecho(cap, vers, cap_fim, vers_fim)
+                cap_atual = cap_fim
+            elif faixa and cap_atual is not None:
+                inicio = int(faixa[1])
+                trecho = Trecho(cap_atual, inicio, cap_atual, int(faixa[2]) if faixa[2] else inicio)
+            elif faixa:
+                inicio = int(faixa[1])
+                trecho = Trecho(inicio, None, int(faixa[2]) if faixa[2] else inicio, None)
+            else:
+                raise ReferenciaInvalida(f"Não entendi `{parte or grupo}`.")
+            if (trecho.cap_fim, trecho.vers_fim or 0) < (trecho.cap_inicio, trecho.vers_inicio or 0) \
+                    or min(trecho.cap_inicio, trecho.vers_inicio or 1) < 1:
+                raise ReferenciaInvalida(f"Intervalo inválido: `{parte}`.")
+            trechos.append(trecho)
+    if len(trechos) > MAX_TRECHOS:
+        raise ReferenciaInvalida(f"Use no máximo {MAX_TRECHOS} trechos por vez.")
+    return tuple(trechos)
+
+
+@functools.lru_cache(maxsize=4096)
+def interpretar(texto):
+    """``Referencia`` de um texto como "1 Co 13:4-7"; levanta ``ReferenciaInvalida``."""
+    texto = ' '.join(texto.split())
+    separado = _SEPARAR.match(texto)
+    if not separado:
+        raise ReferenciaInvalida("Informe o livro e o capítulo, por exemplo `João 3:16`.")
+    nome, numeros = separado.groups()
+    livro = encontrar_livro(nome)
+    if livro is None:
+        raise ReferenciaInvalida(f"Não reconheci o livro `{nome}`.")
+    return Referencia(livro, _trechos(numeros))
@@ -0,0 +1,27 @@
+"""Controle de ritmo para rajadas de chamadas REST."""
+
+import asyncio
+import time
+
+
+class Ritmo:
+    """Espaça o início das requisições para no máximo ``por_segundo`` por segundo.
+
+    O limite global da API do Discord é 50 req/s por bot. Um único ``Ritmo``,
+    criado no bot (``bot.ritmo``), é compartilhado pelos subsistemas que
+    disparam muitas chamadas de uma vez (rollout do Muted, transmissão do
+    versículo diário, ``/limpar``), para que juntos fiquem abaixo desse limite.
+    """
+
+    def __init__(self, por_segundo):
+        self._intervalo = 1.0 / por_segundo
+        self._proximo = 0.0
+        self._lock = asyncio.Lock()
+
+    async def aguardar(self):
+        async with self._lock:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self._intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
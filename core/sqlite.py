@@ -0,0 +1,73 @@
+"""Acesso ao SQLite sem bloquear o event loop.
+
+Uma única conexão (em modo WAL) vive numa thread dedicada; todas as operações
+são enfileiradas nela com ``run_in_executor``, então as escritas de todos os
+subsistemas ficam serializadas e o loop só espera pelo resultado.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('discord_bot.sqlite')
+
+
+class BancoSQLite:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._executor = None
+        self._conn = None
+
+    async def abrir(self):
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+        await self.run(self._conectar)
+        logger.info(f"Banco SQLite aberto em {self.caminho}")
+
+    def _conectar(self, _conn):
+        if self.caminho != ':memory:':
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.caminho, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn = conn
+
+    async def close(self):
+        if self._executor is None:
+            return
+        await self.run(lambda conn: conn.close())
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._conn = None
+
+    async def run(self, funcao, *args):
+        """Executa ``funcao(conexão, *args)`` na thread do banco."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: funcao(self._conn, *args))
+
+    async def execute(self, sql, params=()):
+        def executar(conn):
+            with conn:
+                return conn.execute(sql, params).lastrowid
+        return await self.run(executar)
+
+    async def executemany(self, sql, linhas):
+        def executar(conn):
+            with conn:
+                conn.executemany(sql, linhas)
+        return await self.run(executar)
+
+    async def executescript(self, script):
+        def executar(conn):
+            with conn:
+                conn.executescript(script)
+        return await self.run(executar)
+
+    async def fetchall(self, sql, params=()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql, params=()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
@@ -0,0 +1,66 @@
+"""Sincronização dos comandos slash só quando a árvore de comandos muda.
+
+A impressão digital é um SHA-256 do JSON canônico que seria enviado ao
+Discord. Ela fica gravada no SQLite por escopo ("global" ou o ID do servidor
+de testes) e ``tree.sync()`` só é chamado quando ela muda ou quando forçado.
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+import discord
+
+logger = logging.getLogger('discord_bot.sync')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sync_comandos (
+    escopo TEXT PRIMARY KEY,
+    impressao TEXT NOT NULL,
+    sincronizado_em REAL NOT NULL
+);
+"""
+
+
+def impressao(tree, guild=None):
+    """Hash estável dos comandos registrados para ``guild`` (None = globais)."""
+    payload = sorted(
+        (cmd.to_dict(tree) for cmd in tree.get_commands(guild=guild)),
+        key=lambda c: (c.get('type', 1), c['name']),
+    )
+    bruto = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(bruto.encode('utf-8')).hexdigest()
+
+
+async def sincronizar(bot, *, guilds=(), forcar=False):
+    """Sincroniza os comandos se a impressão mudou.
+
+    Com ``guilds`` (IDs), os comandos globais são copiados para cada servidor e
+    sincronizados só lá, o que é instantâneo e bom para testes; os globais não
+    são enviados. Retorna a lista de escopos que foram sincronizados.
+    """
+    await bot.db.executescript(ESQUEMA)
+    alvos = [discord.Object(id=g) for g in guilds] or [None]
+    sincronizados = []
+
+    for guild in alvos:
+        if guild is not None:
+            bot.tree.copy_global_to(guild=guild)
+        escopo = 'global' if guild is None else str(guild.id)
+        atual = impressao(bot.tree, guild)
+        linha = await bot.db.fetchone("SELECT impressao FROM sync_comandos WHERE escopo = ?", (escopo,))
+
+        if not forcar and linha and linha[0] == atual:
+            logger.info(f"Comandos slash ({escopo}) inalterados, sincronização ignorada")
+            continue
+
+        synced = await bot.tree.sync(guild=guild)
+        await bot.db.execute(
+            "INSERT OR REPLACE INTO sync_comandos (escopo, impressao, sincronizado_em) VALUES (?, ?, ?)",
+            (escopo, atual, time.time()),
+        )
+        logger.info(f"{len(synced)} comandos slash sincronizados ({escopo})")
+        sincronizados.append(escopo)
+
+    return sincronizados
@@ -0,0 +1,39 @@
+"""Normalização de texto compartilhada (acentos, caixa, espaços)."""
+
+import unicodedata
+
+
+def _dobrar_lento(texto):
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+# Tabela byte a byte para o Latin-1 (onde estão os acentos do português). A
+# decomposição é caractere a caractere e as marcas combinantes são
+# descartadas, então traduzir antes dá o mesmo resultado do caminho lento.
+_LATIN1 = bytes(
+    ord(d) if len(d) == 1 and d.isascii() else i
+    for i, d in ((i, _dobrar_lento(chr(i))) for i in range(256))
+)
+
+
+def dobrar(texto):
+    """Remove acentos e aplica casefold: ``"João"`` -> ``"joao"``."""
+    if not texto.isascii():
+        try:
+            texto = texto.encode('latin-1').translate(_LATIN1).decode('latin-1')
+        except UnicodeEncodeError:
+            pass
+        if not texto.isascii():
+            texto = _dobrar_lento(texto)
+    return texto.casefold()
+
+
+def chave_livro(nome):
+    """Chave de busca de um livro: sem acentos, minúscula e sem espaços."""
+    return ''.join(dobrar(nome).split())
+
+
+def chave_livro_exata(nome):
+    """Como ``chave_livro``, mas mantendo os acentos: ``"Jó"`` -> ``"jó"``, ``"Jo"`` -> ``"jo"``."""
+    return ''.join(unicodedata.normalize('NFC', nome).casefold().split())
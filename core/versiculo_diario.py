@@ -0,0 +1,282 @@
+"""Transmissão diária do versículo do dia para os canais assinantes.
+
+Cada servidor assina um canal e um horário local. O versículo de cada data é
+escolhido uma única vez: com a Bíblia local é um índice derivado do hash da
+data (o mesmo em qualquer processo); sem ela, um versículo aleatório da API é
+sorteado na primeira vez e gravado no banco. O embed é montado uma vez por
+data e reaproveitado em todos os envios.
+
+Um ``tasks.loop`` verifica a cada minuto quais assinaturas venceram e envia
+em lotes, com concorrência limitada e no ritmo global do bot (``bot.ritmo``). Antes de cada lote as entregas
+são gravadas como ``enviando`` e depois como ``enviado``; se o bot cair no
+meio, as que ficaram em ``enviando`` são conferidas no histórico do canal
+antes de reenviar, então nenhum servidor recebe duas vezes nem fica sem.
+Falhas temporárias (erro 5xx, timeout, conexão) voltam a ser tentadas no
+minuto seguinte; as permanentes (canal apagado, sem permissão) ficam como
+``falhou`` até a data seguinte.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import time
+from zoneinfo import ZoneInfo
+
+import aiohttp
+import discord
+from discord.ext import tasks
+
+logger = logging.getLogger('discord_bot.versiculo_diario')
+
+FUSO_PADRAO = 'America/Sao_Paulo'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS diario_assinaturas (
+    guild_id INTEGER PRIMARY KEY,
+    canal_id INTEGER NOT NULL,
+    hora INTEGER NOT NULL,
+    minuto INTEGER NOT NULL,
+    fuso TEXT NOT NULL,
+    criado_em REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS diario_entregas (
+    data TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    estado TEXT NOT NULL,
+    message_id INTEGER,
+    atualizado_em REAL NOT NULL,
+    PRIMARY KEY (data, guild_id)
+);
+CREATE TABLE IF NOT EXISTS diario_versiculos (
+    data TEXT PRIMARY KEY,
+    dados TEXT NOT NULL
+);
+"""
+
+# Entregas mais antigas que isso são apagadas na virada do dia
+DIAS_HISTORICO = 7
+
+
+class Assinatura:
+    __slots__ = ('guild_id', 'canal_id', 'hora', 'minuto', 'fuso')
+
+    def __init__(self, guild_id, canal_id, hora, minuto, fuso):
+        self.guild_id = guild_id
+        self.canal_id = canal_id
+        self.hora = hora
+        self.minuto = minuto
+        self.fuso = ZoneInfo(fuso)
+
+    def data_vencida(self, agora_utc):
+        """Data local (ISO) se o horário de hoje já passou, senão None."""
+        local = agora_utc.astimezone(self.fuso)
+        if (local.hour, local.minute) >= (self.hora, self.minuto):
+            return local.date().isoformat()
+        return None
+
+
+def falha_temporaria(erro):
+    """Se vale tentar de novo a entrega que falhou com ``erro``."""
+    return isinstance(erro, (discord.DiscordServerError, asyncio.TimeoutError, aiohttp.ClientError, OSError))
+
+
+def indice_do_dia(data, n_versos):
+    """Índice determinístico do versículo de uma data ISO."""
+    digest = hashlib.sha256(f"versiculo-do-dia:{data}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big') % n_versos
+
+
+class VersiculoDiario:
+    def __init__(self, bot, db, *, renderizar, sortear_remoto, ritmo, lote=25):
+        self.bot = bot
+        self.db = db
+        self._renderizar = renderizar
+        self._sortear_remoto = sortear_remoto
+        self.lote = lote
+        self._ritmo = ritmo
+        self._semaforo = asyncio.Semaphore(lote)
+        self.assinaturas = {}
+        self._entregues = set()  # (data, guild_id) já enviados, em andamento ou com falha permanente
+        self._versiculos = {}
+        self._embeds = {}
+        self._lock_versiculo = asyncio.Lock()
+        self._rodando = asyncio.Lock()
+        self._tarefa = tasks.loop(minutes=1)(self._verificar)
+        self._tarefa.before_loop(self.bot.wait_until_ready)
+        self._limpo_em = None
+
+    async def start(self):
+        await self.db.executescript(ESQUEMA)
+        for guild_id, canal_id, hora, minuto, fuso in await self.db.fetchall(
+            "SELECT guild_id, canal_id, hora, minuto, fuso FROM diario_assinaturas"
+        ):
+            self.assinaturas[guild_id] = Assinatura(guild_id, canal_id, hora, minuto, fuso)
+        # A data local de um fuso a oeste pode estar um dia atrás da do servidor
+        desde = (datetime.date.today() - datetime.timedelta(days=2)).isoformat()
+        for data, guild_id in await self.db.fetchall(
+            "SELECT data, guild_id FROM diario_entregas WHERE data >= ? AND estado = 'enviado'", (desde,)
+        ):
+            self._entregues.add((data, guild_id))
+        logger.info(f"{len(self.assinaturas)} assinatura(s) do versículo diário carregada(s)")
+        self._tarefa.start()
+
+    def close(self):
+        self._tarefa.cancel()
+
+    async def assinar(self, guild_id, canal_id, hora, minuto, fuso=FUSO_PADRAO):
+        assinatura = Assinatura(guild_id, canal_id, hora, minuto, fuso)
+        await self.db.execute(
+            "INSERT OR REPLACE INTO diario_assinaturas (guild_id, canal_id, hora, minuto, fuso, criado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (guild_id, canal_id, hora, minuto, fuso, time.time()),
+        )
+        self.assinaturas[guild_id] = assinatura
+        return assinatura
+
+    async def cancelar(self, guild_id):
+        await self.db.execute("DELETE FROM diario_assinaturas WHERE guild_id = ?", (guild_id,))
+        return self.assinaturas.pop(guild_id, None) is not None
+
+    async def versiculo(self, data):
+        """Versículo do dia ``data`` (ISO), o mesmo para todos os servidores."""
+        if data in self._versiculos:
+            return self._versiculos[data]
+        async with self._lock_versiculo:
+            if data in self._versiculos:
+                return self._versiculos[data]
+            local = self.bot.biblia_local
+            if local:
+                dados = local.versiculo(indice_do_dia(data, local.n_versos))
+            else:
+                linha = await self.db.fetchone("SELECT dados FROM diario_versiculos WHERE data = ?", (data,))
+                if linha:
+                    dados = json.loads(linha[0])
+                else:
+                    dados = await self._sortear_remoto()
+                    if dados is None:
+                        return None
+                    await self.db.execute(
+                        "INSERT OR IGNORE INTO diario_versiculos (data, dados) VALUES (?, ?)",
+                        (data, json.dumps(dados, ensure_ascii=False)),
+                    )
+                    linha = await self.db.fetchone("SELECT dados FROM diario_versiculos WHERE data = ?", (data,))
+                    dados = json.loads(linha[0])
+            self._versiculos = {d: v for d, v in self._versiculos.items() if d >= data} | {data: dados}
+            return dados
+
+    async def embed(self, data):
+        if data not in self._embeds:
+            dados = await self.versiculo(data)
+            if dados is None:
+                return None
+            self._embeds = {d: e for d, e in self._embeds.items() if d >= data}
+            self._embeds[data] = self._renderizar(dados, data)
+        return self._embeds[data]
+
+    async def _verificar(self):
+        if self._rodando.locked():
+            return  # a transmissão anterior ainda não terminou
+        async with self._rodando:
+            # Uma exceção que escapa para o ``tasks.loop`` para a tarefa de vez
+            try:
+                await self._verificar_vencidas()
+            except Exception as e:
+                logger.error(f"Erro ao verificar o versículo diário: {e}", exc_info=e)
+
+    async def _verificar_vencidas(self):
+        agora = datetime.datetime.now(datetime.timezone.utc)
+        await self._limpar(agora.date())
+
+        vencidas = {}
+        for assinatura in list(self.assinaturas.values()):
+            data = assinatura.data_vencida(agora)
+            if data is None or (data, assinatura.guild_id) in self._entregues:
+                continue
+            if self.bot.get_guild(assinatura.guild_id) is None:
+                continue  # servidor de outro cluster ou que saiu
+            vencidas.setdefault(data, []).append(assinatura)
+
+        for data, assinaturas in vencidas.items():
+            await self._transmitir(data, assinaturas)
+
+    async def _transmitir(self, data, assinaturas):
+        embed = await self.embed(data)
+        if embed is None:
+            logger.warning(f"Sem versículo para {data}; transmissão adiada")
+            return
+
+        enviados = 0
+        for inicio in range(0, len(assinaturas), self.lote):
+            lote = assinaturas[inicio:inicio + self.lote]
+            estados = dict(await self.db.fetchall(
+                f"SELECT guild_id, estado FROM diario_entregas WHERE data = ? "
+                f"AND guild_id IN ({','.join('?' * len(lote))})",
+                (data, *(a.guild_id for a in lote)),
+            ))
+            agora = time.time()
+            # Uma nova tentativa depois de falha volta a ``enviando``
+            await self.db.executemany(
+                "INSERT INTO diario_entregas (data, guild_id, estado, atualizado_em) VALUES (?, ?, 'enviando', ?) "
+                "ON CONFLICT (data, guild_id) DO UPDATE SET estado = 'enviando', atualizado_em = excluded.atualizado_em "
+                "WHERE estado = 'falhou'",
+                [(data, a.guild_id, agora) for a in lote],
+            )
+            for a in lote:
+                self._entregues.add((data, a.guild_id))
+
+            resultados = await asyncio.gather(
+                *(self._entregar(a, data, embed, estados.get(a.guild_id)) for a in lote),
+                return_exceptions=True,
+            )
+
+            finalizados = []
+            agora = time.time()
+            for assinatura, resultado in zip(lote, resultados):
+                if isinstance(resultado, Exception):
+                    if falha_temporaria(resultado):
+                        self._entregues.discard((data, assinatura.guild_id))
+                        logger.warning(f"Falha no versículo diário de {assinatura.guild_id}, "
+                                       f"nova tentativa no próximo minuto: {resultado!r}")
+                    else:
+                        logger.warning(f"Falha no versículo diário de {assinatura.guild_id}: {resultado}")
+                    finalizados.append(('falhou', None, agora, data, assinatura.guild_id))
+                else:
+                    enviados += 1
+                    finalizados.append(('enviado', resultado, agora, data, assinatura.guild_id))
+            await self.db.executemany(
+                "UPDATE diario_entregas SET estado = ?, message_id = ?, atualizado_em = ? "
+                "WHERE data = ? AND guild_id = ?",
+                finalizados,
+            )
+        logger.info(f"Versículo do dia {data} enviado para {enviados}/{len(assinaturas)} servidor(es)")
+
+    async def _entregar(self, assinatura, data, embed, estado_anterior):
+        canal = self.bot.get_channel(assinatura.canal_id)
+        if canal is None:
+            raise LookupError(f"canal {assinatura.canal_id} não encontrado")
+
+        async with self._semaforo:
+            if estado_anterior == 'enviado':
+                return None
+            if estado_anterior == 'enviando':
+                # O bot caiu durante o envio: confere se a mensagem chegou a sair
+                await self._ritmo.aguardar()
+                async for mensagem in canal.history(limit=20):
+                    if mensagem.author.id == self.bot.user.id and any(
+                        e.footer and e.footer.text and data in e.footer.text for e in mensagem.embeds
+                    ):
+                        return mensagem.id
+            await self._ritmo.aguardar()
+            mensagem = await canal.send(embed=embed)
+            return mensagem.id
+
+    async def _limpar(self, hoje):
+        if self._limpo_em == hoje:
+            return
+        self._limpo_em = hoje
+        limite = (hoje - datetime.timedelta(days=DIAS_HISTORICO)).isoformat()
+        await self.db.execute("DELETE FROM diario_entregas WHERE data < ?", (limite,))
+        await self.db.execute("DELETE FROM diario_versiculos WHERE data < ?", (limite,))
+        self._entregues = {(d, g) for d, g in self._entregues if d >= limite}
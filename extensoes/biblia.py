@@ -0,0 +1,483 @@
+"""Comandos bíblicos com prefixo e o /versiculo-diario."""
+
+import asyncio
+import datetime
+import logging
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core.biblia_api import segmento
+from core.configuracoes import VERSOES_BIBLIA
+from core.limites import limitar_prefixo
+from core.referencias import LIVROS, ReferenciaInvalida, interpretar
+from core.texto import dobrar
+from core.versiculo_diario import FUSO_PADRAO
+
+logger = logging.getLogger('discord_bot.biblia')
+
+# Limites de uma passagem: versículos exibidos e capítulos buscados na API
+MAX_VERSICULOS = 30
+MAX_CAPITULOS = 5
+
+def versiculos_locais(local, indice_livro, ref):
+    versos = []
+    for t in ref.trechos:
+        restantes = MAX_VERSICULOS + 1 - len(versos)
+        if restantes <= 0:
+            break
+        ultimo = local.n_versiculos(indice_livro, t.cap_fim)
+        inicio = local.indice(indice_livro, t.cap_inicio, t.vers_inicio or 1)
+        fim = local.indice(indice_livro, t.cap_fim, min(t.vers_fim or ultimo, ultimo))
+        if inicio is None or fim is None:
+            continue
+        versos.extend(local.versiculos(inicio, min(fim, inicio + restantes - 1)))
+    return versos
+
+# Até quando a resposta sai sem nenhum aviso antes; depois disso o canal
+# mostra "digitando..." até ela ficar pronta
+PRAZO_RESPOSTA = 1.0
+
+async def responder(ctx, resultado, canal=None, prazo=PRAZO_RESPOSTA):
+    """Envia o que a corrotina ``resultado`` produzir numa única mensagem.
+
+    ``resultado`` retorna os argumentos do ``send`` (dict) ou um texto de erro
+    (str), que vai para o canal do comando. Busca rápida: uma chamada REST.
+    Busca lenta: o indicador de digitação e a mensagem, sem mensagem
+    provisória para editar depois. Com ``canal`` (outro canal), a resposta vai
+    para lá e o comando ganha uma reação ✅ no lugar da confirmação.
+    Retorna a mensagem enviada, ou None se foi um erro.
+    """
+    tarefa = asyncio.ensure_future(resultado)
+    try:
+        conteudo = await asyncio.wait_for(asyncio.shield(tarefa), prazo)
+    except asyncio.TimeoutError:
+        async with ctx.typing():
+            conteudo = await tarefa
+    if isinstance(conteudo, str):
+        await ctx.send(conteudo)
+        return None
+    mensagem = await (canal or ctx.channel).send(**conteudo)
+    if canal is not None and canal != ctx.channel:
+        try:
+            await ctx.message.add_reaction('✅')
+        except discord.HTTPException:
+            pass
+    return mensagem
+
+def separar_canal(ctx, args):
+    """(texto, canal) tirando uma menção de canal do fim dos argumentos"""
+    parts = args.split()
+    if ctx.guild and parts and parts[-1].startswith('<#') and parts[-1].endswith('>'):
+        try:
+            canal = ctx.guild.get_channel(int(parts[-1][2:-1]))
+        except ValueError:
+            return args, None
+        return ' '.join(parts[:-1]), canal
+    return args, None
+
+def renderizar_passagem(ref, versos, versao, autor):
+    if len(versos) == 1:
+        v = versos[0]
+        titulo = f"📖 {v['book']['name']} {v['chapter']}:{v['number']}"
+        descricao = f"*\"{v['text']}\"*"
+    else:
+        titulo = f"📖 {ref}"
+        linhas = []
+        capitulo = versos[0]['chapter']
+        varios = any(v['chapter'] != capitulo for v in versos)
+        for v in versos[:MAX_VERSICULOS]:
+            numero = f"{v['chapter']}:{v['number']}" if varios else str(v['number'])
+            linhas.append(f"**{numero}** {v['text']}")
+        descricao = '\n'.join(linhas)
+        if len(descricao) > 4000:
+            descricao = descricao[:4000].rsplit('\n', 1)[0] + "\n…"
+    embed = discord.Embed(title=titulo, description=descricao, color=0x4A90E2)
+    embed.add_field(name="📚 Versão", value=VERSOES_BIBLIA[versao], inline=False)
+    rodape = f"Solicitado por {autor.display_name}"
+    if len(versos) > MAX_VERSICULOS:
+        rodape += f" • Mostrando os primeiros {MAX_VERSICULOS} versículos"
+    embed.set_footer(text=rodape, icon_url=autor.display_avatar.url)
+    return embed
+
+# Resultados guardados por pesquisa (5 por página)
+PESQUISA_MAX = 100
+PESQUISA_POR_PAGINA = 5
+
+def renderizar_pesquisa(cursor, pagina):
+    pagina, itens = cursor.pagina(pagina)
+    d = cursor.dados
+    inicio = pagina * cursor.por_pagina
+    mostrados = f"{inicio + 1}-{inicio + len(itens)}"
+    if d['total'] > len(cursor.itens):
+        mostrados += f" dos {len(cursor.itens)} mais relevantes"
+    embed = discord.Embed(
+        title=f"📚 Resultados da Pesquisa",
+        description=f"**Termo:** {d['termo']}\n**Resultados:** {d['total']} encontrados (mostrando {mostrados})",
+        color=0x9B59B6
+    )
+    for i, (referencia, texto) in enumerate(itens, inicio + 1):
+        embed.add_field(name=f"{i}. {referencia}", value=f"*\"{texto}\"*", inline=False)
+    embed.add_field(name="📚 Versão", value=VERSOES_BIBLIA[d['versao']], inline=False)
+    rodape = f"Pesquisa por {d['autor']}"
+    if cursor.paginas > 1:
+        rodape += f" • Página {pagina + 1}/{cursor.paginas}"
+    embed.set_footer(text=rodape, icon_url=d['avatar'])
+    return embed
+
+class PaginasPesquisa(discord.ui.View):
+    """Botões de página; o estado fica só em ``bot.cursores``, a view guarda o id e a página."""
+
+    def __init__(self, cursores, cursor_id, paginas):
+        super().__init__(timeout=cursores.ttl)
+        self.cursores = cursores
+        self.cursor_id = cursor_id
+        self.pagina = 0
+        self.mensagem = None
+        self._atualizar_botoes(paginas)
+
+    def _atualizar_botoes(self, paginas):
+        self.anterior.disabled = self.pagina == 0
+        self.proxima.disabled = self.pagina >= paginas - 1
+
+    async def _virar(self, interaction, delta):
+        cursor = self.cursores.obter(self.cursor_id)
+        if cursor is None:
+            self.stop()
+            await interaction.response.edit_message(content="⌛ Esta pesquisa expirou. Pesquise de novo para ver mais.", view=None)
+            return
+        if interaction.user.id != cursor.autor_id:
+            await interaction.response.send_message("❌ Só quem fez a pesquisa pode trocar de página.", ephemeral=True)
+            return
+        self.pagina = min(max(self.pagina + delta, 0), cursor.paginas - 1)
+        self._atualizar_botoes(cursor.paginas)
+        await interaction.response.edit_message(embed=renderizar_pesquisa(cursor, self.pagina), view=self)
+
+    @discord.ui.button(label="Anterior", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._virar(interaction, -1)
+
+    @discord.ui.button(label="Próxima", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def proxima(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._virar(interaction, 1)
+
+    async def on_timeout(self):
+        if self.mensagem is not None:
+            try:
+                await self.mensagem.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+class Biblia(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def buscar_referencia(self, ref, versao='nvi'):
+        """Versículos de uma ``Referencia`` (no formato da API), ou None em caso de erro.
+
+        Cada trecho é uma única leitura: um intervalo contíguo na Bíblia local ou
+        o capítulo inteiro na API (uma requisição por capítulo, em cache), nunca
+        uma consulta por versículo.
+        """
+        livro = LIVROS[ref.livro]
+        # A Bíblia local é a NVI; outras versões vêm sempre da API
+        local = self.bot.biblia_local if versao == 'nvi' else None
+        indice_livro = local.livro_canonico(ref.livro) if local else None
+        if indice_livro is not None:
+            return versiculos_locais(local, indice_livro, ref)
+        if local and not self.bot.biblia_fallback:
+            return None
+
+        capitulos = list(dict.fromkeys(c for t in ref.trechos for c in range(t.cap_inicio, t.cap_fim + 1)))
+        capitulos = await asyncio.gather(*(self.buscar_capitulo(livro.abrev, c, versao) for c in capitulos[:MAX_CAPITULOS]))
+        if any(c is None for c in capitulos):
+            return None
+        versos = []
+        for t in ref.trechos:
+            inicio, fim = (t.cap_inicio, t.vers_inicio or 1), (t.cap_fim, t.vers_fim or float('inf'))
+            for capitulo in capitulos:
+                versos.extend(v for v in capitulo if inicio <= (v['chapter'], v['number']) <= fim)
+        return versos
+
+    async def buscar_capitulo(self, abrev, capitulo, versao):
+        async def carregar():
+            try:
+                dados = await self.bot.biblia.get_json(f"verses/{versao}/{segmento(abrev)}/{capitulo}")
+            except Exception as e:
+                logger.error(f"Erro ao buscar capítulo: {e}")
+                return None
+            if dados is None:
+                return None
+            return [{'book': dados['book'], 'chapter': capitulo, 'number': v['number'], 'text': v['text']}
+                    for v in dados['verses']]
+
+        return await self.bot.cache_biblia.obter(('capitulo', versao, abrev, capitulo), carregar)
+
+    async def buscar_versiculo_aleatorio(self):
+        if self.bot.biblia_local:
+            return self.bot.biblia_local.aleatorio()
+        if not self.bot.biblia_fallback:
+            return None
+
+        try:
+            return await self.bot.biblia.get_json("verses/nvi/random")
+        except Exception as e:
+            logger.error(f"Erro ao buscar versículo aleatório: {e}")
+            return None
+
+    async def pesquisar_versiculos(self, termo, limite=5, versao='nvi'):
+        """Retorna (total de ocorrências, melhores versículos) ou None em caso de erro"""
+        chave = ('pesquisa', versao, ' '.join(dobrar(termo).split()), limite)
+        return await self.bot.cache_biblia.obter(chave, lambda: self._pesquisar_versiculos(termo, limite, versao))
+
+    async def _pesquisar_versiculos(self, termo, limite, versao):
+        local = versao == 'nvi' and self.bot.biblia_local
+        if local and self.bot.biblia_indice:
+            total, melhores = self.bot.biblia_indice.pesquisar(termo, k=limite)
+            return total, [self.bot.biblia_local.versiculo(indice) for _, indice in melhores]
+        if local and not self.bot.biblia_fallback:
+            return None
+
+        try:
+            dados = await self.bot.biblia.get_json(f"verses/{versao}/search/{segmento(termo)}", timeout=15)
+        except Exception as e:
+            logger.error(f"Erro na pesquisa bíblica: {e}")
+            return None
+        if dados is None:
+            return None
+        return len(dados), dados[:limite]
+
+    @commands.command(name='versiculo')
+    @limitar_prefixo(5, 15)
+    async def versiculo_comando(self, ctx, *, args: str = ''):
+        """Busca um versículo ou passagem da Bíblia"""
+        texto, canal = separar_canal(ctx, args)
+        try:
+            ref = interpretar(texto)
+        except ReferenciaInvalida as e:
+            p = ctx.clean_prefix
+            embed = discord.Embed(
+                title="❌ Uso Incorreto",
+                description=f"{e}\n\n**Uso correto:** `{p}versiculo <referência> [#canal]`\n"
+                            f"**Exemplos:** `{p}versiculo jo 3:16`, `{p}versiculo 1 Coríntios 13:4-7`, `{p}versiculo salmo 23`",
+                color=0xff0000
+            )
+            await ctx.send(embed=embed)
+            return
+
+        if canal and not canal.permissions_for(ctx.author).send_messages:
+            await ctx.send("❌ Você não tem permissão para enviar mensagens nesse canal.")
+            return
+
+        versao = self.bot.configuracoes.obter(ctx.guild.id).versao_biblia if ctx.guild else 'nvi'
+
+        async def buscar():
+            versos = await self.buscar_referencia(ref, versao)
+            if versos:
+                return {'embed': renderizar_passagem(ref, versos, versao, ctx.author)}
+            if versos is None:
+                return "❌ Erro ao buscar o versículo. Tente novamente mais tarde."
+            return f"❌ **{ref}** não encontrado. Verifique se o capítulo e o versículo existem."
+
+        await responder(ctx, buscar(), canal)
+
+    @commands.command(name='versiculo_diario')
+    @limitar_prefixo(3, 30)
+    async def versiculo_diario(self, ctx, canal: discord.TextChannel = None):
+        """Envia um versículo aleatório do dia"""
+        if canal and not canal.permissions_for(ctx.author).send_messages:
+            await ctx.send("❌ Você não tem permissão para enviar mensagens nesse canal.")
+            return
+
+        async def buscar():
+            hoje = datetime.datetime.now(ZoneInfo(FUSO_PADRAO)).date().isoformat()
+            dados = await self.bot.diario.versiculo(hoje)
+            if not dados:
+                return "❌ Erro ao buscar versículo do dia. Tente novamente mais tarde."
+            embed = discord.Embed(
+                title=f"🌅 Versículo do Dia",
+                description=f"*\"{dados['text']}\"*",
+                color=0xFFD700
+            )
+            embed.add_field(
+                name="📍 Referência",
+                value=f"{dados['book']['name']} {dados['chapter']}:{dados['number']}",
+                inline=True
+            )
+            embed.add_field(name="📚 Versão", value="NVI", inline=True)
+            embed.set_footer(
+                text=f"Versículo do dia • Solicitado por {ctx.author.display_name}",
+                icon_url=ctx.author.display_avatar.url
+            )
+            return {'embed': embed}
+
+        await responder(ctx, buscar(), canal)
+
+    def renderizar_versiculo_diario(self, dados, data):
+        """Embed único da transmissão diária (a data no rodapé identifica o envio)"""
+        embed = discord.Embed(
+            title=f"🌅 Versículo do Dia",
+            description=f"*\"{dados['text']}\"*",
+            color=0xFFD700
+        )
+        embed.add_field(
+            name="📍 Referência",
+            value=f"{dados['book']['name']} {dados['chapter']}:{dados['number']}",
+            inline=True
+        )
+        embed.add_field(name="📚 Versão", value="NVI", inline=True)
+        embed.set_footer(text=f"Versículo do dia • {data}")
+        return embed
+
+    diario_grupo = app_commands.Group(name='versiculo-diario', description='Versículo do dia enviado automaticamente')
+
+    @diario_grupo.command(name='assinar', description='Envia o versículo do dia todo dia num canal')
+    @app_commands.describe(
+        canal='Canal que vai receber o versículo',
+        horario='Horário local no formato HH:MM (padrão 07:00)',
+        fuso=f'Fuso horário IANA (padrão {FUSO_PADRAO})'
+    )
+    async def diario_assinar(self, interaction: discord.Interaction, canal: discord.TextChannel, horario: str = "07:00", fuso: str = FUSO_PADRAO):
+        if not interaction.user.guild_permissions.manage_guild:
+            await interaction.response.send_message('❌ Você não tem permissão para gerenciar o servidor.', ephemeral=True)
+            return
+
+        try:
+            hora, minuto = (int(p) for p in horario.split(':'))
+            if not (0 <= hora < 24 and 0 <= minuto < 60):
+                raise ValueError
+        except ValueError:
+            await interaction.response.send_message('❌ Horário inválido. Use o formato HH:MM, por exemplo 07:30.', ephemeral=True)
+            return
+
+        try:
+            ZoneInfo(fuso)
+        except (ZoneInfoNotFoundError, ValueError):
+            await interaction.response.send_message(f'❌ Fuso horário desconhecido: `{fuso}`.', ephemeral=True)
+            return
+
+        permissoes = canal.permissions_for(interaction.guild.me)
+        if not (permissoes.send_messages and permissoes.embed_links):
+            await interaction.response.send_message(f'❌ Não consigo enviar embeds em {canal.mention}.', ephemeral=True)
+            return
+
+        await self.bot.diario.assinar(interaction.guild_id, canal.id, hora, minuto, fuso)
+        embed = discord.Embed(
+            title="🌅 Versículo Diário Ativado",
+            description=f"O versículo do dia será enviado em {canal.mention} todos os dias às **{hora:02d}:{minuto:02d}** ({fuso}).",
+            color=0x00ff00
+        )
+        await interaction.response.send_message(embed=embed)
+
+    @diario_grupo.command(name='cancelar', description='Para de enviar o versículo do dia')
+    async def diario_cancelar(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.manage_guild:
+            await interaction.response.send_message('❌ Você não tem permissão para gerenciar o servidor.', ephemeral=True)
+            return
+
+        if await self.bot.diario.cancelar(interaction.guild_id):
+            await interaction.response.send_message('✅ Versículo diário desativado.')
+        else:
+            await interaction.response.send_message('❌ Este servidor não tem o versículo diário ativado.', ephemeral=True)
+
+    @commands.command(name='pesquisar_biblia')
+    @limitar_prefixo(3, 30)
+    @limitar_prefixo(20, 60, escopo='guild')
+    async def pesquisar_biblia(self, ctx, *, args):
+        """Pesquisa versículos que contenham uma palavra ou frase"""
+        termo, canal = separar_canal(ctx, args)
+
+        if canal and not canal.permissions_for(ctx.author).send_messages:
+            await ctx.send("❌ Você não tem permissão para enviar mensagens nesse canal.")
+            return
+
+        if not termo.strip():
+            p = ctx.clean_prefix
+            embed = discord.Embed(
+                title="❌ Uso Incorreto",
+                description=f"**Uso correto:** `{p}pesquisar_biblia <termo> [#canal]`\n**Exemplo:** `{p}pesquisar_biblia amor`",
+                color=0xff0000
+            )
+            await ctx.send(embed=embed)
+            return
+
+        versao = self.bot.configuracoes.obter(ctx.guild.id).versao_biblia if ctx.guild else 'nvi'
+        view = None
+
+        async def buscar():
+            nonlocal view
+            resultado = await self.pesquisar_versiculos(termo, limite=PESQUISA_MAX, versao=versao)
+            if resultado is None:
+                return "❌ Erro ao realizar a pesquisa. Tente novamente mais tarde."
+            total, resultados = resultado
+            if not resultados:
+                return f"❌ Nenhum versículo encontrado com o termo **'{termo}'**."
+
+            # O cursor guarda só o que é exibido: referência e texto já cortado
+            itens = []
+            for verso in resultados:
+                texto = verso['text']
+                if len(texto) > 150:
+                    texto = texto[:150] + "..."
+                itens.append((f"{verso['book']['name']} {verso['chapter']}:{verso['number']}", texto))
+            cursor_id, cursor = self.bot.cursores.criar(
+                itens, por_pagina=PESQUISA_POR_PAGINA, autor_id=ctx.author.id,
+                termo=termo, total=total, versao=versao,
+                autor=ctx.author.display_name, avatar=ctx.author.display_avatar.url,
+            )
+            if cursor.paginas == 1:
+                return {'embed': renderizar_pesquisa(cursor, 0)}
+            view = PaginasPesquisa(self.bot.cursores, cursor_id, cursor.paginas)
+            return {'embed': renderizar_pesquisa(cursor, 0), 'view': view}
+
+        mensagem = await responder(ctx, buscar(), canal)
+        if view is not None:
+            view.mensagem = mensagem
+
+    @commands.command(name='ajuda_biblia')
+    async def ajuda_biblia(self, ctx):
+        """Mostra ajuda para comandos bíblicos"""
+        p = ctx.clean_prefix
+        versao = self.bot.configuracoes.obter(ctx.guild.id).versao_biblia if ctx.guild else 'nvi'
+        embed = discord.Embed(
+            title="📖 Comandos Bíblicos - Ajuda",
+            description="Comandos disponíveis para consultar a Bíblia Sagrada:",
+            color=0x3498DB
+        )
+
+        embed.add_field(
+            name="📋 Comandos Disponíveis",
+            value=f"`{p}versiculo [referência] [#canal]`\n"
+                  f"`{p}versiculo_diario [#canal]`\n"
+                  f"`{p}pesquisar_biblia [termo] [#canal]`\n"
+                  f"`{p}ajuda_biblia`",
+            inline=False
+        )
+
+        embed.add_field(
+            name="💡 Exemplos de Uso",
+            value=f"`{p}versiculo jo 3:16`\n"
+                  f"`{p}versiculo 1 Coríntios 13:4-7`\n"
+                  f"`{p}versiculo salmo 23 #devocional`\n"
+                  f"`{p}versiculo_diario`\n"
+                  f"`{p}pesquisar_biblia amor #estudo`",
+            inline=False
+        )
+
+        embed.add_field(
+            name="📌 Observações",
+            value="• O parâmetro **[#canal]** é opcional\n"
+                  "• Use espaços normais entre palavras\n"
+                  "• Na pesquisa, use `\"frase exata\"` ou `prefixo*`\n"
+                  f"• Versão neste servidor: **{VERSOES_BIBLIA[versao]}**\n"
+                  "• API: abibliadigital.com.br",
+            inline=False
+        )
+
+        embed.set_footer(text=f"Use {p} antes dos comandos bíblicos")
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Biblia(bot))
@@ -0,0 +1,150 @@
+"""Eventos do gateway e tratamento de erros dos comandos.
+
+O ``on_message`` daqui é o único que processa comandos de texto (o do bot é
+desligado), então o automod roda antes de qualquer comando com prefixo.
+"""
+
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core.limites import Limitado
+
+logger = logging.getLogger('discord_bot.eventos')
+
+class Eventos(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self._erro_anterior = None
+
+    async def cog_load(self):
+        # A árvore tem um único tratador de erros; devolve o anterior ao descarregar
+        self._erro_anterior = self.bot.tree.on_error
+        self.bot.tree.on_error = self.on_app_command_error
+
+    async def cog_unload(self):
+        if self.bot.tree.on_error == self.on_app_command_error:
+            self.bot.tree.on_error = self._erro_anterior
+
+    # Evento ao iniciar o bot
+    @commands.Cog.listener()
+    async def on_ready(self):
+        logger.info(f"Bot conectado como {self.bot.user} (ID: {self.bot.user.id}), "
+                    f"{len(self.bot.guilds)} servidor(es)")
+        await self.bot.ipc.publicar(guilds=len(self.bot.guilds))
+        shards = self.bot.shard_ids
+        if shards is not None:
+            logger.info(f"Cluster {self.bot.cluster_id}: shards {shards[0]}-{shards[-1]} de {self.bot.shard_count}")
+            try:
+                logger.info(f"Servidores em todos os clusters: {await self.bot.ipc.total('guilds')}")
+            except Exception as e:
+                logger.warning(f"Falha ao consultar os outros clusters: {e}")
+
+        # Definir status (o mesmo em todos os servidores: o /ajuda mostra o prefixo de cada um)
+        await self.bot.change_presence(
+            activity=discord.Game(name="Use /ajuda"),
+            status=discord.Status.online
+        )
+
+        await self.bot.cargos_muted.retomar(self.bot)
+
+    # Evento quando bot entra em servidor
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        logger.info(f"Bot adicionado ao servidor: {guild.name}", extra={'guild_id': guild.id})
+        await self.bot.ipc.publicar(guilds=len(self.bot.guilds))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.bot.boas_vindas.esquecer(guild.id)
+        await self.bot.ipc.publicar(guilds=len(self.bot.guilds))
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.bot.cargos_muted.esquecer(role.guild.id, role.id)
+
+    # O evento "raw" chega mesmo para membros fora do cache do discord.py
+    # (política lru), que é justamente onde o LRU os guarda
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+        self.bot.membros.esquecer(payload.guild_id, payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        self.bot.membros.lembrar(interaction.user)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        self.bot.membros.lembrar(message.author)
+        violacao = self.bot.automod.verificar(message)
+        if violacao is not None and not self.bot.automod.isento(message):
+            await self.bot.automod.aplicar(message, violacao)
+            return
+        await self.bot.process_commands(message)
+
+    # Boas-vindas
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.bot.membros.lembrar(member)
+        await self.bot.boas_vindas.registrar(member)
+
+    def canal_boas_vindas(self, guild):
+        config = self.bot.configuracoes.obter(guild.id)
+        if not config.boas_vindas:
+            return None
+        if config.canal_boas_vindas:
+            return guild.get_channel(config.canal_boas_vindas)
+        return guild.system_channel
+
+    def renderizar_boas_vindas(self, guild, membros, outros):
+        if len(membros) == 1 and not outros:
+            member = membros[0]
+            embed = discord.Embed(
+                title="🎉 Bem-vindo(a)!",
+                description=f"Olá {member.mention}! Bem-vindo(a) ao **{guild.name}**!",
+                color=0x00ff00
+            )
+            embed.set_thumbnail(url=member.display_avatar.url)
+            return embed
+
+        mencoes = ', '.join(m.mention for m in membros)
+        return discord.Embed(
+            title="🎉 Bem-vindos(as)!",
+            description=f"Olá {mencoes}{f' e mais {outros}' if outros else ''}! Bem-vindos(as) ao **{guild.name}**!",
+            color=0x00ff00
+        )
+
+    async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self.bot.metricas.interacao(interaction, erro=True)
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message("❌ Você não tem permissão para usar este comando.", ephemeral=True)
+        elif isinstance(error, app_commands.CommandOnCooldown):
+            await interaction.response.send_message(f"⏰ Comando em cooldown. Tente novamente em {error.retry_after:.1f} segundos.", ephemeral=True)
+        else:
+            # Comandos longos (ex.: /limpar) já adiaram a resposta
+            responder = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+            await responder("❌ Ocorreu um erro ao executar o comando.", ephemeral=True)
+            logger.error(f'Erro no comando slash: {error}', exc_info=error)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        if isinstance(error, commands.CommandNotFound):
+            return
+        elif isinstance(error, commands.MissingRequiredArgument):
+            await ctx.send(f"❌ Argumento obrigatório ausente. Use `{ctx.clean_prefix}ajuda_biblia` para ver como usar os comandos.")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send(f"❌ Argumento inválido. Use `{ctx.clean_prefix}ajuda_biblia` para ver como usar os comandos.")
+        elif isinstance(error, (commands.MissingPermissions, commands.NotOwner)):
+            await ctx.send("❌ Você não tem permissão para usar este comando.")
+        elif isinstance(error, commands.CommandOnCooldown):
+            # Só o primeiro aviso da janela; o resto é descartado sem chamar a API
+            if not isinstance(error, Limitado) or not error.silencioso:
+                await ctx.send(f"⏰ Comando em cooldown. Tente novamente em {error.retry_after:.1f} segundos.")
+        else:
+            logger.error(f'Erro no comando {ctx.command}: {error}', exc_info=error)
+            await ctx.send("❌ Ocorreu um erro ao executar o comando.")
+
+async def setup(bot):
+    await bot.add_cog(Eventos(bot))
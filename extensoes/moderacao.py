@@ -0,0 +1,444 @@
+"""Comandos de moderação, casos, /configurar e /automod."""
+
+import datetime
+import logging
+import re
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core.automod import ACOES as AUTOMOD_ACOES
+from core.configuracoes import VERSOES_BIBLIA
+from core.limites import limitar_slash
+from core.limpeza import FiltroLimpeza, Limpeza
+
+logger = logging.getLogger('discord_bot.moderacao')
+
+# Máximo de mensagens examinadas por /limpar
+LIMPAR_MAX = 20000
+
+def pode_moderar(guild, membro):
+    """O bot só age sobre membros abaixo do cargo mais alto dele (e nunca sobre o dono)"""
+    return membro.id != guild.owner_id and membro.top_role < guild.me.top_role
+
+ICONES_CASOS = {'expulsar': '👢', 'banir': '🔨', 'silenciar': '🔇'}
+
+def descrever_caso(caso):
+    icone = ICONES_CASOS.get(caso.acao, '⚖️')
+    return f"{icone} **#{caso.numero}** {caso.acao} <t:{int(caso.criado_em)}:R> por <@{caso.moderador_id}>: {caso.motivo}"
+
+class CancelarLimpeza(discord.ui.View):
+    def __init__(self, limpeza):
+        super().__init__(timeout=None)
+        self.limpeza = limpeza
+
+    @discord.ui.button(label="Cancelar", style=discord.ButtonStyle.danger, emoji="⛔")
+    async def cancelar(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.limpeza.cancelar()
+        button.disabled = True
+        await interaction.response.edit_message(content=f"⛔ Cancelando... {self.limpeza.resumo()}", view=self)
+
+async def pode_configurar_automod(interaction: discord.Interaction):
+    if interaction.user.guild_permissions.manage_guild:
+        return True
+    await interaction.response.send_message('❌ Você não tem permissão para gerenciar o servidor.', ephemeral=True)
+    return False
+
+class Moderacao(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name='expulsar', description='Expulsa um usuário do servidor')
+    @app_commands.describe(membro='O usuário para expulsar', motivo='Motivo da expulsão')
+    async def kick(self, interaction: discord.Interaction, membro: discord.Member, motivo: str = "Nenhum motivo fornecido"):
+        if not interaction.user.guild_permissions.kick_members:
+            await interaction.response.send_message('❌ Você não tem permissão para expulsar membros.', ephemeral=True)
+            return
+
+        if membro == interaction.user:
+            await interaction.response.send_message('❌ Você não pode se expulsar.', ephemeral=True)
+            return
+
+        if not pode_moderar(interaction.guild, membro):
+            await interaction.response.send_message('❌ Não posso expulsar esse usuário.', ephemeral=True)
+            return
+
+        try:
+            await membro.kick(reason=f"{motivo} - Por: {interaction.user}")
+            caso = self.bot.casos.registrar(interaction.guild_id, membro.id, interaction.user.id, 'expulsar', motivo)
+            embed = discord.Embed(
+                title="👢 Usuário Expulso",
+                description=f"**{membro}** foi expulso do servidor.",
+                color=0xff9500
+            )
+            embed.add_field(name="Motivo", value=motivo, inline=False)
+            embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
+            embed.set_footer(text=f"Caso #{caso.numero}")
+            await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            await interaction.response.send_message('❌ Falha ao expulsar usuário.', ephemeral=True)
+            logger.error(f"Erro ao expulsar: {e}")
+
+    @app_commands.command(name='banir', description='Bane um usuário do servidor')
+    @app_commands.describe(membro='O usuário para banir', motivo='Motivo do banimento')
+    async def ban(self, interaction: discord.Interaction, membro: discord.Member, motivo: str = "Nenhum motivo fornecido"):
+        if not interaction.user.guild_permissions.ban_members:
+            await interaction.response.send_message('❌ Você não tem permissão para banir membros.', ephemeral=True)
+            return
+
+        if membro == interaction.user:
+            await interaction.response.send_message('❌ Você não pode se banir.', ephemeral=True)
+            return
+
+        if not pode_moderar(interaction.guild, membro):
+            await interaction.response.send_message('❌ Não posso banir esse usuário.', ephemeral=True)
+            return
+
+        try:
+            await membro.ban(reason=f"{motivo} - Por: {interaction.user}")
+            caso = self.bot.casos.registrar(interaction.guild_id, membro.id, interaction.user.id, 'banir', motivo)
+            embed = discord.Embed(
+                title="🔨 Usuário Banido",
+                description=f"**{membro}** foi banido do servidor.",
+                color=0xff0000
+            )
+            embed.add_field(name="Motivo", value=motivo, inline=False)
+            embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
+            embed.set_footer(text=f"Caso #{caso.numero}")
+            await interaction.response.send_message(embed=embed)
+        except Exception as e:
+            await interaction.response.send_message('❌ Falha ao banir usuário.', ephemeral=True)
+            logger.error(f"Erro ao banir: {e}")
+
+    @app_commands.command(name='silenciar', description='Silencia um usuário')
+    @limitar_slash(5, 60, escopo='guild')
+    @app_commands.describe(membro='O usuário para silenciar', motivo='Motivo do silenciamento')
+    async def mute(self, interaction: discord.Interaction, membro: discord.Member, motivo: str = "Nenhum motivo fornecido"):
+        if not interaction.user.guild_permissions.manage_roles:
+            await interaction.response.send_message('❌ Você não tem permissão para gerenciar cargos.', ephemeral=True)
+            return
+
+        guild = interaction.guild
+        role = self.bot.cargos_muted.obter(guild)
+
+        if role is None:
+            # Criar o cargo e aplicar as permissões em todos os canais pode levar
+            # minutos; responde logo e deixa o rollout rodando em segundo plano.
+            await interaction.response.defer()
+            try:
+                progresso = await interaction.followup.send("⚙️ Criando cargo Muted...", wait=True)
+
+                async def ao_progresso(rollout):
+                    estado = "✅ Permissões do cargo Muted aplicadas" if rollout.concluido else "⚙️ Aplicando permissões do cargo Muted"
+                    await progresso.edit(content=f"{estado}: {rollout.resumo()}")
+
+                role = await self.bot.cargos_muted.criar(guild, ao_progresso)
+            except Exception as e:
+                await interaction.followup.send('❌ Falha ao criar cargo Muted.', ephemeral=True)
+                logger.error(f"Erro ao criar cargo Muted: {e}")
+                return
+
+        responder = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+
+        if role in membro.roles:
+            await responder('❌ Este usuário já está silenciado.', ephemeral=True)
+            return
+
+        try:
+            await membro.add_roles(role, reason=f"{motivo} - Por: {interaction.user}")
+            caso = self.bot.casos.registrar(guild.id, membro.id, interaction.user.id, 'silenciar', motivo)
+            embed = discord.Embed(
+                title="🔇 Usuário Silenciado",
+                description=f"**{membro}** foi silenciado.",
+                color=0x808080
+            )
+            embed.add_field(name="Motivo", value=motivo, inline=False)
+            embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
+            embed.set_footer(text=f"Caso #{caso.numero}")
+            await responder(embed=embed)
+        except Exception as e:
+            await responder('❌ Falha ao silenciar usuário.', ephemeral=True)
+            logger.error(f"Erro ao silenciar: {e}")
+
+    @app_commands.command(name='historico', description='Histórico de moderação de um usuário')
+    @app_commands.guild_only()
+    @app_commands.describe(usuario='O usuário (também funciona para quem já saiu ou foi banido)')
+    async def historico_moderacao(self, interaction: discord.Interaction, usuario: discord.User):
+        if not interaction.user.guild_permissions.view_audit_log:
+            await interaction.response.send_message('❌ Você não tem permissão para ver o registro de auditoria.', ephemeral=True)
+            return
+
+        casos, total = await self.bot.casos.historico(interaction.guild_id, usuario.id, limite=10)
+        embed = discord.Embed(title=f"📋 Histórico de {usuario}", color=0x5865F2)
+        if not casos:
+            embed.description = "Nenhum caso registrado."
+        else:
+            embed.description = '\n'.join(descrever_caso(c) for c in casos)[:4096]
+            if total > len(casos):
+                embed.set_footer(text=f"Mostrando os {len(casos)} mais recentes de {total} casos. Use /caso para ver os detalhes.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name='caso', description='Detalhes de um caso de moderação')
+    @app_commands.guild_only()
+    @app_commands.describe(numero='Número do caso')
+    async def caso_moderacao(self, interaction: discord.Interaction, numero: app_commands.Range[int, 1]):
+        if not interaction.user.guild_permissions.view_audit_log:
+            await interaction.response.send_message('❌ Você não tem permissão para ver o registro de auditoria.', ephemeral=True)
+            return
+
+        caso = await self.bot.casos.caso(interaction.guild_id, numero)
+        if caso is None:
+            await interaction.response.send_message(f'❌ Caso #{numero} não encontrado.', ephemeral=True)
+            return
+        embed = discord.Embed(title=f"{ICONES_CASOS.get(caso.acao, '⚖️')} Caso #{caso.numero}: {caso.acao}", color=0x5865F2)
+        embed.add_field(name="Usuário", value=f"<@{caso.usuario_id}> (`{caso.usuario_id}`)", inline=True)
+        embed.add_field(name="Moderador", value=f"<@{caso.moderador_id}>", inline=True)
+        embed.add_field(name="Data", value=f"<t:{int(caso.criado_em)}:F>", inline=False)
+        embed.add_field(name="Motivo", value=caso.motivo[:1024], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name='limpar', description='Limpa mensagens do canal')
+    @limitar_slash(3, 60, escopo='canal')
+    @app_commands.describe(
+        quantidade=f'Número de mensagens a examinar (1-{LIMPAR_MAX})',
+        membro='Apagar só mensagens deste usuário',
+        bots='Apagar só mensagens de bots',
+        padrao='Apagar só mensagens que casam com esta expressão regular',
+        anexos='Apagar só mensagens com anexos',
+        links='Apagar só mensagens com links',
+        minutos='Examinar só as mensagens dos últimos N minutos'
+    )
+    async def clear(self, 
+        interaction: discord.Interaction,
+        quantidade: int = 5,
+        membro: discord.User = None,
+        bots: bool = False,
+        padrao: str = None,
+        anexos: bool = False,
+        links: bool = False,
+        minutos: int = None
+    ):
+        if not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message('❌ Você não tem permissão para gerenciar mensagens.', ephemeral=True)
+            return
+
+        if quantidade < 1 or quantidade > LIMPAR_MAX:
+            await interaction.response.send_message(f"❌ Por favor, informe um número entre 1 e {LIMPAR_MAX}.", ephemeral=True)
+            return
+
+        if minutos is not None and minutos < 1:
+            await interaction.response.send_message("❌ O número de minutos deve ser positivo.", ephemeral=True)
+            return
+
+        try:
+            filtro = FiltroLimpeza(
+                autor_id=membro.id if membro else None,
+                so_bots=bots,
+                padrao=padrao,
+                anexos=anexos,
+                links=links
+            )
+        except re.error as e:
+            await interaction.response.send_message(f"❌ Expressão regular inválida: {e}", ephemeral=True)
+            return
+
+        canal = interaction.channel
+        if canal.id in self.bot.limpezas:
+            await interaction.response.send_message(
+                f"❌ Já existe uma limpeza em andamento neste canal ({self.bot.limpezas[canal.id].resumo()}).",
+                ephemeral=True
+            )
+            return
+
+        # A mensagem de progresso (com o botão de cancelar) só é criada se a
+        # limpeza demorar; limpezas curtas custam o mesmo que antes.
+        progresso = None
+        botao = None
+
+        async def ao_progresso(limpeza):
+            nonlocal progresso, botao
+            if interaction.is_expired():
+                return
+            texto = f"🧹 Limpando... {limpeza.resumo()}"
+            if progresso is None:
+                botao = CancelarLimpeza(limpeza)
+                progresso = await interaction.followup.send(texto, view=botao, ephemeral=True, wait=True)
+            elif not limpeza.cancelada:
+                await progresso.edit(content=texto)
+
+        limpeza = Limpeza(
+            canal,
+            quantidade,
+            filtro,
+            ritmo=self.bot.ritmo,
+            desde=discord.utils.utcnow() - datetime.timedelta(minutes=minutos) if minutos else None,
+            motivo=f"/limpar por {interaction.user}",
+            ao_progresso=ao_progresso
+        )
+        # Registrada antes do primeiro await para duas limpezas não disputarem o canal
+        self.bot.limpezas[canal.id] = limpeza
+        try:
+            await interaction.response.defer(ephemeral=True)
+            await limpeza.executar()
+        finally:
+            del self.bot.limpezas[canal.id]
+
+        embed = discord.Embed(
+            title="🧹 Limpeza Cancelada" if limpeza.cancelada else "🧹 Mensagens Limpas",
+            description=f"**{limpeza.apagadas}** mensagens foram apagadas ({limpeza.examinadas} examinadas).",
+            color=0xffff00 if limpeza.cancelada or limpeza.falhas else 0x00ff00
+        )
+        if limpeza.falhas:
+            embed.add_field(name="⚠️ Falhas", value=str(limpeza.falhas), inline=True)
+        if botao is not None:
+            botao.stop()
+        # O token da interação vale 15 minutos e limpezas longas (mensagens
+        # antigas saem uma a uma) terminam depois disso: o resumo vai para o canal
+        if not interaction.is_expired():
+            try:
+                if progresso is not None:
+                    await progresso.edit(content=None, embed=embed, view=None)
+                else:
+                    await interaction.followup.send(embed=embed, ephemeral=True)
+                return
+            except discord.HTTPException as e:
+                logger.warning(f"Falha ao responder o /limpar em {canal.id}, resumo vai para o canal: {e}")
+        try:
+            await canal.send(interaction.user.mention, embed=embed)
+        except discord.HTTPException as e:
+            logger.warning(f"Falha ao enviar o resumo do /limpar em {canal.id}: {e}")
+
+    config_grupo = app_commands.Group(
+        name='configurar', description='Configurações do bot neste servidor', guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True),
+    )
+
+    async def salvar_configuracao(self, interaction: discord.Interaction, descricao: str, **mudancas):
+        if not interaction.user.guild_permissions.manage_guild:
+            await interaction.response.send_message('❌ Você não tem permissão para gerenciar o servidor.', ephemeral=True)
+            return
+        self.bot.configuracoes.definir(interaction.guild_id, **mudancas)
+        await interaction.response.send_message(f"✅ {descricao}")
+
+    @config_grupo.command(name='ver', description='Mostra as configurações atuais')
+    async def config_ver(self, interaction: discord.Interaction):
+        config = self.bot.configuracoes.obter(interaction.guild_id)
+        if not config.boas_vindas:
+            boas_vindas = "desativadas"
+        elif config.canal_boas_vindas:
+            boas_vindas = f"<#{config.canal_boas_vindas}>"
+        else:
+            boas_vindas = "canal de sistema"
+        embed = discord.Embed(title="⚙️ Configurações do Servidor", color=0x3498DB)
+        embed.add_field(name="Prefixo", value=f"`{config.prefixo}`", inline=True)
+        embed.add_field(name="Boas-vindas", value=boas_vindas, inline=True)
+        embed.add_field(name="Versão da Bíblia", value=VERSOES_BIBLIA[config.versao_biblia], inline=False)
+        embed.add_field(name="Cargo de silenciamento", value=config.cargo_muted, inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @config_grupo.command(name='prefixo', description='Muda o prefixo dos comandos de texto')
+    @app_commands.describe(prefixo='Novo prefixo (até 5 caracteres, sem espaços)')
+    async def config_prefixo(self, interaction: discord.Interaction, prefixo: str):
+        if not prefixo or len(prefixo) > 5 or any(c.isspace() for c in prefixo):
+            await interaction.response.send_message('❌ O prefixo deve ter de 1 a 5 caracteres, sem espaços.', ephemeral=True)
+            return
+        await self.salvar_configuracao(interaction, f"Prefixo alterado para `{prefixo}`.", prefixo=prefixo)
+
+    @config_grupo.command(name='boas-vindas', description='Configura as mensagens de boas-vindas')
+    @app_commands.describe(ativar='Enviar boas-vindas', canal='Canal das boas-vindas (padrão: canal de sistema)')
+    async def config_boas_vindas(self, interaction: discord.Interaction, ativar: bool, canal: discord.TextChannel = None):
+        if ativar and canal and not canal.permissions_for(interaction.guild.me).send_messages:
+            await interaction.response.send_message(f'❌ Não consigo enviar mensagens em {canal.mention}.', ephemeral=True)
+            return
+        if not ativar:
+            descricao = "Boas-vindas desativadas."
+        else:
+            descricao = f"Boas-vindas ativadas em {canal.mention if canal else 'canal de sistema'}."
+        await self.salvar_configuracao(interaction, descricao, boas_vindas=ativar, canal_boas_vindas=canal.id if canal else None)
+
+    @config_grupo.command(name='versao', description='Versão da Bíblia usada nos comandos bíblicos')
+    @app_commands.describe(versao='Versão da Bíblia')
+    @app_commands.choices(versao=[app_commands.Choice(name=nome, value=sigla) for sigla, nome in VERSOES_BIBLIA.items()])
+    async def config_versao(self, interaction: discord.Interaction, versao: str):
+        await self.salvar_configuracao(interaction, f"Versão da Bíblia: **{VERSOES_BIBLIA[versao]}**.", versao_biblia=versao)
+
+    @config_grupo.command(name='cargo-muted', description='Nome do cargo usado pelo /silenciar')
+    @app_commands.describe(nome='Nome do cargo')
+    async def config_cargo_muted(self, interaction: discord.Interaction, nome: str):
+        if not 1 <= len(nome) <= 100:
+            await interaction.response.send_message('❌ O nome deve ter de 1 a 100 caracteres.', ephemeral=True)
+            return
+        await self.salvar_configuracao(interaction, f"Cargo de silenciamento: **{nome}**.", cargo_muted=nome)
+        self.bot.cargos_muted.esquecer(interaction.guild_id)
+
+    automod_grupo = app_commands.Group(
+        name='automod', description='Moderação automática de mensagens', guild_only=True,
+        default_permissions=discord.Permissions(manage_guild=True),
+    )
+
+    @automod_grupo.command(name='ativar', description='Ativa o automod neste servidor')
+    @app_commands.describe(acao='O que fazer além de apagar a mensagem', bloquear_convites='Apagar convites para outros servidores')
+    @app_commands.choices(acao=[app_commands.Choice(name=a, value=a) for a in AUTOMOD_ACOES])
+    async def automod_ativar(self, interaction: discord.Interaction, acao: str = 'apagar', bloquear_convites: bool = True):
+        if not await pode_configurar_automod(interaction):
+            return
+        await self.bot.automod.configurar(interaction.guild_id, ativo=True, acao=acao, convites=bloquear_convites)
+        await interaction.response.send_message(f"✅ Automod ativado (ação: **{acao}**).")
+
+    @automod_grupo.command(name='desativar', description='Desativa o automod neste servidor')
+    async def automod_desativar(self, interaction: discord.Interaction):
+        if not await pode_configurar_automod(interaction):
+            return
+        regras = self.bot.automod.regras.get(interaction.guild_id)
+        acao, convites = (regras.acao, regras.convites) if regras else ('apagar', True)
+        await self.bot.automod.configurar(interaction.guild_id, ativo=False, acao=acao, convites=convites)
+        await interaction.response.send_message("✅ Automod desativado.")
+
+    @automod_grupo.command(name='bloquear', description='Bloqueia uma palavra ou um domínio')
+    @app_commands.describe(tipo='Palavra (ou frase) ou domínio', valor='O que bloquear')
+    @app_commands.choices(tipo=[app_commands.Choice(name='palavra', value='palavra'),
+                                app_commands.Choice(name='domínio', value='dominio')])
+    async def automod_bloquear(self, interaction: discord.Interaction, tipo: str, valor: str):
+        if not await pode_configurar_automod(interaction):
+            return
+        if not 1 <= len(valor.strip()) <= 100:
+            await interaction.response.send_message('❌ O valor deve ter de 1 a 100 caracteres.', ephemeral=True)
+            return
+        if await self.bot.automod.adicionar(interaction.guild_id, tipo, valor):
+            await interaction.response.send_message(f"✅ `{valor}` bloqueado.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"ℹ️ `{valor}` já estava bloqueado.", ephemeral=True)
+
+    @automod_grupo.command(name='liberar', description='Remove uma palavra ou um domínio bloqueado')
+    @app_commands.describe(tipo='Palavra (ou frase) ou domínio', valor='O que liberar')
+    @app_commands.choices(tipo=[app_commands.Choice(name='palavra', value='palavra'),
+                                app_commands.Choice(name='domínio', value='dominio')])
+    async def automod_liberar(self, interaction: discord.Interaction, tipo: str, valor: str):
+        if not await pode_configurar_automod(interaction):
+            return
+        if await self.bot.automod.remover(interaction.guild_id, tipo, valor):
+            await interaction.response.send_message(f"✅ `{valor}` liberado.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"ℹ️ `{valor}` não estava bloqueado.", ephemeral=True)
+
+    @automod_grupo.command(name='ver', description='Mostra a configuração do automod')
+    async def automod_ver(self, interaction: discord.Interaction):
+        if not await pode_configurar_automod(interaction):
+            return
+        regras = self.bot.automod.regras.get(interaction.guild_id)
+        embed = discord.Embed(title="🛡️ Automod", color=0x3498DB)
+        if regras is None or not regras.ativo:
+            embed.description = "Desativado. Use `/automod ativar`."
+        else:
+            embed.add_field(name="Ação", value=regras.acao, inline=True)
+            embed.add_field(name="Convites", value="bloqueados" if regras.convites else "permitidos", inline=True)
+        if regras is not None:
+            embed.add_field(name=f"Palavras ({len(regras.palavras)})",
+                            value=', '.join(f"||{p}||" for p in sorted(regras.palavras))[:1024] or "nenhuma", inline=False)
+            embed.add_field(name=f"Domínios ({len(regras.dominios)})",
+                            value=', '.join(sorted(regras.dominios))[:1024] or "nenhum", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Moderacao(bot))
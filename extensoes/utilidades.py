@@ -0,0 +1,197 @@
+"""Comandos gerais: ajuda, ping, piada, informações e lembretes."""
+
+import random
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core.configuracoes import CAMPOS
+from core.limites import limitar_slash
+
+# Máximo de antecedência de um lembrete (1 ano)
+LEMBRETE_MAX_MINUTOS = 60 * 24 * 365
+
+class Utilidades(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name='ajuda', description='Mostra os comandos disponíveis')
+    async def help_command(self, interaction: discord.Interaction):
+        p = self.bot.configuracoes.obter(interaction.guild_id).prefixo if interaction.guild_id else CAMPOS['prefixo']
+        embed = discord.Embed(
+            title="🤖 Comandos do Bot",
+            description="Lista completa de comandos disponíveis:",
+            color=0x5865F2
+        )
+        
+        embed.add_field(
+            name="📋 Comandos Slash (/)",
+            value="`/ajuda` - Esta mensagem\n"
+                  "`/ping` - Verifica latência\n"
+                  "`/piada` - Conta uma piada\n"
+                  "`/info-servidor` - Info do servidor\n"
+                  "`/info-usuario` - Info de usuário\n"
+                  "`/expulsar` - Expulsar membro\n"
+                  "`/banir` - Banir membro\n"
+                  "`/silenciar` - Silenciar membro\n"
+                  "`/limpar` - Limpar mensagens\n"
+                  "`/lembrar` - Criar lembrete\n"
+                  "`/versiculo-diario` - Versículo do dia automático",
+            inline=False
+        )
+        
+        embed.add_field(
+            name=f"📖 Comandos Bíblicos ({p})",
+            value=f"`{p}versiculo` - Buscar versículo\n"
+                  f"`{p}versiculo_diario` - Versículo do dia\n"
+                  f"`{p}pesquisar_biblia` - Pesquisar na Bíblia\n"
+                  f"`{p}ajuda_biblia` - Ajuda detalhada",
+            inline=False
+        )
+        
+        embed.set_footer(text=f"Use {p} para comandos bíblicos e / para outros comandos")
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name='ping', description='Verifica a latência do bot')
+    async def ping(self, interaction: discord.Interaction):
+        metricas = self.bot.metricas
+        latency = round(self.bot.latency * 1000)
+        atraso_max, atraso_p99 = (round(v * 1000) for v in self.bot.atraso_loop.recente())
+        # O heartbeat sozinho esconde um loop travado; a cor considera os dois
+        pior = max(latency, atraso_max)
+        embed = discord.Embed(
+            title="🏓 Pong!",
+            description=f"Latência: **{latency}ms**",
+            color=0x00ff00 if pior < 100 else 0xffff00 if pior < 200 else 0xff0000
+        )
+        embed.add_field(name="🔁 Event loop", value=f"atraso máx. {atraso_max}ms • p99 {atraso_p99}ms", inline=False)
+
+        comandos = metricas.contador('comandos_total')
+        erros = metricas.contador('comandos_erros_total')
+        duracao = metricas.histograma('comandos_latencia_segundos')
+        embed.add_field(
+            name="⚙️ Comandos",
+            value=f"{comandos} executados • {erros} com erro\n"
+                  f"p50 {duracao.quantil(0.5) * 1000:.0f}ms • p99 {duracao.quantil(0.99) * 1000:.0f}ms",
+            inline=False
+        )
+
+        requisicoes = metricas.contador('biblia_api_requisicoes_total')
+        if requisicoes:
+            falhas = requisicoes - metricas.contador('biblia_api_requisicoes_total', resultado='ok')
+            api = metricas.histograma('biblia_api_latencia_segundos')
+            embed.add_field(
+                name="📖 API bíblica",
+                value=f"p50 {api.quantil(0.5) * 1000:.0f}ms • falhas {falhas / requisicoes:.1%} de {requisicoes}",
+                inline=False
+            )
+
+        quedas = metricas.contador('gateway_eventos_total', evento='queda')
+        retomadas = metricas.contador('gateway_eventos_total', evento='retomada')
+        embed.add_field(name="🌐 Gateway", value=f"{quedas} queda(s) • {retomadas} retomada(s)", inline=False)
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name='piada', description='Conta uma piada de programação')
+    async def joke(self, interaction: discord.Interaction):
+        jokes = [
+            '🐛 Por que os programadores preferem o modo escuro? Porque a luz atrai bugs!',
+            '💾 Uma consulta SQL entra em um bar e pergunta: "Posso me juntar a vocês?"',
+            '👓 Por que desenvolvedores Java usam óculos? Porque não veem C#.',
+            '💡 Quantos programadores para trocar uma lâmpada? Nenhum, é problema de hardware.',
+            '🔢 Existem 10 tipos de pessoas: as que entendem binário e as que não.',
+            '☕ Por que os programadores preferem café? Porque Java é vida!',
+            '🔄 Como você chama um programador que não comenta o código? Um poeta!'
+        ]
+        
+        embed = discord.Embed(
+            title="😄 Piada de Programação",
+            description=random.choice(jokes),
+            color=0xffd700
+        )
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name='info-servidor', description='Mostra informações do servidor')
+    async def serverinfo(self, interaction: discord.Interaction):
+        guild = interaction.guild
+        embed = discord.Embed(
+            title=f"ℹ️ {guild.name}",
+            color=0x5865F2
+        )
+        
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+        
+        embed.add_field(name="🆔 ID", value=str(guild.id), inline=True)
+        dono = await self.bot.membros.buscar(guild, guild.owner_id)
+        embed.add_field(name="👑 Dono", value=str(dono), inline=True)
+        embed.add_field(name="👥 Membros", value=str(guild.member_count), inline=True)
+        embed.add_field(name="📅 Criado em", value=f"<t:{int(guild.created_at.timestamp())}:D>", inline=True)
+        embed.add_field(name="⭐ Nível Boost", value=str(guild.premium_tier), inline=True)
+        embed.add_field(name="💎 Boosts", value=str(guild.premium_subscription_count), inline=True)
+        
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name='info-usuario', description='Mostra informações de um usuário')
+    @app_commands.describe(membro='O usuário para ver informações (opcional)')
+    async def userinfo(self, interaction: discord.Interaction, membro: discord.Member = None):
+        member = membro or interaction.user
+        embed = discord.Embed(
+            title=f"👤 {member.display_name}",
+            color=member.color if member.color != discord.Color.default() else 0x5865F2
+        )
+        
+        embed.set_thumbnail(url=member.display_avatar.url)
+        embed.add_field(name="🆔 ID", value=str(member.id), inline=True)
+        embed.add_field(name="📅 Entrou em", value=f"<t:{int(member.joined_at.timestamp())}:D>", inline=True)
+        embed.add_field(name="🎂 Conta criada", value=f"<t:{int(member.created_at.timestamp())}:D>", inline=True)
+        embed.add_field(name="🤖 Bot?", value="Sim" if member.bot else "Não", inline=True)
+        embed.add_field(name="🎭 Cargos", value=str(len(member.roles) - 1), inline=True)
+        
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name='lembrar', description='Cria um lembrete')
+    @limitar_slash(5, 60)
+    @app_commands.describe(minutos='Tempo em minutos para o lembrete', mensagem='Mensagem do lembrete')
+    async def remind(self, interaction: discord.Interaction, minutos: int, mensagem: str):
+        if minutos <= 0 or minutos > LEMBRETE_MAX_MINUTOS:
+            await interaction.response.send_message(f'❌ O tempo deve ser entre 1 e {LEMBRETE_MAX_MINUTOS} minutos (1 ano).', ephemeral=True)
+            return
+
+        quando = time.time() + minutos * 60
+        await self.bot.lembretes.agendar(
+            interaction.user.id,
+            interaction.channel_id,
+            interaction.guild_id,
+            mensagem,
+            quando
+        )
+
+        embed = discord.Embed(
+            title="⏰ Lembrete Criado",
+            description=f"Vou te lembrar <t:{int(quando)}:R>!",
+            color=0x00ff00
+        )
+        embed.add_field(name="Mensagem", value=mensagem, inline=False)
+        await interaction.response.send_message(embed=embed)
+
+    async def entregar_lembrete(self, lembrete):
+        """Envia o lembrete no canal onde foi criado ou, se não der, por DM"""
+        remind_embed = discord.Embed(
+            title="⏰ Lembrete!",
+            description=lembrete.mensagem,
+            color=0xffd700
+        )
+
+        canal = self.bot.get_channel(lembrete.canal_id) if lembrete.canal_id else None
+        if canal is not None and lembrete.guild_id:
+            if canal.permissions_for(canal.guild.me).send_messages:
+                await canal.send(f"<@{lembrete.usuario_id}>", embed=remind_embed)
+                return
+
+        usuario = self.bot.get_user(lembrete.usuario_id) or await self.bot.fetch_user(lembrete.usuario_id)
+        await usuario.send(embed=remind_embed)
+
+async def setup(bot):
+    await bot.add_cog(Utilidades(bot))
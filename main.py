@@ -1,594 +1,425 @@
 
 import discord
 from discord.ext import commands, tasks
-from discord import app_commands
 import os
-import random
 import asyncio
+import importlib.util
+import signal
+import sys
+import time
 from dotenv import load_dotenv
 import logging
-import requests
-import json
+import yarl
+
+from core.automod import Automod
+from core.biblia_api import BibliaAPI
+from core.biblia_busca import IndiceBusca
+from core.biblia_store import BibliaStore
+from core.boas_vindas import BoasVindas
+from core.cache import CacheTTL
+from core.cargo_muted import CargosMuted
+from core.casos import RegistroCasos
+from core.cluster import ClienteIPC, Lancador
+from core.configuracoes import CAMPOS, Configuracoes
+from core.lembretes import AgendadorLembretes
+from core.limites import LIMITES, Limite
+from core.logs import configurar as configurar_logs, contexto as contexto_log
+from core.membros import CacheMembros, opcoes_bot
+from core.paginacao import Cursores
+from core.metricas import ArvoreInstrumentada, AtrasoLoop, Metricas, instrumentar
+from core.ritmo import Ritmo
+from core.sqlite import BancoSQLite
+from core.sync_comandos import sincronizar
+from core.versiculo_diario import VersiculoDiario
 
 # Carregar variáveis de ambiente
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 
-if not TOKEN:
-    print("ERRO: Token do Discord não encontrado no arquivo .env")
-    print("Certifique-se de que DISCORD_TOKEN está definido no arquivo .env")
-    exit(1)
-
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Logging numa thread própria (ver core/logs.py): console em texto ou JSON e,
+# com LOG_ARQUIVO, JSON por linha rotacionado por tamanho. Cada processo de
+# cluster grava no seu arquivo ({cluster} vira o CLUSTER_ID).
+_CLUSTER_LOG = os.getenv('CLUSTER_ID', 'principal')
+LOGS = configurar_logs(
+    nivel=os.getenv('LOG_NIVEL', 'INFO').upper(),
+    formato=os.getenv('LOG_FORMATO', 'texto'),
+    arquivo=os.getenv('LOG_ARQUIVO', 'logs/bot-{cluster}.jsonl').format(cluster=_CLUSTER_LOG) or None,
+    arquivo_bytes=int(os.getenv('LOG_ARQUIVO_BYTES', str(10 * 1024 * 1024))),
+    arquivo_copias=int(os.getenv('LOG_ARQUIVO_COPIAS', '5')),
+    janela=float(os.getenv('LOG_REPETIDOS_JANELA', '60')),
+    fixos={'cluster': _CLUSTER_LOG},
 )
 logger = logging.getLogger('discord_bot')
 
+if not TOKEN:
+    logger.error("Token do Discord não encontrado no arquivo .env; "
+                 "certifique-se de que DISCORD_TOKEN está definido")
+    LOGS.close()
+    exit(1)
+
 # Configuração intents
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
 intents.members = True
 
-# Criar bot
-bot = commands.Bot(
-    command_prefix='*',
-    intents=intents,
-    help_command=None,
-    case_insensitive=True
-)
-
-# Evento ao iniciar o bot
-@bot.event
-async def on_ready():
-    print("=" * 50)
-    print(f"✅ Bot conectado com sucesso!")
-    print(f"🤖 Nome: {bot.user}")
-    print(f"🆔 ID: {bot.user.id}")
-    print(f"🌐 Servidores conectados: {len(bot.guilds)}")
-    print("=" * 50)
-    
-    # Definir status
-    await bot.change_presence(
-        activity=discord.Game(name="Use /ajuda ou *ajuda_biblia"),
-        status=discord.Status.online
-    )
-    
-    # Sincronizar comandos slash
-    try:
-        print("🔄 Sincronizando comandos slash...")
-        synced = await bot.tree.sync()
-        print(f"✅ {len(synced)} comandos slash sincronizados")
-        
-        # Listar comandos sincronizados
-        for cmd in synced:
-            print(f"   📋 /{cmd.name}")
-            
-    except Exception as e:
-        print(f"❌ Erro ao sincronizar comandos: {e}")
-        logger.error(f"Erro na sincronização: {e}")
-
-# Evento quando bot entra em servidor
-@bot.event
-async def on_guild_join(guild):
-    print(f"🆕 Bot adicionado ao servidor: {guild.name} (ID: {guild.id})")
-
-# Boas-vindas
-@bot.event
-async def on_member_join(member):
-    channel = member.guild.system_channel
-    if channel:
-        embed = discord.Embed(
-            title="🎉 Bem-vindo(a)!",
-            description=f"Olá {member.mention}! Bem-vindo(a) ao **{member.guild.name}**!",
-            color=0x00ff00
+# API e gateway alternativos (ex.: o mock de benchmarks/mock_discord.py)
+DISCORD_API_URL = os.getenv('DISCORD_API_URL')
+if DISCORD_API_URL:
+    discord.http.Route.BASE = DISCORD_API_URL
+if os.getenv('DISCORD_GATEWAY_URL'):
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(os.getenv('DISCORD_GATEWAY_URL'))
+
+# Clusters: o lançador (`python main.py cluster <n>`) define estas variáveis
+CLUSTER_ID = int(os.getenv('CLUSTER_ID', '0'))
+CLUSTER_SHARDS = [int(s) for s in os.getenv('CLUSTER_SHARDS', '').split(',') if s.strip()] or None
+SHARD_COUNT = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+
+# Política de cache de membros: completo, sem_chunk, sob_demanda ou lru (ver core/membros.py)
+MEMBROS_POLITICA = os.getenv('MEMBROS_POLITICA', 'completo')
+
+# Endpoint de métricas no formato do Prometheus (desligado se vazio); cada
+# cluster usa a porta base + CLUSTER_ID
+METRICAS_HOST = os.getenv('METRICAS_HOST', '127.0.0.1')
+METRICAS_PORTA = int(os.getenv('METRICAS_PORTA')) + CLUSTER_ID if os.getenv('METRICAS_PORTA') else None
+
+# Comandos e eventos ficam em extensões recarregáveis (`*recarregar` ou SIGHUP);
+# o estado (caches, lembretes, banco) fica no bot e sobrevive à recarga
+EXTENSOES = ('extensoes.eventos', 'extensoes.utilidades', 'extensoes.moderacao', 'extensoes.biblia')
+
+class SoninhoBot(commands.AutoShardedBot):
+    def __init__(self, **kwargs):
+        super().__init__(tree_cls=ArvoreInstrumentada, **kwargs)
+        self.metricas = Metricas()
+        self.atraso_loop = AtrasoLoop(self.metricas)
+        instrumentar(self, self.metricas)
+        self.biblia = BibliaAPI(
+            os.getenv('BIBLIA_API_URL', 'https://www.abibliadigital.com.br/api'),
+            max_concorrencia=int(os.getenv('BIBLIA_API_CONCORRENCIA', '8')),
+            timeout=float(os.getenv('BIBLIA_API_TIMEOUT', '10')),
+            metricas=self.metricas,
+            # Requisições por minuto à API, somando todos os usuários
+            orcamento=Limite(int(os.getenv('BIBLIA_API_ORCAMENTO', '60')), 60, escopo='global', nome='biblia_api'),
         )
-        embed.set_thumbnail(url=member.display_avatar.url)
-        await channel.send(embed=embed)
-
-# ===== COMANDOS SLASH =====
-
-@bot.tree.command(name='ajuda', description='Mostra os comandos disponíveis')
-async def help_command(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="🤖 Comandos do Bot",
-        description="Lista completa de comandos disponíveis:",
-        color=0x5865F2
-    )
-    
-    embed.add_field(
-        name="📋 Comandos Slash (/)",
-        value="`/ajuda` - Esta mensagem\n"
-              "`/ping` - Verifica latência\n"
-              "`/piada` - Conta uma piada\n"
-              "`/info-servidor` - Info do servidor\n"
-              "`/info-usuario` - Info de usuário\n"
-              "`/expulsar` - Expulsar membro\n"
-              "`/banir` - Banir membro\n"
-              "`/silenciar` - Silenciar membro\n"
-              "`/limpar` - Limpar mensagens\n"
-              "`/lembrar` - Criar lembrete",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="📖 Comandos Bíblicos (*)",
-        value="`*versiculo` - Buscar versículo\n"
-              "`*versiculo_diario` - Versículo do dia\n"
-              "`*pesquisar_biblia` - Pesquisar na Bíblia\n"
-              "`*ajuda_biblia` - Ajuda detalhada",
-        inline=False
-    )
-    
-    embed.set_footer(text="Use * para comandos bíblicos e / para outros comandos")
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name='ping', description='Verifica a latência do bot')
-async def ping(interaction: discord.Interaction):
-    latency = round(bot.latency * 1000)
-    embed = discord.Embed(
-        title="🏓 Pong!",
-        description=f"Latência: **{latency}ms**",
-        color=0x00ff00 if latency < 100 else 0xffff00 if latency < 200 else 0xff0000
-    )
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name='piada', description='Conta uma piada de programação')
-async def joke(interaction: discord.Interaction):
-    jokes = [
-        '🐛 Por que os programadores preferem o modo escuro? Porque a luz atrai bugs!',
-        '💾 Uma consulta SQL entra em um bar e pergunta: "Posso me juntar a vocês?"',
-        '👓 Por que desenvolvedores Java usam óculos? Porque não veem C#.',
-        '💡 Quantos programadores para trocar uma lâmpada? Nenhum, é problema de hardware.',
-        '🔢 Existem 10 tipos de pessoas: as que entendem binário e as que não.',
-        '☕ Por que os programadores preferem café? Porque Java é vida!',
-        '🔄 Como você chama um programador que não comenta o código? Um poeta!'
-    ]
-    
-    embed = discord.Embed(
-        title="😄 Piada de Programação",
-        description=random.choice(jokes),
-        color=0xffd700
-    )
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name='info-servidor', description='Mostra informações do servidor')
-async def serverinfo(interaction: discord.Interaction):
-    guild = interaction.guild
-    embed = discord.Embed(
-        title=f"ℹ️ {guild.name}",
-        color=0x5865F2
-    )
-    
-    if guild.icon:
-        embed.set_thumbnail(url=guild.icon.url)
-    
-    embed.add_field(name="🆔 ID", value=str(guild.id), inline=True)
-    embed.add_field(name="👑 Dono", value=str(guild.owner), inline=True)
-    embed.add_field(name="👥 Membros", value=str(guild.member_count), inline=True)
-    embed.add_field(name="📅 Criado em", value=f"<t:{int(guild.created_at.timestamp())}:D>", inline=True)
-    embed.add_field(name="⭐ Nível Boost", value=str(guild.premium_tier), inline=True)
-    embed.add_field(name="💎 Boosts", value=str(guild.premium_subscription_count), inline=True)
-    
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name='info-usuario', description='Mostra informações de um usuário')
-@app_commands.describe(membro='O usuário para ver informações (opcional)')
-async def userinfo(interaction: discord.Interaction, membro: discord.Member = None):
-    member = membro or interaction.user
-    embed = discord.Embed(
-        title=f"👤 {member.display_name}",
-        color=member.color if member.color != discord.Color.default() else 0x5865F2
-    )
-    
-    embed.set_thumbnail(url=member.display_avatar.url)
-    embed.add_field(name="🆔 ID", value=str(member.id), inline=True)
-    embed.add_field(name="📅 Entrou em", value=f"<t:{int(member.joined_at.timestamp())}:D>", inline=True)
-    embed.add_field(name="🎂 Conta criada", value=f"<t:{int(member.created_at.timestamp())}:D>", inline=True)
-    embed.add_field(name="🤖 Bot?", value="Sim" if member.bot else "Não", inline=True)
-    embed.add_field(name="🎭 Cargos", value=str(len(member.roles) - 1), inline=True)
-    
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name='expulsar', description='Expulsa um usuário do servidor')
-@app_commands.describe(membro='O usuário para expulsar', motivo='Motivo da expulsão')
-async def kick(interaction: discord.Interaction, membro: discord.Member, motivo: str = "Nenhum motivo fornecido"):
-    if not interaction.user.guild_permissions.kick_members:
-        await interaction.response.send_message('❌ Você não tem permissão para expulsar membros.', ephemeral=True)
-        return
-
-    if membro == interaction.user:
-        await interaction.response.send_message('❌ Você não pode se expulsar.', ephemeral=True)
-        return
-
-    if not membro.kickable:
-        await interaction.response.send_message('❌ Não posso expulsar esse usuário.', ephemeral=True)
-        return
-
-    try:
-        await membro.kick(reason=f"{motivo} - Por: {interaction.user}")
-        embed = discord.Embed(
-            title="👢 Usuário Expulso",
-            description=f"**{membro}** foi expulso do servidor.",
-            color=0xff9500
+        self.biblia_fallback = os.getenv('BIBLIA_API_FALLBACK', '1') == '1'
+        self.cache_biblia = CacheTTL(
+            max_itens=int(os.getenv('BIBLIA_CACHE_ITENS', '2048')),
+            max_bytes=int(os.getenv('BIBLIA_CACHE_BYTES', str(8 * 1024 * 1024))),
+            ttl=float(os.getenv('BIBLIA_CACHE_TTL', '3600')),
         )
-        embed.add_field(name="Motivo", value=motivo, inline=False)
-        embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message('❌ Falha ao expulsar usuário.', ephemeral=True)
-        logger.error(f"Erro ao expulsar: {e}")
-
-@bot.tree.command(name='banir', description='Bane um usuário do servidor')
-@app_commands.describe(membro='O usuário para banir', motivo='Motivo do banimento')
-async def ban(interaction: discord.Interaction, membro: discord.Member, motivo: str = "Nenhum motivo fornecido"):
-    if not interaction.user.guild_permissions.ban_members:
-        await interaction.response.send_message('❌ Você não tem permissão para banir membros.', ephemeral=True)
-        return
-
-    if membro == interaction.user:
-        await interaction.response.send_message('❌ Você não pode se banir.', ephemeral=True)
-        return
-
-    if not membro.bannable:
-        await interaction.response.send_message('❌ Não posso banir esse usuário.', ephemeral=True)
-        return
-
-    try:
-        await membro.ban(reason=f"{motivo} - Por: {interaction.user}")
-        embed = discord.Embed(
-            title="🔨 Usuário Banido",
-            description=f"**{membro}** foi banido do servidor.",
-            color=0xff0000
+        # Resultados de pesquisa paginados; expiram em PESQUISA_TTL segundos
+        self.cursores = Cursores(
+            ttl=float(os.getenv('PESQUISA_TTL', '600')),
+            max_bytes=int(os.getenv('PESQUISA_BYTES', str(16 * 1024 * 1024))),
         )
-        embed.add_field(name="Motivo", value=motivo, inline=False)
-        embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message('❌ Falha ao banir usuário.', ephemeral=True)
-        logger.error(f"Erro ao banir: {e}")
-
-@bot.tree.command(name='silenciar', description='Silencia um usuário')
-@app_commands.describe(membro='O usuário para silenciar', motivo='Motivo do silenciamento')
-async def mute(interaction: discord.Interaction, membro: discord.Member, motivo: str = "Nenhum motivo fornecido"):
-    if not interaction.user.guild_permissions.manage_roles:
-        await interaction.response.send_message('❌ Você não tem permissão para gerenciar cargos.', ephemeral=True)
-        return
-
-    guild = interaction.guild
-    role = discord.utils.get(guild.roles, name="Muted")
-
-    if role is None:
-        try:
-            role = await guild.create_role(
-                name="Muted",
-                color=discord.Color.dark_gray(),
-                reason="Cargo criado automaticamente pelo bot"
-            )
-            for channel in guild.channels:
-                await channel.set_permissions(role, speak=False, send_messages=False, add_reactions=False)
-        except Exception as e:
-            await interaction.response.send_message('❌ Falha ao criar cargo Muted.', ephemeral=True)
-            logger.error(f"Erro ao criar cargo Muted: {e}")
-            return
-
-    if role in membro.roles:
-        await interaction.response.send_message('❌ Este usuário já está silenciado.', ephemeral=True)
-        return
-
-    try:
-        await membro.add_roles(role, reason=f"{motivo} - Por: {interaction.user}")
-        embed = discord.Embed(
-            title="🔇 Usuário Silenciado",
-            description=f"**{membro}** foi silenciado.",
-            color=0x808080
+        self.biblia_local = None
+        self.biblia_indice = None
+        self.db = BancoSQLite(os.getenv('BOT_DB', 'data/bot.db'))
+        self.lembretes = None
+        self.configuracoes = Configuracoes(self.db)
+        # Ritmo global das rajadas de REST (Muted, versículo diário, /limpar); o Discord aceita 50 req/s
+        self.ritmo = Ritmo(float(os.getenv('REST_POR_SEGUNDO', '40')))
+        self.cargos_muted = CargosMuted(
+            self.db, ritmo=self.ritmo, nome=lambda guild: self.configuracoes.obter(guild.id).cargo_muted
         )
-        embed.add_field(name="Motivo", value=motivo, inline=False)
-        embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message('❌ Falha ao silenciar usuário.', ephemeral=True)
-        logger.error(f"Erro ao silenciar: {e}")
-
-@bot.tree.command(name='limpar', description='Limpa mensagens do canal')
-@app_commands.describe(quantidade='Número de mensagens para apagar (1-100)')
-async def clear(interaction: discord.Interaction, quantidade: int = 5):
-    if not interaction.user.guild_permissions.manage_messages:
-        await interaction.response.send_message('❌ Você não tem permissão para gerenciar mensagens.', ephemeral=True)
-        return
-
-    if quantidade < 1 or quantidade > 100:
-        await interaction.response.send_message("❌ Por favor, informe um número entre 1 e 100.", ephemeral=True)
-        return
-
-    await interaction.response.defer(ephemeral=True)
-    deleted = await interaction.channel.purge(limit=quantidade)
-    
-    embed = discord.Embed(
-        title="🧹 Mensagens Limpas",
-        description=f"**{len(deleted)}** mensagens foram apagadas.",
-        color=0x00ff00
-    )
-    await interaction.followup.send(embed=embed, ephemeral=True)
-
-@bot.tree.command(name='lembrar', description='Cria um lembrete')
-@app_commands.describe(minutos='Tempo em minutos para o lembrete', mensagem='Mensagem do lembrete')
-async def remind(interaction: discord.Interaction, minutos: int, mensagem: str):
-    if minutos <= 0 or minutos > 1440:  # Máximo 24 horas
-        await interaction.response.send_message('❌ O tempo deve ser entre 1 e 1440 minutos (24h).', ephemeral=True)
-        return
-
-    embed = discord.Embed(
-        title="⏰ Lembrete Criado",
-        description=f"Vou te lembrar em **{minutos}** minuto(s)!",
-        color=0x00ff00
-    )
-    embed.add_field(name="Mensagem", value=mensagem, inline=False)
-    await interaction.response.send_message(embed=embed)
-    
-    await asyncio.sleep(minutos * 60)
-    
-    remind_embed = discord.Embed(
-        title="⏰ Lembrete!",
-        description=mensagem,
-        color=0xffd700
-    )
-    await interaction.followup.send(f"{interaction.user.mention}", embed=remind_embed)
-
-# ===== COMANDOS BÍBLICOS COM PREFIXO =====
-
-async def buscar_versiculo(livro, capitulo, versiculo):
-    try:
-        url = f"https://www.abibliadigital.com.br/api/verses/nvi/{livro}/{capitulo}/{versiculo}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except Exception as e:
-        logger.error(f"Erro ao buscar versículo: {e}")
-        return None
-
-async def buscar_versiculo_aleatorio():
-    try:
-        url = "https://www.abibliadigital.com.br/api/verses/nvi/random"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except Exception as e:
-        logger.error(f"Erro ao buscar versículo aleatório: {e}")
-        return None
-
-@bot.command(name='versiculo')
-async def versiculo_comando(ctx, livro: str = None, capitulo: int = None, versiculo: int = None, canal: discord.TextChannel = None):
-    """Busca um versículo específico da Bíblia"""
-    if not livro or not capitulo or not versiculo:
-        embed = discord.Embed(
-            title="❌ Uso Incorreto",
-            description="**Uso correto:** `*versiculo <livro> <capítulo> <versículo> [#canal]`\n**Exemplo:** `*versiculo joão 3 16`",
-            color=0xff0000
+        self.limpezas = {}
+        self.boas_vindas = None
+        # Casos com mais de CASOS_RETENCAO_DIAS dias saem do banco (0 mantém todos)
+        self.casos = RegistroCasos(
+            self.db,
+            retencao=int(os.getenv('CASOS_RETENCAO_DIAS', '365')),
+            exportar=os.getenv('CASOS_EXPORTAR') or None,
+            metricas=self.metricas,
         )
-        await ctx.send(embed=embed)
-        return
-
-    canal_destino = canal or ctx.channel
-
-    if canal and not canal.permissions_for(ctx.author).send_messages:
-        await ctx.send("❌ Você não tem permissão para enviar mensagens nesse canal.")
-        return
-
-    msg = await ctx.send("🔍 Buscando versículo...")
-
-    dados = await buscar_versiculo(livro.lower(), capitulo, versiculo)
-
-    if dados:
-        embed = discord.Embed(
-            title=f"📖 {dados['book']['name']} {dados['chapter']}:{dados['number']}",
-            description=f"*\"{dados['text']}\"*",
-            color=0x4A90E2
+        self.automod = Automod(
+            self.db, cargos_muted=self.cargos_muted, casos=self.casos, metricas=self.metricas,
+            rajada=lambda guild_id: self.boas_vindas is not None and self.boas_vindas.em_rajada(guild_id),
         )
-        embed.add_field(name="📚 Versão", value="NVI (Nova Versão Internacional)", inline=False)
-        embed.set_footer(
-            text=f"Solicitado por {ctx.author.display_name}",
-            icon_url=ctx.author.display_avatar.url
+        self.membros = CacheMembros(
+            MEMBROS_POLITICA,
+            max_lru=int(os.getenv('MEMBROS_LRU', '10000')),
         )
+        # IDs de servidores de teste: sincroniza só neles, sem tocar nos globais
+        self.sync_guilds = [int(g) for g in os.getenv('SYNC_GUILDS', '').split(',') if g.strip()]
+        # `python main.py sync`: o setup_hook só sincroniza a árvore
+        self.apenas_sync = False
+        self.ipc = ClienteIPC.do_ambiente()
+        self.cluster_id = CLUSTER_ID
+        self.diario = None
+        self._versoes_extensoes = {}
+        self._recarga = asyncio.Lock()
+
+    def no_cog(self, cog, metodo):
+        """Callback que chama o método do cog carregado no momento da chamada.
+
+        Os subsistemas guardam callbacks por toda a vida do bot; resolver o cog
+        a cada chamada faz com que usem o código novo depois de uma recarga.
+        """
+        return lambda *args: getattr(self.get_cog(cog), metodo)(*args)
+
+    async def entregador_lembretes(self):
+        """Espera o READY e a extensão de utilidades e retorna a função de entrega de lembretes.
+
+        O método fica preso ao cog de agora: se uma recarga trocar o cog durante
+        a entrega, o lote que já saiu do banco é entregue pelo anterior.
+        """
+        await self.wait_until_ready()
+        while (cog := self.get_cog('Utilidades')) is None:
+            await asyncio.sleep(1)
+        return cog.entregar_lembrete
+
+    async def on_message(self, message):
+        # Os comandos de texto são processados pelo on_message de extensoes/eventos.py
+        pass
+
+    async def invoke(self, ctx):
+        ctx.metricas_inicio = time.perf_counter()
+        # Os logs emitidos durante o comando levam servidor, canal e comando
+        contexto_log(guild_id=ctx.guild.id if ctx.guild else None, canal_id=ctx.channel.id,
+                     usuario_id=ctx.author.id, comando=ctx.command.qualified_name if ctx.command else None)
+        await super().invoke(ctx)
+
+    async def carregar_extensoes(self):
+        for nome in EXTENSOES:
+            await self.load_extension(nome)
+            self._versoes_extensoes[nome] = versao_extensao(nome)
+
+    async def recarregar(self, nomes=None):
+        """Recarrega as extensões pedidas, ou as que mudaram no disco.
+
+        Retorna ``[(extensão, segundos)]``. Uma extensão com erro mantém a
+        versão anterior carregada (o discord.py desfaz a troca) e o erro sobe.
+        """
+        async with self._recarga:
+            if nomes is None:
+                nomes = [n for n in EXTENSOES if versao_extensao(n) != self._versoes_extensoes.get(n)]
+            tempos = []
+            for nome in nomes:
+                inicio = time.perf_counter()
+                await self.reload_extension(nome)
+                tempos.append((nome, time.perf_counter() - inicio))
+                self._versoes_extensoes[nome] = versao_extensao(nome)
+                logger.info(f"Extensão {nome} recarregada em {tempos[-1][1] * 1000:.1f} ms")
+            # A impressão digital evita a chamada à API se nenhum comando mudou
+            if tempos and CLUSTER_ID == 0:
+                await sincronizar(self, guilds=self.sync_guilds)
+            return tempos
+
+    def _recarregar_por_sinal(self):
+        async def recarregar():
+            try:
+                tempos = await self.recarregar()
+            except Exception as e:
+                logger.error(f"Erro ao recarregar extensões: {e}")
+                return
+            if not tempos:
+                logger.info("SIGHUP recebido, nenhuma extensão mudou")
+
+        asyncio.create_task(recarregar())
+
+    async def setup_hook(self):
+        if self.apenas_sync:
+            # Sem lembretes, versículo diário, rollouts do Muted nem gravação de
+            # casos: o processo encerra logo depois
+            await self.db.abrir()
+            await self.carregar_extensoes()
+            await sincronizar(self, guilds=self.sync_guilds, forcar=True)
+            return
 
-        await canal_destino.send(embed=embed)
-        await msg.edit(content=f"✅ Versículo enviado{' para ' + canal.mention if canal else ''}!")
-    else:
-        await msg.edit(content="❌ Versículo não encontrado. Verifique se o livro, capítulo e versículo estão corretos.")
-
-@bot.command(name='versiculo_diario')
-async def versiculo_diario(ctx, canal: discord.TextChannel = None):
-    """Envia um versículo aleatório do dia"""
-    canal_destino = canal or ctx.channel
-
-    if canal and not canal.permissions_for(ctx.author).send_messages:
-        await ctx.send("❌ Você não tem permissão para enviar mensagens nesse canal.")
-        return
-
-    msg = await ctx.send("🙏 Buscando versículo do dia...")
-
-    dados = await buscar_versiculo_aleatorio()
-
-    if dados:
-        embed = discord.Embed(
-            title=f"🌅 Versículo do Dia",
-            description=f"*\"{dados['text']}\"*",
-            color=0xFFD700
+        self.atraso_loop.start()
+        self.metricas.medidor('cache_biblia_itens', lambda: self.cache_biblia.stats()['itens'],
+                              'Itens no cache de consultas bíblicas')
+        self.metricas.medidor('limites_baldes', lambda: [({'limite': l.nome}, len(l)) for l in LIMITES],
+                              'Baldes de limite de uso ativos na memória')
+        self.metricas.medidor('limites_rejeicoes', lambda: [({'limite': l.nome}, l.rejeicoes) for l in LIMITES],
+                              'Usos recusados por limite desde o início')
+        self.metricas.medidor('pesquisa_cursores', lambda: self.cursores.stats()['itens'],
+                              'Pesquisas paginadas guardadas na memória')
+        self.metricas.medidor('cache_biblia_taxa_acerto', lambda: self.cache_biblia.stats()['taxa_acerto'],
+                              'Fração das consultas bíblicas atendidas pelo cache')
+        self.metricas.medidor('logs_fila', lambda: LOGS.fila.qsize(), 'Registros de log aguardando a thread de escrita')
+        self.metricas.medidor('logs_descartados', lambda: LOGS.descartados,
+                              'Registros de log descartados com a fila cheia')
+        self.metricas.medidor('logs_suprimidos', lambda: LOGS.suprimidas,
+                              'Avisos e erros repetidos suprimidos pelo filtro de logs')
+        if METRICAS_PORTA is not None:
+            await self.metricas.servir(METRICAS_HOST, METRICAS_PORTA)
+        await self.db.abrir()
+        await self.configuracoes.start()
+        await self.cargos_muted.start()
+        await self.casos.start()
+        await self.automod.start()
+        await self.carregar_extensoes()
+        # Acima de BOAS_VINDAS_LIMIAR entradas/min as boas-vindas viram resumos
+        self.boas_vindas = BoasVindas(
+            self.no_cog('Eventos', 'renderizar_boas_vindas'),
+            canal=self.no_cog('Eventos', 'canal_boas_vindas'),
+            limiar=int(os.getenv('BOAS_VINDAS_LIMIAR', '10')),
+            janela=float(os.getenv('BOAS_VINDAS_JANELA', '10')),
+            metricas=self.metricas,
         )
-        embed.add_field(
-            name="📍 Referência",
-            value=f"{dados['book']['name']} {dados['chapter']}:{dados['number']}",
-            inline=True
+        self.lembretes = AgendadorLembretes(
+            self.db, self.entregador_lembretes, shards=CLUSTER_SHARDS, shard_count=SHARD_COUNT
         )
-        embed.add_field(name="📚 Versão", value="NVI", inline=True)
-        embed.set_footer(
-            text=f"Versículo do dia • Solicitado por {ctx.author.display_name}",
-            icon_url=ctx.author.display_avatar.url
+        await self.lembretes.start()
+        self.biblia_local = BibliaStore.abrir(os.getenv('BIBLIA_CORPUS', 'data/nvi.sbib'))
+        if self.biblia_local:
+            logger.info(f"Bíblia local carregada: {self.biblia_local.n_versos} versículos")
+            self.biblia_indice = IndiceBusca.abrir(os.getenv('BIBLIA_INDICE', 'data/nvi.sidx'))
+        else:
+            logger.warning("Bíblia local não encontrada, usando apenas a API")
+        await self.biblia.start()
+
+        self.diario = VersiculoDiario(
+            self, self.db,
+            renderizar=self.no_cog('Biblia', 'renderizar_versiculo_diario'),
+            sortear_remoto=self.no_cog('Biblia', 'buscar_versiculo_aleatorio'),
+            ritmo=self.ritmo,
         )
+        await self.diario.start()
 
-        await canal_destino.send(embed=embed)
-        await msg.edit(content=f"✅ Versículo do dia enviado{' para ' + canal.mention if canal else ''}!")
-    else:
-        await msg.edit(content="❌ Erro ao buscar versículo do dia. Tente novamente mais tarde.")
-
-@bot.command(name='pesquisar_biblia')
-async def pesquisar_biblia(ctx, *, args):
-    """Pesquisa versículos que contenham uma palavra ou frase"""
-    parts = args.split()
-    canal = None
-    termo = args
-
-    # Verificar se o último argumento é uma menção de canal
-    if parts and parts[-1].startswith('<#') and parts[-1].endswith('>'):
+        # `kill -HUP <pid>` recarrega as extensões alteradas sem derrubar o gateway
         try:
-            canal_id = int(parts[-1][2:-1])
-            canal = ctx.guild.get_channel(canal_id)
-            termo = ' '.join(parts[:-1])
-        except ValueError:
-            pass
-
-    canal_destino = canal or ctx.channel
-
-    if canal and not canal.permissions_for(ctx.author).send_messages:
-        await ctx.send("❌ Você não tem permissão para enviar mensagens nesse canal.")
-        return
-
-    if not termo.strip():
-        embed = discord.Embed(
-            title="❌ Uso Incorreto",
-            description="**Uso correto:** `*pesquisar_biblia <termo> [#canal]`\n**Exemplo:** `*pesquisar_biblia amor`",
-            color=0xff0000
-        )
-        await ctx.send(embed=embed)
-        return
-
-    msg = await ctx.send(f"🔍 Pesquisando por **'{termo}'** na Bíblia...")
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self._recarregar_por_sinal)
+        except (AttributeError, NotImplementedError):
+            pass  # Windows
 
+        # Só o cluster 0 sincroniza; os outros compartilham a mesma árvore
+        if CLUSTER_ID != 0:
+            return
+        try:
+            await sincronizar(self, guilds=self.sync_guilds)
+        except Exception as e:
+            logger.error(f"Erro ao sincronizar comandos: {e}")
+
+    async def close(self):
+        self.atraso_loop.close()
+        await self.metricas.close()
+        await self.ipc.close()
+        if self.boas_vindas:
+            self.boas_vindas.close()
+        if self.diario:
+            self.diario.close()
+        if self.lembretes:
+            await self.lembretes.close()
+        await self.configuracoes.close()
+        await self.casos.close()
+        await self.db.close()
+        await self.biblia.close()
+        if self.biblia_indice:
+            self.biblia_indice.close()
+        if self.biblia_local:
+            self.biblia_local.close()
+        await super().close()
+
+def versao_extensao(nome):
+    """mtime do arquivo da extensão, para saber se mudou desde a carga"""
     try:
-        url = f"https://www.abibliadigital.com.br/api/verses/nvi/search/{termo}"
-        response = requests.get(url, timeout=15)
-
-        if response.status_code == 200:
-            dados = response.json()
-
-            if dados and len(dados) > 0:
-                resultados = dados[:5]
-
-                embed = discord.Embed(
-                    title=f"📚 Resultados da Pesquisa",
-                    description=f"**Termo:** {termo}\n**Resultados:** {len(dados)} encontrados (mostrando {len(resultados)})",
-                    color=0x9B59B6
-                )
-
-                for i, verso in enumerate(resultados, 1):
-                    texto = verso['text']
-                    if len(texto) > 150:
-                        texto = texto[:150] + "..."
-
-                    embed.add_field(
-                        name=f"{i}. {verso['book']['name']} {verso['chapter']}:{verso['number']}",
-                        value=f"*\"{texto}\"*",
-                        inline=False
-                    )
-
-                embed.add_field(name="📚 Versão", value="NVI (Nova Versão Internacional)", inline=False)
-                embed.set_footer(
-                    text=f"Pesquisa por {ctx.author.display_name}",
-                    icon_url=ctx.author.display_avatar.url
-                )
-
-                await canal_destino.send(embed=embed)
-                await msg.edit(content=f"✅ Resultados enviados{' para ' + canal.mention if canal else ''}!")
-            else:
-                await msg.edit(content=f"❌ Nenhum versículo encontrado com o termo **'{termo}'**.")
-        else:
-            await msg.edit(content="❌ Erro ao realizar a pesquisa. Tente novamente mais tarde.")
+        return os.path.getmtime(importlib.util.find_spec(nome).origin)
+    except (AttributeError, OSError):
+        return None
 
-    except Exception as e:
-        logger.error(f"Erro na pesquisa bíblica: {e}")
-        await msg.edit(content="❌ Erro ao realizar a pesquisa. Tente novamente mais tarde.")
-
-@bot.command(name='ajuda_biblia')
-async def ajuda_biblia(ctx):
-    """Mostra ajuda para comandos bíblicos"""
-    embed = discord.Embed(
-        title="📖 Comandos Bíblicos - Ajuda",
-        description="Comandos disponíveis para consultar a Bíblia Sagrada:",
-        color=0x3498DB
-    )
+def prefixo_do_servidor(bot, message):
+    """Roda a cada mensagem: só uma consulta ao cache de configurações"""
+    if message.guild is None:
+        return CAMPOS['prefixo']
+    return bot.configuracoes.obter(message.guild.id).prefixo
 
-    embed.add_field(
-        name="📋 Comandos Disponíveis",
-        value="`*versiculo [livro] [cap] [vers] [#canal]`\n"
-              "`*versiculo_diario [#canal]`\n"
-              "`*pesquisar_biblia [termo] [#canal]`\n"
-              "`*ajuda_biblia`",
-        inline=False
-    )
+# Criar bot
+bot = SoninhoBot(
+    command_prefix=prefixo_do_servidor,
+    intents=intents,
+    help_command=None,
+    case_insensitive=True,
+    shard_ids=CLUSTER_SHARDS,
+    shard_count=SHARD_COUNT,
+    **opcoes_bot(MEMBROS_POLITICA, intents)
+)
 
-    embed.add_field(
-        name="💡 Exemplos de Uso",
-        value="`*versiculo joão 3 16`\n"
-              "`*versiculo salmos 23 1 #devocional`\n"
-              "`*versiculo_diario`\n"
-              "`*pesquisar_biblia amor #estudo`",
-        inline=False
-    )
+# ===== ADMINISTRAÇÃO =====
 
+@bot.command(name='sync')
+@commands.is_owner()
+async def sync_comandos(ctx, modo: str = None):
+    """Sincroniza os comandos slash (use `*sync forcar` para ignorar a impressão digital)"""
+    sincronizados = await sincronizar(bot, guilds=bot.sync_guilds, forcar=modo == 'forcar')
+    if sincronizados:
+        await ctx.send(f"✅ Comandos sincronizados: {', '.join(sincronizados)}")
+    else:
+        await ctx.send("✅ Nenhuma mudança nos comandos, nada para sincronizar.")
+
+@bot.command(name='recarregar')
+@commands.is_owner()
+async def recarregar_extensoes(ctx, extensao: str = None):
+    """Recarrega uma extensão (ex.: `*recarregar biblia`) ou todas as que mudaram no disco"""
+    if extensao is not None:
+        nome = extensao if extensao.startswith('extensoes.') else f'extensoes.{extensao}'
+        if nome not in EXTENSOES:
+            await ctx.send(f"❌ Extensão desconhecida. Use uma de: {', '.join(n.split('.')[-1] for n in EXTENSOES)}")
+            return
+        nomes = [nome]
+    else:
+        nomes = None
+    try:
+        tempos = await bot.recarregar(nomes)
+    except commands.ExtensionError as e:
+        await ctx.send(f"❌ Falha ao recarregar, a versão anterior continua ativa: {e}")
+        return
+    if not tempos:
+        await ctx.send("✅ Nenhuma extensão mudou desde a última carga.")
+        return
+    await ctx.send("✅ Recarregadas: " + ', '.join(f"{n.split('.')[-1]} ({s * 1000:.0f} ms)" for n, s in tempos))
+
+@bot.command(name='cache_biblia')
+@commands.is_owner()
+async def cache_biblia(ctx):
+    """Mostra os contadores do cache de consultas bíblicas"""
+    stats = bot.cache_biblia.stats()
+    embed = discord.Embed(title="🗃️ Cache Bíblico", color=0x3498DB)
+    embed.add_field(name="Itens", value=f"{stats['itens']} ({stats['bytes'] / 1024:.0f} KiB)", inline=True)
+    embed.add_field(name="Taxa de acerto", value=f"{stats['taxa_acerto']:.1%}", inline=True)
     embed.add_field(
-        name="📌 Observações",
-        value="• O parâmetro **[#canal]** é opcional\n"
-              "• Use espaços normais entre palavras\n"
-              "• Versão disponível: **NVI**\n"
-              "• API: abibliadigital.com.br",
+        name="Contadores",
+        value=f"hits: {stats['hits']} • misses: {stats['misses']} • coalescidas: {stats['coalescidas']}\n"
+              f"evictions: {stats['evictions']} • expiradas: {stats['expiradas']}",
         inline=False
     )
-
-    embed.set_footer(text="Use * (asterisco) antes dos comandos bíblicos")
     await ctx.send(embed=embed)
 
-# ===== TRATAMENTO DE ERROS =====
+# ===== INICIALIZAÇÃO =====
 
-@bot.tree.error
-async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
-    if isinstance(error, app_commands.MissingPermissions):
-        await interaction.response.send_message("❌ Você não tem permissão para usar este comando.", ephemeral=True)
-    elif isinstance(error, app_commands.CommandOnCooldown):
-        await interaction.response.send_message(f"⏰ Comando em cooldown. Tente novamente em {error.retry_after:.1f} segundos.", ephemeral=True)
-    else:
-        await interaction.response.send_message("❌ Ocorreu um erro ao executar o comando.", ephemeral=True)
-        logger.error(f'Erro no comando slash: {error}')
+async def sincronizar_e_sair():
+    """`python main.py sync`: faz login, força a sincronização e encerra"""
+    bot.apenas_sync = True
+    async with bot:
+        await bot.login(TOKEN)
 
-@bot.event
-async def on_command_error(ctx, error):
-    if isinstance(error, commands.CommandNotFound):
+def main():
+    if sys.argv[1:] == ['sync']:
+        asyncio.run(sincronizar_e_sair())
         return
-    elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"❌ Argumento obrigatório ausente. Use `*ajuda_biblia` para ver como usar os comandos.")
-    elif isinstance(error, commands.BadArgument):
-        await ctx.send(f"❌ Argumento inválido. Use `*ajuda_biblia` para ver como usar os comandos.")
-    elif isinstance(error, commands.MissingPermissions):
-        await ctx.send("❌ Você não tem permissão para usar este comando.")
-    else:
-        logger.error(f'Erro no comando: {error}')
-        await ctx.send("❌ Ocorreu um erro ao executar o comando.")
 
-# ===== INICIALIZAÇÃO =====
+    if sys.argv[1:2] == ['cluster']:
+        n_clusters = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+        lancador = Lancador(
+            n_clusters,
+            token=TOKEN,
+            api_url=discord.http.Route.BASE,
+            shard_count=SHARD_COUNT,
+            comando=[sys.executable, os.path.abspath(__file__)],
+        )
+        asyncio.run(lancador.executar())
+        return
 
-def main():
     try:
-        print("🚀 Iniciando bot Discord...")
-        print("⏳ Conectando...")
-        bot.run(TOKEN)
+        logger.info("Iniciando bot Discord, conectando...")
+        # log_handler=None: o discord.py não instala um handler próprio; os logs
+        # dele passam pela fila do logger raiz
+        bot.run(TOKEN, log_handler=None)
     except discord.LoginFailure:
-        print("❌ ERRO: Token inválido! Verifique o token no arquivo .env")
+        logger.error("Token inválido! Verifique o token no arquivo .env")
     except Exception as e:
-        print(f"❌ ERRO ao iniciar o bot: {e}")
-        logger.error(f"Erro crítico: {e}")
+        logger.exception(f"Erro crítico ao iniciar o bot: {e}")
 
 if __name__ == "__main__":
     main()